@@ -0,0 +1,269 @@
+# benchmarks/bench_serialization.py
+#
+# Serialization time and payload size of the heaviest read endpoints, before
+# (full Prisma models through jsonable_encoder + stdlib json) and after (slim
+# response schemas rendered with orjson). Uses synthetic data shaped like the
+# Prisma models, so it runs without a database:
+#
+#   python benchmarks/bench_serialization.py [--repeat 200]
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.fast_json import dumps  # noqa: E402
+from modules.response_schemas import PlanResponse, QuizListResponse, SessionNotificationsResponse  # noqa: E402
+
+NOW = datetime(2025, 9, 1, 12, 0, tzinfo=timezone.utc)
+
+
+# Mirrors of the Prisma models, with every column the client returns
+class Resource(BaseModel):
+    id: str
+    cohortId: str
+    title: str
+    url: str
+    type: str
+    duration: int
+    tags: List[str]
+    weekNumber: int
+    isOptional: bool
+    tasks: Optional[list] = None
+    cohort: Optional[dict] = None
+
+
+class Task(BaseModel):
+    id: str
+    planId: str
+    resourceId: Optional[str]
+    quizId: Optional[str]
+    status: str
+    timestamp: datetime
+    assignedDate: Optional[datetime]
+    completedAt: Optional[datetime]
+    time_spent_seconds: int
+    plan: Optional[dict] = None
+    resource: Optional[Resource] = None
+    quiz: Optional[dict] = None
+
+
+class Plan(BaseModel):
+    id: str
+    userId: str
+    cohortId: str
+    weekNumber: Optional[int]
+    createdAt: datetime
+    tasks: List[Task]
+    user: Optional[dict] = None
+    cohort: Optional[dict] = None
+
+
+class Launchpad(BaseModel):
+    id: str
+    userId: str
+    isStudent: bool
+    workExperience: bool
+    studyStream: str
+    expectedOutcomes: str
+    codingFamiliarity: str
+    pythonFamiliarity: str
+    languages: str
+    yearsOfExperience: str
+    createdAt: datetime
+    updatedAt: datetime
+
+
+class User(BaseModel):
+    id: str
+    email: str
+    password: str
+    name: Optional[str]
+    phoneNumber: Optional[str]
+    linkedinUsername: Optional[str]
+    createdFrom: str
+    role: str
+    type: Optional[str]
+    cohortId: Optional[str]
+    createdAt: datetime
+    launchpad: Optional[Launchpad] = None
+
+
+class Session(BaseModel):
+    id: str
+    cohortId: str
+    title: str
+    description: str
+    weekNumber: int
+    lectureNumber: int
+    imageUrl: Optional[str]
+    createdAt: datetime
+    updatedAt: datetime
+    sessionType: Optional[str]
+
+
+class Notification(BaseModel):
+    id: str
+    studentId: str
+    sessionId: str
+    message: str
+    status: str
+    createdAt: datetime
+    user: Optional[User] = None
+    session: Optional[Session] = None
+
+
+class Option(BaseModel):
+    id: str
+    questionId: str
+    optionText: str
+    isCorrect: bool
+    createdAt: datetime
+    updatedAt: datetime
+
+
+class Question(BaseModel):
+    id: str
+    quizId: str
+    questionText: str
+    questionType: str
+    createdAt: datetime
+    updatedAt: datetime
+    options: List[Option]
+
+
+class Quiz(BaseModel):
+    id: str
+    cohortId: str
+    weekNumber: int
+    createdAt: datetime
+    updatedAt: datetime
+    questions: List[Question]
+
+
+def make_plan(tasks: int = 12) -> dict:
+    return {
+        "success": True,
+        "data": Plan(
+            id="plan-1", userId="user-1", cohortId="cohort-1", weekNumber=3, createdAt=NOW,
+            tasks=[
+                Task(
+                    id=f"task-{i}", planId="plan-1", resourceId=f"res-{i}", quizId=None, status="PENDING",
+                    timestamp=NOW, assignedDate=NOW, completedAt=None, time_spent_seconds=120,
+                    resource=Resource(
+                        id=f"res-{i}", cohortId="cohort-1", title=f"Lecture {i}: building agents",
+                        url=f"https://example.com/videos/{i}", type="VIDEO", duration=45,
+                        tags=["python", "llm", "agents"], weekNumber=3, isOptional=False
+                    )
+                ) for i in range(tasks)
+            ]
+        ),
+        "message": "Plan retrieved successfully"
+    }
+
+
+def make_notifications(count: int = 300) -> dict:
+    session = Session(
+        id="session-1", cohortId="cohort-1", title="Week 3 live session", description="Agents deep dive " * 20,
+        weekNumber=3, lectureNumber=1, imageUrl="https://example.com/session.png",
+        createdAt=NOW, updatedAt=NOW, sessionType="LIVE"
+    )
+    return {
+        "message": "Session notifications retrieved successfully",
+        "data": [
+            Notification(
+                id=f"notif-{i}", studentId=f"user-{i}", sessionId="session-1",
+                message="Hi there! Tonight's session covers agent tool use. " * 6, status="UNREAD", createdAt=NOW,
+                user=User(
+                    id=f"user-{i}", email=f"learner{i}@example.com", password="$2b$12$" + "x" * 53,
+                    name=f"Learner {i}", phoneNumber="+910000000000", linkedinUsername=f"learner-{i}",
+                    createdFrom="csv", role="LEARNER", type="FULL", cohortId="cohort-1", createdAt=NOW,
+                    launchpad=Launchpad(
+                        id=f"lp-{i}", userId=f"user-{i}", isStudent=False, workExperience=True,
+                        studyStream="Computer Science", expectedOutcomes="Ship an AI product",
+                        codingFamiliarity="Intermediate", pythonFamiliarity="Intermediate",
+                        languages="Python, JavaScript", yearsOfExperience="3-5", createdAt=NOW, updatedAt=NOW
+                    )
+                ),
+                session=session
+            ) for i in range(count)
+        ]
+    }
+
+
+def make_quizzes(count: int = 12, questions: int = 10) -> dict:
+    return {
+        "success": True,
+        "data": [
+            Quiz(
+                id=f"quiz-{q}", cohortId="cohort-1", weekNumber=q + 1, createdAt=NOW, updatedAt=NOW,
+                questions=[
+                    Question(
+                        id=f"q-{q}-{i}", quizId=f"quiz-{q}", questionText="Which of these best describes tool calling? " * 2,
+                        questionType="MULTIPLE_CHOICE", createdAt=NOW, updatedAt=NOW,
+                        options=[
+                            Option(
+                                id=f"o-{q}-{i}-{o}", questionId=f"q-{q}-{i}", optionText=f"Option {o} text",
+                                isCorrect=o == 0, createdAt=NOW, updatedAt=NOW
+                            ) for o in range(4)
+                        ]
+                    ) for i in range(questions)
+                ]
+            ) for q in range(count)
+        ],
+        "message": "Quizzes retrieved successfully"
+    }
+
+
+def before(content) -> bytes:
+    # Starlette's JSONResponse.render on FastAPI's jsonable_encoder output
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def after(content, schema) -> bytes:
+    # FastAPI dumps returned models, validates them into the response_model,
+    # serializes that, and FastJSONResponse renders it with orjson
+    prepared = {key: jsonable_dump(value) for key, value in content.items()}
+    return dumps(schema.model_validate(prepared).model_dump(mode="json"))
+
+
+def jsonable_dump(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, list):
+        return [jsonable_dump(item) for item in value]
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = [
+        ("get_plan", make_plan(), PlanResponse),
+        ("get_session_notifications", make_notifications(), SessionNotificationsResponse),
+        ("get_all_quizzes", make_quizzes(), QuizListResponse),
+    ]
+
+    print(f"{'endpoint':<28}{'before ms':>11}{'after ms':>11}{'before KB':>11}{'after KB':>11}")
+    for name, content, schema in cases:
+        before_ms = timeit.timeit(lambda: before(content), number=args.repeat) / args.repeat * 1000
+        after_ms = timeit.timeit(lambda: after(content, schema), number=args.repeat) / args.repeat * 1000
+        before_kb = len(before(content)) / 1024
+        after_kb = len(after(content, schema)) / 1024
+        print(f"{name:<28}{before_ms:>11.3f}{after_ms:>11.3f}{before_kb:>11.1f}{after_kb:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/profile_startup.py
+#
+# Cold-start profile of the API: how long `import main` takes in a fresh
+# interpreter and which modules dominate it, then (with --lifespan) how long
+# the lifespan startup takes, split into the database connect and the rest.
+# Boot excluding the DB connect should stay under a second:
+#
+#   python benchmarks/profile_startup.py [--top 15] [--lifespan]
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_imports(top: int) -> float:
+    # main mounts uploads/ at import; start.sh creates it the same way
+    os.makedirs(os.path.join(BACKEND_DIR, "uploads"), exist_ok=True)
+    # A fresh interpreter, so nothing is already in sys.modules
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"import main failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        rows.append((int(cumulative_us), int(self_us), name))
+
+    total_ms = next(cumulative for cumulative, _, name in rows if name.strip() == "main") / 1000
+    print(f"import main: {total_ms:.0f} ms")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f}{self_us / 1000:>10.1f}  {name}")
+    return total_ms
+
+
+async def profile_lifespan():
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(BACKEND_DIR)
+    import main
+
+    connect = main.prisma_client.connect
+    connect_ms = 0.0
+
+    async def timed_connect(*args, **kwargs):
+        nonlocal connect_ms
+        started = time.perf_counter()
+        try:
+            return await connect(*args, **kwargs)
+        finally:
+            connect_ms += (time.perf_counter() - started) * 1000
+
+    main.prisma_client.connect = timed_connect
+    started = time.perf_counter()
+    async with main.lifespan(main.app):
+        startup_ms = (time.perf_counter() - started) * 1000
+    print(f"lifespan startup: {startup_ms:.0f} ms (DB connect {connect_ms:.0f} ms, everything else {startup_ms - connect_ms:.0f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--lifespan", action="store_true", help="also run the lifespan startup (needs DATABASE_URL)")
+    args = parser.parse_args()
+
+    profile_imports(args.top)
+    if args.lifespan:
+        asyncio.run(profile_lifespan())
+
+
+if __name__ == "__main__":
+    main()
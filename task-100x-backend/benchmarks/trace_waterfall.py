@@ -0,0 +1,139 @@
+# benchmarks/trace_waterfall.py
+#
+# Offline waterfall of one traced request, read from the JSON lines written
+# with TRACE_EXPORTER=file. Picks the trace by X-Request-ID, by trace id, or
+# the slowest one in the file, then prints where its time went (self time per
+# Prisma / LLM provider / outbound host, so overlapping children aren't
+# counted twice) followed by the span tree:
+#
+#   python benchmarks/trace_waterfall.py [traces.jsonl] [--request-id ID | --trace-id ID] [--width 60] [--limit 200]
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+
+
+def load_traces(path: str) -> dict:
+    traces = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces[span["trace_id"]].append(span)
+    return traces
+
+
+def find_root(spans: list) -> dict:
+    ids = {span["span_id"] for span in spans}
+    roots = [span for span in spans if span["parent_id"] not in ids]
+    return min(roots, key=lambda span: span["start_ns"])
+
+
+def duration_ms(span: dict) -> float:
+    return (span["end_ns"] - span["start_ns"]) / 1e6
+
+
+def pick_trace(traces: dict, request_id: str = None, trace_id: str = None) -> str:
+    if trace_id:
+        if trace_id not in traces:
+            sys.exit(f"trace {trace_id} not found")
+        return trace_id
+    if request_id:
+        for tid, spans in traces.items():
+            if any(span["attributes"].get("request.id") == request_id for span in spans):
+                return tid
+        sys.exit(f"no trace for request id {request_id} (it may not have been sampled)")
+    return max(traces, key=lambda tid: duration_ms(find_root(traces[tid])))
+
+
+def category(span: dict) -> str:
+    attributes = span["attributes"]
+    if "db.system" in attributes:
+        return "prisma"
+    if "gen_ai.system" in attributes:
+        return f"llm {attributes['gen_ai.system']}"
+    if "peer.service" in attributes:
+        return f"http {attributes['peer.service']}"
+    return "app"
+
+
+def self_time_ms(span: dict, children: list) -> float:
+    # Span time not covered by any child; children of async code overlap
+    covered, cursor = 0, span["start_ns"]
+    for child in sorted(children, key=lambda child: child["start_ns"]):
+        start, end = max(child["start_ns"], cursor), min(child["end_ns"], span["end_ns"])
+        if end > start:
+            covered += end - start
+            cursor = end
+    return max(0, span["end_ns"] - span["start_ns"] - covered) / 1e6
+
+
+def print_waterfall(spans: list, width: int, limit: int):
+    children = defaultdict(list)
+    for span in spans:
+        children[span["parent_id"]].append(span)
+    root = find_root(spans)
+    origin, total = root["start_ns"], max(root["end_ns"] - root["start_ns"], 1)
+
+    print(f"trace {root['trace_id']}  {root['name']}  {duration_ms(root):.0f} ms  "
+          f"request id {root['attributes'].get('request.id', '-')}  {len(spans)} spans")
+
+    by_category = defaultdict(lambda: [0, 0.0])
+    for span in spans:
+        by_category[category(span)][0] += 1
+        by_category[category(span)][1] += self_time_ms(span, children[span["span_id"]])
+    print(f"\n{'self ms':>12}{'% of trace':>12}{'spans':>8}  where")
+    for name, (count, ms) in sorted(by_category.items(), key=lambda item: -item[1][1]):
+        print(f"{ms:12.0f}{100 * ms / (total / 1e6):11.1f}%{count:8d}  {name}")
+
+    print()
+    rows = []
+
+    def walk(span, depth):
+        rows.append((span, depth))
+        for child in sorted(children[span["span_id"]], key=lambda child: child["start_ns"]):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    for span, depth in rows[:limit]:
+        offset = int(width * (span["start_ns"] - origin) / total)
+        length = max(1, int(width * (span["end_ns"] - span["start_ns"]) / total))
+        bar = " " * offset + "█" * min(length, width - offset)
+        label = "  " * depth + span["name"]
+        tokens = span["attributes"].get("gen_ai.usage.input_tokens")
+        if tokens is not None:
+            label += f" ({tokens}+{span['attributes'].get('gen_ai.usage.output_tokens')} tokens)"
+        error = " ERROR" if span["status"] == "ERROR" else ""
+        print(f"{bar:<{width}} {duration_ms(span):10.1f} ms  {label}{error}")
+    if len(rows) > limit:
+        print(f"... {len(rows) - limit} more spans (--limit)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default="traces.jsonl")
+    parser.add_argument("--request-id")
+    parser.add_argument("--trace-id")
+    parser.add_argument("--width", type=int, default=60)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    traces = load_traces(args.path)
+    if not traces:
+        sys.exit(f"no spans in {args.path}")
+    trace_id = pick_trace(traces, args.request_id, args.trace_id)
+    print_waterfall(traces[trace_id], args.width, args.limit)
+
+    jobs = sorted(
+        {find_root(spans)["name"] + " " + tid for tid, spans in traces.items()
+         if any(trace_id in span["links"] for span in spans)}
+    )
+    if jobs:
+        print("\nbackground jobs started by this request (--trace-id to expand):")
+        for job in jobs:
+            print(f"  {job}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import logging
 import os
 from contextlib import asynccontextmanager
 
@@ -6,11 +7,25 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from prisma import Prisma
 from fastapi.staticfiles import StaticFiles
+from modules.feedback_worker import start_feedback_worker, stop_feedback_worker
+from modules.linkedin_scraper import mark_interrupted_jobs
+from modules.fast_json import FastJSONResponse
+from modules.cache import start_cache, stop_cache
+from modules.compression import CompressionMiddleware
+from modules.image_derivatives import shutdown_pool
+from modules.metrics import MetricsMiddleware, instrument_httpx, instrument_prisma, metrics_response
+from modules.logging_config import REQUEST_ID_HEADER, RequestIdMiddleware, setup_logging, stop_logging
+from modules.tracing import TracingMiddleware, setup_tracing, stop_tracing, trace_httpx, trace_prisma
 
 # Load environment variables
 load_dotenv()
+setup_logging()
+setup_tracing()
+logger = logging.getLogger(__name__)
 # Initialize Prisma client
-prisma_client = Prisma()
+prisma_client = trace_prisma(instrument_prisma(Prisma()))
+instrument_httpx()
+trace_httpx()
 
 async def get_prisma_client():
     return prisma_client
@@ -21,21 +36,30 @@ async def lifespan(app: FastAPI):
     while retries > 0:
         try:
             await prisma_client.connect()
-            print("✅ Successfully connected to Prisma")
+            logger.info("Connected to Prisma")
             break
         except Exception as e:
-            print(f"Could not connect to Prisma, retrying... ({retries} attempts left): {e}")
+            logger.warning("Could not connect to Prisma, retrying (%d attempts left): %s", retries, e)
             retries -= 1
             import asyncio
             await asyncio.sleep(5)
     
     if retries == 0:
         raise Exception("Failed to connect to Prisma after multiple retries")
+
+    await start_cache()
+    await start_feedback_worker(prisma_client)
+    await mark_interrupted_jobs(prisma_client)
     
     yield
+    await stop_feedback_worker()
+    await stop_cache()
+    shutdown_pool()
     await prisma_client.disconnect()
+    stop_tracing()
+    stop_logging()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Mount the static files directory
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -47,13 +71,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", REQUEST_ID_HEADER],
 )
 
+# gzip/brotli, negotiated per request; small bodies are sent as-is
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+# Outermost, so every log line for a request carries its id
+app.add_middleware(RequestIdMiddleware)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "message": "API is running"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
 # Import and include routers
 from routes import auth, instructor, learner
 
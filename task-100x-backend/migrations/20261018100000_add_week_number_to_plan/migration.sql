@@ -0,0 +1,22 @@
+-- AlterTable
+ALTER TABLE "Plan" ADD COLUMN     "weekNumber" INTEGER;
+
+-- Backfill: the oldest plan per (user, cohort, week) owns that week.
+-- Later duplicates keep a NULL weekNumber so the unique index can be created.
+WITH "PlanWeek" AS (
+    SELECT p."id", p."userId", p."cohortId", p."createdAt", MIN(r."weekNumber") AS "weekNumber"
+    FROM "Plan" p
+    JOIN "Task" t ON t."planId" = p."id"
+    JOIN "Resource" r ON r."id" = t."resourceId"
+    GROUP BY p."id"
+), "RankedPlanWeek" AS (
+    SELECT "id", "weekNumber",
+           ROW_NUMBER() OVER (PARTITION BY "userId", "cohortId", "weekNumber" ORDER BY "createdAt", "id") AS "rank"
+    FROM "PlanWeek"
+)
+UPDATE "Plan" SET "weekNumber" = "RankedPlanWeek"."weekNumber"
+FROM "RankedPlanWeek"
+WHERE "Plan"."id" = "RankedPlanWeek"."id" AND "RankedPlanWeek"."rank" = 1;
+
+-- CreateIndex
+CREATE UNIQUE INDEX "Plan_userId_cohortId_weekNumber_key" ON "Plan"("userId", "cohortId", "weekNumber");
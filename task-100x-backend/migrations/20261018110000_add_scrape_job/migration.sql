@@ -0,0 +1,19 @@
+-- CreateTable
+CREATE TABLE "ScrapeJob" (
+    "id" TEXT NOT NULL,
+    "status" TEXT NOT NULL,
+    "cohortId" TEXT,
+    "concurrency" INTEGER NOT NULL,
+    "budget" INTEGER NOT NULL DEFAULT 0,
+    "totalUsers" INTEGER NOT NULL DEFAULT 0,
+    "pendingUserIds" TEXT[],
+    "processedUserIds" TEXT[],
+    "failedUserIds" TEXT[],
+    "postsUpserted" INTEGER NOT NULL DEFAULT 0,
+    "actorRuns" INTEGER NOT NULL DEFAULT 0,
+    "error" TEXT,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "ScrapeJob_pkey" PRIMARY KEY ("id")
+);
@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "ScrapeJob" ADD COLUMN     "batchSize" INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,13 @@
+-- AlterTable
+ALTER TABLE "User" ADD COLUMN     "linkedinNewestPostAt" TIMESTAMP(3),
+ADD COLUMN     "linkedinScrapedAt" TIMESTAMP(3);
+
+-- Backfill the newest-post watermark from posts already ingested
+UPDATE "User" u
+SET "linkedinNewestPostAt" = p."newestPostedAt"
+FROM (
+    SELECT "userId", MAX("postedAt") AS "newestPostedAt"
+    FROM "Post"
+    GROUP BY "userId"
+) p
+WHERE p."userId" = u."id";
@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "ScrapeJob" ADD COLUMN     "postsInserted" INTEGER NOT NULL DEFAULT 0;
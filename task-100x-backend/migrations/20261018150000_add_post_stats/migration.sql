@@ -0,0 +1,38 @@
+-- CreateTable
+CREATE TABLE "PostStats" (
+    "userId" TEXT NOT NULL,
+    "cohortId" TEXT,
+    "totalPosts" INTEGER NOT NULL DEFAULT 0,
+    "totalLikes" INTEGER NOT NULL DEFAULT 0,
+    "totalComments" INTEGER NOT NULL DEFAULT 0,
+    "lastPostedAt" TIMESTAMP(3),
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "PostStats_pkey" PRIMARY KEY ("userId")
+);
+
+-- CreateIndex
+CREATE INDEX "PostStats_totalPosts_totalLikes_userId_idx" ON "PostStats"("totalPosts" DESC, "totalLikes" DESC, "userId");
+
+-- CreateIndex
+CREATE INDEX "PostStats_cohortId_totalPosts_totalLikes_userId_idx" ON "PostStats"("cohortId", "totalPosts" DESC, "totalLikes" DESC, "userId");
+
+-- CreateIndex
+CREATE INDEX "Post_userId_postedAt_idx" ON "Post"("userId", "postedAt");
+
+-- AddForeignKey
+ALTER TABLE "PostStats" ADD CONSTRAINT "PostStats_userId_fkey" FOREIGN KEY ("userId") REFERENCES "User"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+
+-- Backfill one stats row per existing user
+INSERT INTO "PostStats" ("userId", "cohortId", "totalPosts", "totalLikes", "totalComments", "lastPostedAt", "updatedAt")
+SELECT
+    u."id",
+    u."cohortId",
+    COUNT(p."id")::int,
+    COALESCE(SUM(p."numLikes"), 0)::int,
+    COALESCE(SUM(p."numComments"), 0)::int,
+    MAX(p."postedAt"),
+    CURRENT_TIMESTAMP
+FROM "User" u
+LEFT JOIN "Post" p ON p."userId" = u."id"
+GROUP BY u."id";
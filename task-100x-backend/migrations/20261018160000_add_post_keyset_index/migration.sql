@@ -0,0 +1,5 @@
+-- DropIndex
+DROP INDEX "Post_userId_postedAt_idx";
+
+-- CreateIndex
+CREATE INDEX "Post_userId_postedAt_id_idx" ON "Post"("userId", "postedAt", "id");
@@ -0,0 +1,3 @@
+-- AlterTable
+ALTER TABLE "Session" ADD COLUMN     "thumbnailUrl" TEXT,
+ADD COLUMN     "whatsappImageUrl" TEXT;
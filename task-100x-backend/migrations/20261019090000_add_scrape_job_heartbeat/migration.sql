@@ -0,0 +1,3 @@
+-- AlterTable
+ALTER TABLE "ScrapeJob" ADD COLUMN     "heartbeatAt" TIMESTAMP(3),
+ADD COLUMN     "ownerId" TEXT;
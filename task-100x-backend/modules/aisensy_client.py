@@ -1,10 +1,15 @@
 import httpx
+import logging
 import os
 
+from modules.logging_config import mask_phone, truncate
+
 AISENSY_API_KEY = os.environ.get('AISENSY_API_KEY')
 AISENSY_CAMPAIGN_NAME = os.environ.get('AISENSY_CAMPAIGN_NAME') # c05oh30min1
 AISENSY_API_URL = os.environ.get('AISENSY_API_URL')
 
+logger = logging.getLogger(__name__)
+
 async def send_whatsapp_message(
     destination: str,
     user_name: str,
@@ -19,7 +24,7 @@ async def send_whatsapp_message(
     campaign_name: str = AISENSY_CAMPAIGN_NAME
 ):
     if not api_key or not campaign_name:
-        print("AiSensy API key or campaign name not configured.")
+        logger.warning("AiSensy API key or campaign name not configured.")
         return
 
     headers = {
@@ -35,23 +40,26 @@ async def send_whatsapp_message(
         "templateParams": [session_title, user_name, session_status, message_body_1, message_body_2, remaining_time, status] 
     }
 
-    print(payload)
+    # The payload carries the API key, so only its routing fields are logged,
+    # and the phone number only masked
+    masked_destination = mask_phone(destination)
+    logger.debug("AiSensy payload", extra={"destination": masked_destination, "campaign": campaign_name, "hasMedia": bool(media), "sample": True})
 
     if media:
         payload["media"] = media
 
     try:
         async with httpx.AsyncClient() as client:
-            print(f"DEBUG: AISENSY_API_URL: {AISENSY_API_URL}, Type: {type(AISENSY_API_URL)}")
             response = await client.post(AISENSY_API_URL, headers=headers, json=payload)
             response.raise_for_status()  # Raise an exception for 4xx or 5xx status codes
-            print(f"AiSensy WhatsApp message sent to {destination}: {response.json()}")
-            return response.json()
+            result = response.json()
+            logger.info("AiSensy WhatsApp message sent", extra={"destination": masked_destination, "response": truncate(result), "sample": True})
+            return result
     except httpx.RequestError as e:
-        print(f"An error occurred while requesting AiSensy API: {e}")
+        logger.error("An error occurred while requesting AiSensy API: %s", e, extra={"destination": masked_destination})
     except httpx.HTTPStatusError as e:
-        print(f"AiSensy API returned an error: {e.response.status_code} - {e.response.text}")
+        logger.error("AiSensy API returned an error: %s - %s", e.response.status_code, truncate(e.response.text), extra={"destination": masked_destination})
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        logger.exception("Unexpected error sending AiSensy message", extra={"destination": masked_destination})
 
     return None
\ No newline at end of file
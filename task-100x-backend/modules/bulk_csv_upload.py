@@ -1,7 +1,6 @@
 # modules/bulk_csv_upload.py
 
 import asyncio
-import pandas as pd
 from db_connector import DBConnection
 
 """
@@ -45,6 +44,9 @@ async def process_bulk_csv(path: str, file_source: str = "local"):
     if file_source != "local":
         return {"status": "failure", "reason": "Unsupported file source type", "file_source": file_source}
 
+    # pandas is only needed here; importing it costs more than the rest of the script
+    import pandas as pd
+
     try:
         df = pd.read_csv(path)
     except FileNotFoundError:
@@ -0,0 +1,297 @@
+# modules/cache.py
+
+import asyncio
+import os
+import pickle
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# redis:// URL of a shared cache; without one every worker keeps its own memory cache
+CACHE_URL = os.environ.get("CACHE_URL") or os.environ.get("REDIS_URL")
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "4096"))
+CACHE_KEY_PREFIX = os.environ.get("CACHE_KEY_PREFIX", "task100x")
+# How long a worker trusts its copy of a namespace version between broadcasts
+CACHE_VERSION_TTL_SECONDS = float(os.environ.get("CACHE_VERSION_TTL_SECONDS", "5"))
+# How long one worker may hold a key's load lock before others load it themselves
+CACHE_LOCK_TTL_SECONDS = float(os.environ.get("CACHE_LOCK_TTL_SECONDS", "10"))
+
+
+class MemoryBackend:
+    """Process-local LRU with per-key TTLs, used when no CACHE_URL is configured."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._entries[key] = (time.monotonic() + ttl if ttl else None, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def delete_if_equal(self, key: str, value: Any):
+        if await self.get(key) == value:
+            await self.delete(key)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def publish(self, channel: str, message: str):
+        # Single process: the publisher already applied the change
+        pass
+
+    async def subscribe(self, channel: str, handler: Callable[[str], None]):
+        pass
+
+    async def close(self):
+        pass
+
+
+class RedisBackend:
+    """Shared backend for any Redis-protocol server. Values are pickled."""
+
+    # Deletes KEYS[1] only while it still holds ARGV[1], atomically
+    _DELETE_IF_EQUAL = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("CACHE_URL is set but the redis package isn't installed") from e
+        self._redis = redis_asyncio.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def get(self, key: str) -> Any:
+        raw = await self._redis.get(key)
+        return pickle.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        await self._redis.set(key, pickle.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(await self._redis.set(key, pickle.dumps(value), px=int(ttl * 1000) if ttl else None, nx=True))
+
+    async def delete(self, key: str):
+        await self._redis.delete(key)
+
+    async def delete_if_equal(self, key: str, value: Any):
+        await self._redis.eval(self._DELETE_IF_EQUAL, 1, key, pickle.dumps(value))
+
+    async def incr(self, key: str) -> int:
+        return int(await self._redis.incr(key))
+
+    async def get_counter(self, key: str) -> int:
+        raw = await self._redis.get(key)
+        return int(raw) if raw is not None else 0
+
+    async def publish(self, channel: str, message: str):
+        await self._redis.publish(channel, message)
+
+    async def subscribe(self, channel: str, handler: Callable[[str], None]):
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(channel)
+
+        async def listen():
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    data = message["data"]
+                    handler(data.decode() if isinstance(data, bytes) else data)
+
+        self._listener = asyncio.create_task(listen())
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        await self._redis.aclose()
+
+
+class Namespace:
+    """
+    A group of keys invalidated together. Keys are stored under the
+    namespace's current version, so `invalidate()` orphans every entry at once
+    (they age out through TTLs or the LRU) and tells the other workers.
+    """
+
+    def __init__(self, cache: "Cache", name: str, ttl: Optional[float] = None):
+        self.cache = cache
+        self.name = name
+        self.ttl = ttl
+
+    async def version(self) -> int:
+        return await self.cache.version(self.name)
+
+    async def invalidate(self) -> int:
+        return await self.cache.bump(self.name)
+
+    async def _key(self, key: Any) -> str:
+        return self.cache.key(self.name, f"v{await self.version()}", str(key))
+
+    async def get(self, key: Any) -> Any:
+        return await self.cache.backend.get(await self._key(key))
+
+    async def set(self, key: Any, value: Any, ttl: Optional[float] = None):
+        await self.cache.backend.set(await self._key(key), value, ttl or self.ttl)
+
+    async def delete(self, key: Any):
+        await self.cache.backend.delete(await self._key(key))
+
+    async def get_or_set(self, key: Any, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """
+        Cached value for `key`, or the result of `loader`. Concurrent misses in
+        this worker share one load; across workers a short lock lets one load
+        while the others wait for its result. None is never cached.
+        """
+        full_key = await self._key(key)
+        backend = self.cache.backend
+        value = await backend.get(full_key)
+        if value is not None:
+            return value
+
+        in_flight = self.cache._in_flight.get(full_key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self.cache._in_flight[full_key] = future
+        try:
+            value = await self._load(full_key, loader, ttl or self.ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self.cache._in_flight.pop(full_key, None)
+
+    async def _load(self, full_key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        backend = self.cache.backend
+        lock_key = f"{full_key}:lock"
+        # The lock holds an owner token, so only the worker that took it releases it
+        token = uuid.uuid4().hex
+        locked = await backend.add(lock_key, token, CACHE_LOCK_TTL_SECONDS)
+        if not locked:
+            deadline = time.monotonic() + CACHE_LOCK_TTL_SECONDS
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                value = await backend.get(full_key)
+                if value is not None:
+                    return value
+        try:
+            value = await loader()
+            if value is not None:
+                await backend.set(full_key, value, ttl)
+            return value
+        finally:
+            if locked:
+                await backend.delete_if_equal(lock_key, token)
+
+
+class Cache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.channel = f"{CACHE_KEY_PREFIX}:invalidate"
+        # Changes whenever the backend's counters may have been reset, so
+        # version-derived identifiers (ETags) never repeat across resets
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def key(self, *parts: str) -> str:
+        return ":".join((CACHE_KEY_PREFIX,) + parts)
+
+    def namespace(self, name: str, ttl: Optional[float] = None) -> Namespace:
+        return Namespace(self, name, ttl)
+
+    async def start(self):
+        epoch_key = self.key("__epoch__")
+        await self.backend.add(epoch_key, self.epoch)
+        self.epoch = await self.backend.get(epoch_key) or self.epoch
+        await self.backend.subscribe(self.channel, self._on_broadcast)
+
+    async def close(self):
+        await self.backend.close()
+
+    async def version(self, namespace: str) -> int:
+        cached = self._versions.get(namespace)
+        if cached is not None and time.monotonic() - cached[1] < CACHE_VERSION_TTL_SECONDS:
+            return cached[0]
+        version = await self.backend.get_counter(self.key(namespace, "__version__"))
+        self._versions[namespace] = (version, time.monotonic())
+        return version
+
+    async def bump(self, namespace: str) -> int:
+        version = await self.backend.incr(self.key(namespace, "__version__"))
+        self._set_version(namespace, version)
+        await self.backend.publish(self.channel, f"{namespace}={version}")
+        return version
+
+    def _on_broadcast(self, message: str):
+        namespace, _, version = message.rpartition("=")
+        if namespace and version.isdigit():
+            self._set_version(namespace, int(version))
+
+    def _set_version(self, namespace: str, version: int):
+        # Broadcasts can arrive out of order; never step back to an older version
+        cached = self._versions.get(namespace)
+        if cached is None or version >= cached[0]:
+            self._versions[namespace] = (version, time.monotonic())
+
+
+cache: Optional[Cache] = None
+
+
+def get_cache() -> Cache:
+    global cache
+    if cache is None:
+        cache = Cache(MemoryBackend())
+    return cache
+
+
+async def start_cache():
+    global cache
+    cache = Cache(RedisBackend(CACHE_URL) if CACHE_URL else MemoryBackend())
+    await cache.start()
+
+
+async def stop_cache():
+    global cache
+    if cache:
+        await cache.close()
+        cache = None
@@ -0,0 +1,91 @@
+# modules/cohort_content.py
+
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from prisma import Prisma
+
+from modules.cache import get_cache
+from modules.fast_json import dumps
+
+# Versions make stale entries unreachable; the TTL only bounds how long they occupy the cache
+COHORT_CONTENT_CACHE_TTL_SECONDS = int(os.environ.get("COHORT_CONTENT_CACHE_TTL_SECONDS", "86400"))
+
+# Version of content that isn't scoped to one cohort (the cohort list, all quizzes)
+ALL_COHORTS = "*"
+
+
+def _namespace(cohort_id: Optional[str]):
+    # One namespace per cohort: its version is bumped by every instructor edit to that cohort
+    return get_cache().namespace(f"cohort-content:{cohort_id or ALL_COHORTS}", ttl=COHORT_CONTENT_CACHE_TTL_SECONDS)
+
+
+async def get_week_resource_ids(prisma: Prisma, cohort_id: str, week_number: int) -> List[str]:
+    """
+    Resource IDs for one week of a cohort. The whole cohort is loaded in one
+    query on first use and kept until an instructor edits its resources.
+    """
+    async def load() -> Dict[int, List[str]]:
+        resources = await prisma.resource.find_many(
+            where={
+                "cohortId": cohort_id
+            }
+        )
+        weeks = {}
+        for resource in resources:
+            weeks.setdefault(resource.weekNumber, []).append(resource.id)
+        return weeks
+
+    weeks = await _namespace(cohort_id).get_or_set("week-resources", load)
+    return weeks.get(week_number, [])
+
+
+async def content_version(cohort_id: Optional[str]) -> str:
+    return f"{get_cache().epoch}.{await _namespace(cohort_id).version()}"
+
+
+async def invalidate_cohort(cohort_id: Optional[str]):
+    """Called by instructor mutations: bumps the cohort's version and the cross-cohort one, in every worker."""
+    if cohort_id:
+        await _namespace(cohort_id).invalidate()
+    await _namespace(None).invalidate()
+
+
+async def make_etag(cohort_id: Optional[str], *key: Any) -> str:
+    digest = hashlib.sha1(repr((key, cohort_id, await content_version(cohort_id))).encode()).hexdigest()[:20]
+    # Weak, so the tag survives response compression
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+async def cached_response(request: Request, cohort_id: Optional[str], key: tuple, build: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    Serve cohort content that only changes when instructors edit it. The ETag
+    is derived from the cohort's content version, so a matching If-None-Match
+    gets a 304 and a known version is served from the shared cache, both
+    without touching the database. `build` runs only on a miss, once across
+    concurrent requests.
+    """
+    etag = await make_etag(cohort_id, *key)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    async def render() -> bytes:
+        return dumps(await build())
+
+    body = await _namespace(cohort_id).get_or_set(f"response:{etag}", render)
+    return Response(content=body, media_type="application/json", headers=headers)
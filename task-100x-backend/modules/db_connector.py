@@ -90,7 +90,12 @@ class DBConnection:
                     "role": "LEARNER",
                     "cohortId": cohort_id,
                     "type" : type,
-                    "linkedinUsername" : linkedin_username
+                    "linkedinUsername" : linkedin_username,
+                    "postStats": {
+                        "create": {
+                            "cohortId": cohort_id
+                        }
+                    }
                 }
             )
 
@@ -0,0 +1,86 @@
+# modules/fast_json.py
+
+import os
+from typing import Any, AsyncIterable, Callable, Optional, Sequence, Union
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Items serialized per chunk of a streamed list
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", "200"))
+
+
+def _default(obj: Any):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: renders with orjson instead of the stdlib json module."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def wants_ndjson(request: Request) -> bool:
+    return request.query_params.get("format") == "ndjson" or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def _pages(items: Union[Sequence, AsyncIterable[Sequence]]):
+    if isinstance(items, AsyncIterable):
+        async for page in items:
+            yield page
+        return
+    for start in range(0, len(items), STREAM_CHUNK_SIZE):
+        yield items[start:start + STREAM_CHUNK_SIZE]
+
+
+def streamed_list(
+    request: Request,
+    items: Union[Sequence, AsyncIterable[Sequence]],
+    serialize: Callable[[Any], Any] = lambda item: item,
+    envelope: Optional[dict] = None
+) -> StreamingResponse:
+    """
+    Stream a list endpoint's items as they're serialized. `items` is a list or
+    an async iterator of pages, so callers can fetch the next page while the
+    previous one is on the wire. The body is a JSON array, under "data" in
+    `envelope` when one is given, or one item per line when the client asks
+    for NDJSON (Accept: application/x-ndjson or ?format=ndjson).
+    """
+    if wants_ndjson(request):
+        async def ndjson():
+            async for page in _pages(items):
+                if page:
+                    yield b"".join(dumps(serialize(item)) + b"\n" for item in page)
+
+        return StreamingResponse(ndjson(), media_type=NDJSON_MEDIA_TYPE)
+
+    if envelope is None:
+        prefix, suffix = b"[", b"]"
+    else:
+        head = dumps(envelope)[:-1]
+        prefix, suffix = head + (b',' if envelope else b'') + b'"data":[', b"]}"
+
+    async def array():
+        yield prefix
+        first = True
+        async for page in _pages(items):
+            if not page:
+                continue
+            chunk = b",".join(dumps(serialize(item)) for item in page)
+            yield chunk if first else b"," + chunk
+            first = False
+        yield suffix
+
+    return StreamingResponse(array(), media_type="application/json")
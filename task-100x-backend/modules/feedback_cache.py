@@ -0,0 +1,106 @@
+# modules/feedback_cache.py
+
+import asyncio
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+# How many times one generated feedback text may be handed out (0 disables reuse)
+FEEDBACK_REUSE_LIMIT = int(os.environ.get("FEEDBACK_REUSE_LIMIT", "50"))
+FEEDBACK_REUSE_MAX_ENTRIES = int(os.environ.get("FEEDBACK_REUSE_MAX_ENTRIES", "2048"))
+
+# pattern key -> [feedback text, times reused]
+_entries: "OrderedDict[tuple, list]" = OrderedDict()
+_in_flight: Dict[tuple, asyncio.Future] = {}
+_stats = {"hits": 0, "misses": 0, "uncacheable": 0, "expired": 0}
+
+
+def pattern_key(quiz_id: str, quiz_version: datetime, answers) -> Optional[Tuple]:
+    """
+    Build the reuse key for an attempt: (quiz id, quiz version, sorted selected
+    option ids). Attempts with free-text answers can't share feedback and get None.
+    """
+    option_ids = []
+    for ans in answers:
+        if ans.answerText:
+            return None
+        if ans.selectedOptionId:
+            option_ids.append(ans.selectedOptionId)
+    return (quiz_id, quiz_version.isoformat(), tuple(sorted(option_ids)))
+
+
+def _take(key: tuple) -> Optional[str]:
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    if entry[1] >= FEEDBACK_REUSE_LIMIT:
+        _entries.pop(key, None)
+        _stats["expired"] += 1
+        return None
+    entry[1] += 1
+    _entries.move_to_end(key)
+    return entry[0]
+
+
+def _store(key: tuple, feedback_text: str):
+    _entries[key] = [feedback_text, 0]
+    _entries.move_to_end(key)
+    while len(_entries) > FEEDBACK_REUSE_MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+
+async def get_or_generate(key: Optional[tuple], generate: Callable[[], Awaitable[str]], cacheable: Callable[[str], bool] = lambda text: True) -> str:
+    """
+    Return reusable feedback for this answer pattern, or call `generate`.
+    Concurrent attempts with the same pattern share a single generation.
+    """
+    if key is None or FEEDBACK_REUSE_LIMIT <= 0:
+        _stats["uncacheable"] += 1
+        return await generate()
+
+    cached = _take(key)
+    if cached is not None:
+        _stats["hits"] += 1
+        return cached
+
+    in_flight = _in_flight.get(key)
+    if in_flight is not None:
+        _stats["hits"] += 1
+        return await asyncio.shield(in_flight)
+
+    _stats["misses"] += 1
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        feedback_text = await generate()
+        if cacheable(feedback_text):
+            _store(key, feedback_text)
+        future.set_result(feedback_text)
+        return feedback_text
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Waiters get the exception; don't warn about it being unretrieved
+        future.exception()
+        raise
+    finally:
+        _in_flight.pop(key, None)
+
+
+def get_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "entries": len(_entries),
+        "reuseLimit": FEEDBACK_REUSE_LIMIT,
+        "hitRatio": (_stats["hits"] / lookups) if lookups > 0 else 0.0
+    }
+
+
+def clear():
+    _entries.clear()
+    for key in _stats:
+        _stats[key] = 0
@@ -0,0 +1,183 @@
+# modules/feedback_worker.py
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from prisma import Prisma
+
+from modules import feedback_cache
+from modules.metrics import track_queue_depth
+from modules.tracing import job_span
+from modules.groq_client import generate_quiz_feedback
+
+FEEDBACK_WORKER_CONCURRENCY = int(os.environ.get("FEEDBACK_WORKER_CONCURRENCY", "4"))
+FEEDBACK_QUEUE_MAX_SIZE = int(os.environ.get("FEEDBACK_QUEUE_MAX_SIZE", "1000"))
+# Attempts submitted within this window that still lack a report are re-queued on startup
+FEEDBACK_RECOVERY_HOURS = int(os.environ.get("FEEDBACK_RECOVERY_HOURS", "24"))
+
+FEEDBACK_FALLBACK_TEXT = "Failed to generate detailed feedback. Please try again later."
+
+logger = logging.getLogger(__name__)
+
+
+class FeedbackWorker:
+    """
+    Generates quiz feedback reports in the background so quiz submission
+    doesn't wait on the LLM. A fixed pool of worker tasks drains an in-process
+    queue, which bounds the number of concurrent Groq calls.
+    """
+
+    def __init__(self, prisma: Prisma, concurrency: int = FEEDBACK_WORKER_CONCURRENCY):
+        self.prisma = prisma
+        self.concurrency = max(1, concurrency)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=FEEDBACK_QUEUE_MAX_SIZE)
+        self._tasks = []
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        await self._recover_pending()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, attempt_id: str) -> bool:
+        try:
+            self.queue.put_nowait(attempt_id)
+            return True
+        except asyncio.QueueFull:
+            logger.warning("Feedback queue full, attempt %s will be picked up on next startup", attempt_id)
+            return False
+
+    async def _recover_pending(self):
+        since = datetime.now(timezone.utc) - timedelta(hours=FEEDBACK_RECOVERY_HOURS)
+        pending = await self.prisma.quizattempt.find_many(
+            where={
+                "feedbackReport": {"is": None},
+                "submittedAt": {"gte": since}
+            },
+            order={"submittedAt": "asc"},
+            take=FEEDBACK_QUEUE_MAX_SIZE
+        )
+        for attempt in pending:
+            self.enqueue(attempt.id)
+        if pending:
+            logger.info("Re-queued %d quiz attempts awaiting feedback", len(pending))
+
+    async def _run(self):
+        while True:
+            attempt_id = await self.queue.get()
+            try:
+                with job_span("quiz_feedback", attempt_id):
+                    await self.process(attempt_id)
+            except Exception as e:
+                logger.exception("Error generating feedback for attempt %s: %s", attempt_id, e)
+            finally:
+                self.queue.task_done()
+
+    async def process(self, attempt_id: str):
+        quiz_attempt = await self.prisma.quizattempt.find_unique(
+            where={
+                "id": attempt_id
+            },
+            include={
+                "quiz": {
+                    "include": {
+                        "questions": {
+                            "include": {
+                                "options": True
+                            }
+                        }
+                    }
+                },
+                "quizAnswers": True,
+                "feedbackReport": True
+            }
+        )
+
+        if not quiz_attempt or quiz_attempt.feedbackReport:
+            return
+
+        quiz = quiz_attempt.quiz
+        quiz_details = {
+            "quiz_id": quiz.id,
+            "quiz_title": f"Quiz Week {quiz.weekNumber}",
+            "questions": [
+                {
+                    "question_id": q.id,
+                    "question_text": q.questionText,
+                    "options": [{
+                        "id": opt.id,
+                        "option_text": opt.optionText,
+                        "is_correct": opt.isCorrect
+                    } for opt in q.options]
+                } for q in quiz.questions
+            ]
+        }
+
+        attempt_details = [
+            {
+                "question_id": ans.questionId,
+                "selected_option_id": ans.selectedOptionId,
+                "answer_text": ans.answerText
+            } for ans in quiz_attempt.quizAnswers
+        ]
+
+        async def generate() -> str:
+            try:
+                return await generate_quiz_feedback(quiz_details, attempt_details)
+            except Exception as e:
+                logger.error("Error generating feedback with Groq API: %s", e)
+                return FEEDBACK_FALLBACK_TEXT
+
+        # Identical answer patterns on the same quiz version share one generation
+        feedback_text = await feedback_cache.get_or_generate(
+            feedback_cache.pattern_key(quiz.id, quiz.updatedAt, quiz_attempt.quizAnswers),
+            generate,
+            cacheable=lambda text: text != FEEDBACK_FALLBACK_TEXT
+        )
+
+        # Upsert so a report written by another worker process is never duplicated
+        await self.prisma.feedbackreport.upsert(
+            where={
+                "quizAttemptId": attempt_id
+            },
+            data={
+                "create": {
+                    "quizAttemptId": attempt_id,
+                    "reportContent": feedback_text,
+                    "createdAt": datetime.now(timezone.utc)
+                },
+                "update": {}
+            }
+        )
+
+
+feedback_worker: Optional[FeedbackWorker] = None
+
+track_queue_depth("quiz_feedback", lambda: feedback_worker.queue.qsize() if feedback_worker else 0)
+
+
+async def start_feedback_worker(prisma: Prisma):
+    global feedback_worker
+    feedback_worker = FeedbackWorker(prisma)
+    await feedback_worker.start()
+
+
+async def stop_feedback_worker():
+    global feedback_worker
+    if feedback_worker:
+        await feedback_worker.stop()
+        feedback_worker = None
+
+
+def enqueue_feedback(attempt_id: str) -> bool:
+    if feedback_worker is None:
+        logger.warning("Feedback worker not running, attempt %s will be picked up on next startup", attempt_id)
+        return False
+    return feedback_worker.enqueue(attempt_id)
@@ -1,10 +1,27 @@
+import asyncio
+import logging
 import os
-from groq import Groq
+
+from modules.logging_config import truncate
+from modules.tracing import trace_llm_client
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_client():
+    # Created on first use so the groq SDK import stays off the startup path
+    global _client
+    if _client is None:
+        from groq import Groq
+        _client = trace_llm_client(Groq(
+            api_key=os.environ.get("GROQ_API_KEY"),
+        ), "groq")
+    return _client
 
 async def generate_personalized_message(context: dict) -> str:
-    client = Groq(
-        api_key=os.environ.get("GROQ_API_KEY"),
-    )
+    client = get_client()
 
     system_prompt = """
     You are a mentor’s voice who helps mentees clearly see how each lecture moves them closer to their personal goals.  
@@ -70,7 +87,7 @@ async def generate_personalized_message(context: dict) -> str:
     )
 
     response_content = chat_completion.choices[0].message.content
-    print(f"Groq API raw response: {response_content}") # Log the raw response
+    logger.debug("Groq personalized message response", extra={"response": truncate(response_content), "sample": True})
     
     # Parse the two pointers from the response content
     pointers = {"pointer1": "", "pointer2": ""}
@@ -85,9 +102,7 @@ async def generate_personalized_message(context: dict) -> str:
     return pointers
 
 async def generate_quiz_from_transcription(transcription: str) -> dict:
-    client = Groq(
-        api_key=os.environ.get("GROQ_API_KEY"),
-    )
+    client = get_client()
 
     system_prompt = """
     You are an AI assistant specialized in generating quizzes from session transcriptions.
@@ -142,7 +157,7 @@ async def generate_quiz_from_transcription(transcription: str) -> dict:
     )
 
     response_content = chat_completion.choices[0].message.content
-    print(f"Groq API raw response: {response_content}") # Log the raw response
+    logger.debug("Groq quiz response", extra={"response": truncate(response_content)})
     
     # Extract JSON from markdown code block if present
     json_start = response_content.find('{')
@@ -150,4 +165,24 @@ async def generate_quiz_from_transcription(transcription: str) -> dict:
     if json_start != -1 and json_end != -1:
         return response_content[json_start:json_end+1]
     
-    return response_content
\ No newline at end of file
+    return response_content
+
+async def generate_quiz_feedback(quiz_details: dict, attempt_details: list) -> str:
+    client = get_client()
+
+    prompt = f"""Provide direct, informal, and honest feedback on the learner's quiz performance. Do NOT make up correct answers if the learner got a question wrong. Clearly state concepts or topics where the learner demonstrated understanding (answered correctly) and areas where they need to improve (answered incorrectly). For questions answered incorrectly, briefly explain the correct answer or concept in general terms, focusing on what they should know. The feedback should be constructive and help the learner understand their mistakes and progress. Keep it concise, not exceeding 500 characters. Do not provide question-by-question feedback.\n\nQuiz Details: {quiz_details}\nLearner's Attempt: {attempt_details}\n\nFeedback Report:"""
+
+    # The Groq SDK call is blocking, keep it off the event loop
+    chat_completion = await asyncio.to_thread(
+        client.chat.completions.create,
+        messages=[
+            {
+                "role": "user",
+                "content": prompt,
+            }
+        ],
+        model="llama-3.3-70b-versatile", # You can choose a different model if needed
+        temperature=0.7,
+        max_tokens=500,
+    )
+    return chat_completion.choices[0].message.content
@@ -0,0 +1,120 @@
+# modules/image_derivatives.py
+
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from modules.uploads import StoredFile, get_upload_backend
+
+# WhatsApp media: longest side and target size of the recompressed JPEG sent to learners
+WHATSAPP_IMAGE_MAX_DIMENSION = int(os.environ.get("WHATSAPP_IMAGE_MAX_DIMENSION", "1280"))
+WHATSAPP_IMAGE_MAX_BYTES = int(os.environ.get("WHATSAPP_IMAGE_MAX_BYTES", str(300 * 1024)))
+THUMBNAIL_MAX_DIMENSION = int(os.environ.get("THUMBNAIL_MAX_DIMENSION", "320"))
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", "2"))
+
+# Rendered derivative -> the Session field holding its URL
+DERIVATIVE_FIELDS = {"whatsapp": "whatsappImageUrl", "thumbnail": "thumbnailUrl"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _flatten(image):
+    """RGB copy of `image` upright, with any transparency on white (JPEG has no alpha)."""
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _encode_jpeg(image, quality: int) -> bytes:
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def _capped_jpeg(image, max_dimension: int, max_bytes: int) -> bytes:
+    # Lower the quality first, then the resolution, until the JPEG fits
+    image = image.copy()
+    image.thumbnail((max_dimension, max_dimension))
+    while True:
+        for quality in (85, 75, 65, 55):
+            encoded = _encode_jpeg(image, quality)
+            if len(encoded) <= max_bytes:
+                return encoded
+        if max(image.size) <= THUMBNAIL_MAX_DIMENSION:
+            return encoded
+        image.thumbnail((int(image.width * 0.75), int(image.height * 0.75)))
+
+
+def render_derivatives(data: bytes, whatsapp_max_dimension: int, whatsapp_max_bytes: int, thumbnail_max_dimension: int) -> Dict[str, bytes]:
+    """Runs in a worker process: the WhatsApp JPEG and the dashboard thumbnail of an uploaded image."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = _flatten(source)
+
+    thumbnail = image.copy()
+    thumbnail.thumbnail((thumbnail_max_dimension, thumbnail_max_dimension))
+    return {
+        "whatsapp": _capped_jpeg(image, whatsapp_max_dimension, whatsapp_max_bytes),
+        "thumbnail": _encode_jpeg(thumbnail, 80),
+    }
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # By the time the first image arrives the process runs the event loop,
+    # the log listener and span exporter threads, and the Prisma engine, and
+    # forking that is unsafe. Workers come from a clean fork server instead,
+    # which preloads this module rather than the app's __main__.
+    global _pool
+    if _pool is None:
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=context)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _read_all(file) -> bytes:
+    file.seek(0)
+    return file.read()
+
+
+async def create_derivatives(stored: StoredFile, file, backend=None) -> Dict[str, str]:
+    """
+    Render and store the derivatives of an image stored by uploads.store_image,
+    returning their URLs as Session fields. Decoding and resizing run in a
+    process pool so large images don't stall the event loop or hold the GIL.
+    Derivatives are keyed by the original's hash, so they dedupe with it: a
+    re-uploaded image whose derivatives exist isn't rendered again.
+    """
+    backend = backend or get_upload_backend()
+    keys = {name: f"{stored.sha256}-{name}.jpg" for name in DERIVATIVE_FIELDS}
+    if not stored.created and all(await asyncio.gather(*(backend.exists(key) for key in keys.values()))):
+        return {field: backend.url(keys[name]) for name, field in DERIVATIVE_FIELDS.items()}
+
+    data = await asyncio.to_thread(_read_all, file)
+    rendered = await asyncio.get_running_loop().run_in_executor(
+        _get_pool(), render_derivatives, data,
+        WHATSAPP_IMAGE_MAX_DIMENSION, WHATSAPP_IMAGE_MAX_BYTES, THUMBNAIL_MAX_DIMENSION
+    )
+
+    urls = {}
+    for name, field in DERIVATIVE_FIELDS.items():
+        await backend.save(keys[name], io.BytesIO(rendered[name]), "image/jpeg")
+        urls[field] = backend.url(keys[name])
+    return urls
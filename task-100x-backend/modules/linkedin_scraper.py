@@ -0,0 +1,593 @@
+# modules/linkedin_scraper.py
+
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Set
+
+import httpx
+from prisma import Prisma
+
+from modules.logging_config import truncate
+from modules.metrics import track_queue_depth
+from modules.post_stats import refresh_post_stats
+from modules.tracing import run_job
+
+APIFY_ACTOR_URL = "https://api.apify.com/v2/acts/curious_coder~linkedin-post-search-scraper/run-sync-get-dataset-items"
+APIFY_TIMEOUT_SECONDS = float(os.environ.get("APIFY_TIMEOUT_SECONDS", "3600"))
+LINKEDIN_SCRAPE_CONCURRENCY = int(os.environ.get("LINKEDIN_SCRAPE_CONCURRENCY", "4"))
+LINKEDIN_SCRAPE_MAX_CONCURRENCY = int(os.environ.get("LINKEDIN_SCRAPE_MAX_CONCURRENCY", "10"))
+# Profile URLs packed into one actor run; failed batches are split and retried
+LINKEDIN_SCRAPE_BATCH_SIZE = int(os.environ.get("LINKEDIN_SCRAPE_BATCH_SIZE", "10"))
+LINKEDIN_SCRAPE_MAX_BATCH_SIZE = int(os.environ.get("LINKEDIN_SCRAPE_MAX_BATCH_SIZE", "50"))
+# Users scraped more recently than this are skipped by new jobs
+LINKEDIN_SCRAPE_MIN_INTERVAL_HOURS = float(os.environ.get("LINKEDIN_SCRAPE_MIN_INTERVAL_HOURS", "20"))
+# Posts this much older than a user's newest-post watermark are not re-written
+LINKEDIN_ENGAGEMENT_REFRESH_DAYS = int(os.environ.get("LINKEDIN_ENGAGEMENT_REFRESH_DAYS", "7"))
+# Window used to estimate how often a user posts
+LINKEDIN_POSTING_RATE_DAYS = int(os.environ.get("LINKEDIN_POSTING_RATE_DAYS", "30"))
+# Most recent posts the actor fetches per profile; users with a watermark ask
+# for fewer, scaled by how many posts they're expected to have made since it
+LINKEDIN_POSTS_PER_PROFILE = int(os.environ.get("LINKEDIN_POSTS_PER_PROFILE", "5"))
+# Max profiles scraped per job run, 0 = no limit
+LINKEDIN_SCRAPE_BUDGET = int(os.environ.get("LINKEDIN_SCRAPE_BUDGET", "0"))
+# Posts are kept when a word starts with one of these tags (case-insensitive, '#' optional)
+LINKEDIN_POST_TAGS = os.environ.get("LINKEDIN_POST_TAGS", "0to100xengineers,0to100xengineer,100xengineers,100xengineer")
+# Pinged while a job runs so scale-to-zero hosting doesn't idle the instance mid-scan
+SCRAPE_KEEP_ALIVE_URL = os.environ.get("SCRAPE_KEEP_ALIVE_URL", "https://one00x-be.onrender.com/api/cohorts")
+# How often a running job stamps its heartbeat. A job whose heartbeat is older
+# than the timeout lost its worker and can be resumed by any instance
+LINKEDIN_SCRAPE_HEARTBEAT_SECONDS = float(os.environ.get("LINKEDIN_SCRAPE_HEARTBEAT_SECONDS", "30"))
+LINKEDIN_SCRAPE_HEARTBEAT_TIMEOUT_SECONDS = float(os.environ.get("LINKEDIN_SCRAPE_HEARTBEAT_TIMEOUT_SECONDS", "120"))
+
+# Apify responses that fail every run alike (bad cookie or token, quota, rate
+# limit): the job stops instead of splitting batches
+ABORT_STATUS_CODES = {401, 402, 403, 429}
+
+# Only the item fields ingestion reads are requested from the dataset
+APIFY_ITEM_FIELDS = "url,text,inputUrl,postedAtISO,numLikes,numComments"
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36"
+
+logger = logging.getLogger(__name__)
+
+# Owner id stamped on the jobs this process runs
+WORKER_ID = uuid.uuid4().hex
+
+# Running jobs in this process and their runners, keyed by job id
+_running_jobs: Dict[str, asyncio.Task] = {}
+_runners: Dict[str, "ScrapeJobRunner"] = {}
+
+# Users still waiting to be scraped across running jobs
+track_queue_depth("linkedin_scrape", lambda: sum(runner.pending_users for runner in _runners.values()))
+
+
+def profile_url(linkedin_username: str) -> str:
+    return f"https://www.linkedin.com/in/{linkedin_username}/recent-activity/all/"
+
+
+def username_from_input_url(input_url: Optional[str]) -> Optional[str]:
+    """Lower-cased profile username an actor item was scraped from."""
+    if not input_url:
+        return None
+    parts = input_url.split("/in/")
+    if len(parts) > 1:
+        return parts[1].split("/")[0].lower() or None
+    return None
+
+
+def build_actor_input(cookie: list, urls: List[str], limit_per_source: int = LINKEDIN_POSTS_PER_PROFILE) -> dict:
+    return {
+        "cookie": cookie,
+        "deepScrape": True,
+        "maxDelay": 8,
+        "minDelay": 2,
+        "proxy": {
+            "useApifyProxy": True,
+            "apifyProxyCountry": "US",
+        },
+        "rawData": False,
+        "urls": urls,
+        "limitPerSource": limit_per_source,
+        "userAgent": USER_AGENT
+    }
+
+
+def compile_tag_pattern(tags: str) -> re.Pattern:
+    """
+    One case-insensitive pattern for a comma-separated tag list. Longer tags
+    are tried first, and a match must start a word, as `#tag` or `tag`.
+    """
+    tag_list = sorted({tag.strip().lstrip("#").lower() for tag in tags.split(",") if tag.strip().lstrip("#")}, key=len, reverse=True)
+    if not tag_list:
+        # No tags configured: match nothing
+        return re.compile(r"(?!)")
+    return re.compile(r"\b(?:" + "|".join(re.escape(tag) for tag in tag_list) + ")", re.IGNORECASE)
+
+
+TAG_PATTERN = compile_tag_pattern(LINKEDIN_POST_TAGS)
+
+
+async def stream_actor_items(client: httpx.AsyncClient, cookie: list, urls: List[str], limit_per_source: int = LINKEDIN_POSTS_PER_PROFILE):
+    """
+    Run the actor and yield its dataset items one at a time. Items are
+    requested as JSON lines, trimmed to APIFY_ITEM_FIELDS, so a large run is
+    never held in memory as one payload.
+    """
+    apify_api_token = os.environ.get("APIFY_API_TOKEN")
+    async with client.stream(
+        "POST",
+        APIFY_ACTOR_URL,
+        params={"token": apify_api_token, "format": "jsonl", "fields": APIFY_ITEM_FIELDS},
+        json=build_actor_input(cookie, urls, limit_per_source)
+    ) as response:
+        if response.is_error:
+            await response.aread()
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.strip():
+                yield json.loads(line)
+
+
+def parse_posted_at(post: dict) -> datetime:
+    if "postedAtISO" in post:
+        return datetime.fromisoformat(post["postedAtISO"].replace("Z", "+00:00"))
+    return datetime.now(timezone.utc)
+
+
+class PostCollector:
+    """
+    Filters one actor run's items as they arrive, keeping tagged posts as Post
+    rows keyed by url, the users that appeared in the output, and the number
+    of items and newest and oldest postedAt seen per user. Items are routed
+    to users by their `inputUrl`, so a run may cover several profiles;
+    `user_ids_by_username` is keyed by lower-cased username. Posts older than
+    the user's entry in `cutoffs` were already ingested and are skipped.
+    """
+
+    def __init__(self, user_ids_by_username: Dict[str, str], cutoffs: Optional[Dict[str, datetime]] = None, tag_pattern: re.Pattern = TAG_PATTERN):
+        self.user_ids_by_username = user_ids_by_username
+        self.cutoffs = cutoffs or {}
+        self.tag_pattern = tag_pattern
+        self.seen: Set[str] = set()
+        self.newest: Dict[str, datetime] = {}
+        self.oldest: Dict[str, datetime] = {}
+        self.counts: Dict[str, int] = {}
+        self.items_seen = 0
+        self._rows: Dict[str, dict] = {}
+
+    def add(self, post: dict):
+        self.items_seen += 1
+        user_id = self.user_ids_by_username.get(username_from_input_url(post.get("inputUrl")))
+        if not user_id:
+            return
+        self.seen.add(user_id)
+        self.counts[user_id] = self.counts.get(user_id, 0) + 1
+        posted_at = parse_posted_at(post)
+        if "postedAtISO" in post:
+            if user_id not in self.newest or posted_at > self.newest[user_id]:
+                self.newest[user_id] = posted_at
+            if user_id not in self.oldest or posted_at < self.oldest[user_id]:
+                self.oldest[user_id] = posted_at
+
+        text = post.get("text")
+        if not text or not post.get("url") or not self.tag_pattern.search(text):
+            return
+        cutoff = self.cutoffs.get(user_id)
+        if cutoff and posted_at < cutoff:
+            return
+        self._rows[post["url"]] = {
+            "userId": user_id,
+            "url": post["url"],
+            "numLikes": post.get("numLikes") or 0,
+            "numComments": post.get("numComments") or 0,
+            "postedAt": posted_at,
+        }
+
+    def rows(self) -> List[dict]:
+        return list(self._rows.values())
+
+
+def normalize_posts(items: list, user_ids_by_username: Dict[str, str], cutoffs: Optional[Dict[str, datetime]] = None) -> List[dict]:
+    collector = PostCollector(user_ids_by_username, cutoffs)
+    for post in items:
+        collector.add(post)
+    return collector.rows()
+
+
+async def upsert_posts(prisma: Prisma, rows: List[dict]) -> Dict[str, int]:
+    """
+    Write Post rows with a single INSERT ... ON CONFLICT (url) DO UPDATE and
+    report how many were inserted and how many already existed.
+    """
+    if not rows:
+        return {"inserted": 0, "updated": 0}
+
+    values = []
+    args = []
+    for row in rows:
+        n = len(args)
+        values.append(
+            f"(${n + 1}::text, ${n + 2}::text, ${n + 3}::text, 'LINKEDIN'::\"Platform\", "
+            f"${n + 4}::int, ${n + 5}::int, (${n + 6}::timestamptz AT TIME ZONE 'UTC'))"
+        )
+        args.extend([
+            str(uuid.uuid4()),
+            row["userId"],
+            row["url"],
+            row["numLikes"],
+            row["numComments"],
+            row["postedAt"].astimezone(timezone.utc).isoformat(),
+        ])
+
+    results = await prisma.query_raw(
+        f"""
+        INSERT INTO "Post" ("id", "userId", "url", "platform", "numLikes", "numComments", "postedAt")
+        VALUES {", ".join(values)}
+        ON CONFLICT ("url") DO UPDATE SET
+            "numLikes" = EXCLUDED."numLikes",
+            "numComments" = EXCLUDED."numComments",
+            "postedAt" = EXCLUDED."postedAt"
+        RETURNING (xmax = 0) AS "inserted"
+        """,
+        *args
+    )
+    inserted = sum(1 for result in results if result["inserted"])
+    return {"inserted": inserted, "updated": len(results) - inserted}
+
+
+async def advance_watermarks(prisma: Prisma, seen: Set[str], newest: Dict[str, datetime]) -> int:
+    """
+    Move the crawl watermarks of the users that appeared in an actor run's
+    output, in one UPDATE ... FROM (VALUES ...). Profiles the actor returned
+    nothing for (private, renamed, a parse miss) keep their old watermark, so
+    they aren't pushed to the back of the queue.
+    """
+    if not seen:
+        return 0
+
+    values = []
+    args = []
+    for user_id in seen:
+        n = len(args)
+        values.append(f"(${n + 1}::text, (${n + 2}::timestamptz AT TIME ZONE 'UTC'))")
+        posted_at = newest.get(user_id)
+        args.extend([user_id, posted_at.astimezone(timezone.utc).isoformat() if posted_at else None])
+
+    return await prisma.execute_raw(
+        f"""
+        UPDATE "User" AS u SET
+            "linkedinScrapedAt" = (CURRENT_TIMESTAMP AT TIME ZONE 'UTC'),
+            "linkedinNewestPostAt" = GREATEST(u."linkedinNewestPostAt", v."newest")
+        FROM (VALUES {", ".join(values)}) AS v("id", "newest")
+        WHERE u."id" = v."id"
+        """,
+        *args
+    )
+
+
+def crawl_cutoff(user) -> Optional[datetime]:
+    """
+    Oldest postedAt worth writing for a user: their newest-post watermark, less
+    a window in which like/comment counts are still refreshed.
+    """
+    if user.linkedinNewestPostAt is None:
+        return None
+    return user.linkedinNewestPostAt - timedelta(days=LINKEDIN_ENGAGEMENT_REFRESH_DAYS)
+
+
+def posts_limit(user, recent_posts: int, now: datetime) -> int:
+    """
+    Posts to ask the actor for: enough to reach back to the user's crawl
+    cutoff at their recent posting rate, plus one. Users without a watermark
+    get the full LINKEDIN_POSTS_PER_PROFILE. A reduced limit that comes back
+    full holds the user's watermark (see held_watermarks), so a burst of posts
+    is picked up by the next crawl rather than lost behind the cutoff.
+    """
+    cutoff = crawl_cutoff(user)
+    if cutoff is None:
+        return LINKEDIN_POSTS_PER_PROFILE
+    window_days = max(0.0, (now - cutoff).total_seconds() / 86400)
+    expected = recent_posts / LINKEDIN_POSTING_RATE_DAYS * window_days
+    return max(1, min(LINKEDIN_POSTS_PER_PROFILE, math.ceil(expected) + 1))
+
+
+def held_watermarks(collector: PostCollector, users: list, limit: int) -> Set[str]:
+    """
+    Users whose run was capped below LINKEDIN_POSTS_PER_PROFILE and returned a
+    full page of posts all newer than their watermark: they may have posted
+    more since it than was fetched. Their watermark stays put, so the next
+    crawl's window (and limit) grows until it reaches back past it.
+    """
+    if limit >= LINKEDIN_POSTS_PER_PROFILE:
+        return set()
+    watermarks = {user.id: user.linkedinNewestPostAt for user in users}
+    return {
+        user_id for user_id, count in collector.counts.items()
+        if count >= limit and watermarks.get(user_id) and user_id in collector.oldest
+        and collector.oldest[user_id] > watermarks[user_id]
+    }
+
+
+async def recent_post_counts(prisma: Prisma, now: datetime, user_ids: Optional[List[str]] = None) -> Dict[str, int]:
+    """Posts per user within LINKEDIN_POSTING_RATE_DAYS, in one grouped query."""
+    where = {"postedAt": {"gte": now - timedelta(days=LINKEDIN_POSTING_RATE_DAYS)}}
+    if user_ids is not None:
+        where["userId"] = {"in": user_ids}
+    counts = await prisma.post.group_by(by=["userId"], where=where, count=True)
+    return {row["userId"]: row["_count"]["_all"] for row in counts}
+
+
+def crawl_priority(user, recent_posts: int, now: datetime) -> float:
+    """
+    Higher scrapes first: never-scraped users, then by hours since the last
+    scrape weighted by how often the user has posted recently.
+    """
+    if user.linkedinScrapedAt is None:
+        return float("inf")
+    stale_hours = (now - user.linkedinScrapedAt).total_seconds() / 3600
+    return stale_hours * (1 + recent_posts)
+
+
+class ScrapeJobRunner:
+    """
+    Scrapes the LinkedIn activity of the job's remaining users. Profiles are
+    packed `batchSize` to an actor run, with at most `concurrency` runs in
+    flight; a run that fails for its own reasons is split in half and retried
+    until single profiles fail on their own. Failures that would hit every run
+    (auth, quota, network) stop the job as INTERRUPTED instead, leaving the
+    remaining users pending. Each finished batch is written to the database and
+    recorded on the ScrapeJob row, so an interrupted job can be resumed without
+    re-scraping users it already covered.
+    """
+
+    def __init__(self, prisma: Prisma, job, cookie: list):
+        self.prisma = prisma
+        self.job = job
+        self.cookie = cookie
+        self.semaphore = asyncio.Semaphore(max(1, job.concurrency))
+        self.abort_reason: Optional[str] = None
+        self.pending_users = 0
+
+    async def run(self):
+        keep_alive_handle = asyncio.create_task(self._keep_alive())
+        heartbeat_handle = asyncio.create_task(self._heartbeat())
+        try:
+            processed = set(self.job.processedUserIds)
+            remaining_ids = [user_id for user_id in self.job.pendingUserIds if user_id not in processed]
+            if self.job.budget > 0:
+                remaining_ids = remaining_ids[:self.job.budget]
+
+            found = await self.prisma.user.find_many(
+                where={
+                    "id": {"in": remaining_ids},
+                    "linkedinUsername": {"not": None}
+                }
+            )
+            # Keep the job's priority order
+            users_by_id = {user.id: user for user in found}
+            users = [users_by_id[user_id] for user_id in remaining_ids if user_id in users_by_id]
+            self.pending_users = len(users)
+
+            await self.prisma.scrapejob.update(
+                where={"id": self.job.id},
+                data={"status": "RUNNING", "failedUserIds": {"set": []}}
+            )
+
+            # The actor's post limit applies to every profile in a run, so
+            # profiles are batched with others that need the same limit
+            now = datetime.now(timezone.utc)
+            recent_posts = await recent_post_counts(self.prisma, now, [user.id for user in users])
+            by_limit: Dict[int, list] = {}
+            for user in users:
+                by_limit.setdefault(posts_limit(user, recent_posts.get(user.id, 0), now), []).append(user)
+
+            batch_size = max(1, self.job.batchSize)
+            batches = [
+                (limit, group[i:i + batch_size])
+                for limit, group in by_limit.items()
+                for i in range(0, len(group), batch_size)
+            ]
+            async with httpx.AsyncClient(timeout=APIFY_TIMEOUT_SECONDS) as client:
+                await asyncio.gather(*(self._scrape_batch(client, batch, limit) for limit, batch in batches))
+
+            if self.abort_reason:
+                logger.warning("LinkedIn scrape job %s interrupted: %s", self.job.id, self.abort_reason)
+                await self._finish({"status": "INTERRUPTED", "error": self.abort_reason})
+                return
+
+            await self._finish({"status": "COMPLETED"})
+        except Exception as e:
+            logger.exception("LinkedIn scrape job %s failed: %s", self.job.id, e)
+            await self._finish({"status": "FAILED", "error": str(e)})
+        finally:
+            keep_alive_handle.cancel()
+            heartbeat_handle.cancel()
+            _running_jobs.pop(self.job.id, None)
+            _runners.pop(self.job.id, None)
+
+    async def _scrape_batch(self, client: httpx.AsyncClient, users: list, limit: int = LINKEDIN_POSTS_PER_PROFILE):
+        usernames = ", ".join(user.linkedinUsername for user in users)
+        async with self.semaphore:
+            if self.abort_reason:
+                # Left unprocessed, so a resumed job picks these users up
+                return
+            try:
+                collector = PostCollector(
+                    {user.linkedinUsername.lower(): user.id for user in users},
+                    {user.id: crawl_cutoff(user) for user in users}
+                )
+                async for post in stream_actor_items(client, self.cookie, [profile_url(user.linkedinUsername) for user in users], limit):
+                    collector.add(post)
+                rows = collector.rows()
+                counts = await upsert_posts(self.prisma, rows)
+                await refresh_post_stats(self.prisma, (row["userId"] for row in rows))
+                held = held_watermarks(collector, users, limit)
+                newest = {user_id: posted_at for user_id, posted_at in collector.newest.items() if user_id not in held}
+                await advance_watermarks(self.prisma, collector.seen, newest)
+                await self.prisma.scrapejob.update(
+                    where={"id": self.job.id},
+                    data={
+                        "processedUserIds": {"push": [user.id for user in users]},
+                        "postsUpserted": {"increment": counts["inserted"] + counts["updated"]},
+                        "postsInserted": {"increment": counts["inserted"]},
+                        "actorRuns": {"increment": 1}
+                    }
+                )
+                self.pending_users -= len(users)
+                return
+            except httpx.HTTPStatusError as e:
+                logger.warning("Apify API HTTP error for users %s: %s - %s", usernames, e.response.status_code, truncate(e.response.text), extra={"jobId": self.job.id})
+                if e.response.status_code in ABORT_STATUS_CODES:
+                    self.abort_reason = f"Apify API returned {e.response.status_code}"
+                    return
+            except httpx.RequestError as e:
+                logger.warning("HTTPX request error for users %s: %s", usernames, e, extra={"jobId": self.job.id})
+                self.abort_reason = f"Apify API unreachable: {e!r}"
+                return
+            except Exception as e:
+                logger.exception("An unexpected error occurred for users %s: %s", usernames, e, extra={"jobId": self.job.id})
+
+        if len(users) > 1:
+            await self.prisma.scrapejob.update(
+                where={"id": self.job.id},
+                data={"actorRuns": {"increment": 1}}
+            )
+            # Retry each half outside the semaphore slot this run held
+            middle = len(users) // 2
+            await asyncio.gather(
+                self._scrape_batch(client, users[:middle], limit),
+                self._scrape_batch(client, users[middle:], limit)
+            )
+            return
+
+        await self.prisma.scrapejob.update(
+            where={"id": self.job.id},
+            data={
+                "failedUserIds": {"push": [user.id for user in users]},
+                "actorRuns": {"increment": 1}
+            }
+        )
+        self.pending_users -= len(users)
+
+    async def _finish(self, data: dict):
+        # Only the owner sets the final status; another worker may have
+        # claimed the job after this one's heartbeat lapsed
+        await self.prisma.scrapejob.update_many(
+            where={"id": self.job.id, "ownerId": WORKER_ID},
+            data=data
+        )
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(LINKEDIN_SCRAPE_HEARTBEAT_SECONDS)
+            try:
+                owned = await self.prisma.scrapejob.update_many(
+                    where={"id": self.job.id, "ownerId": WORKER_ID},
+                    data={"heartbeatAt": datetime.now(timezone.utc)}
+                )
+            except Exception as e:
+                logger.warning("Heartbeat for LinkedIn scrape job %s failed: %s", self.job.id, e)
+                continue
+            if not owned:
+                self.abort_reason = "Job was claimed by another worker"
+                return
+
+    async def _keep_alive(self):
+        while True:
+            await asyncio.sleep(120)
+            try:
+                async with httpx.AsyncClient() as client:
+                    await client.get(SCRAPE_KEEP_ALIVE_URL)
+            except httpx.RequestError as e:
+                logger.warning("Keep-alive API call failed: %s", e)
+
+
+async def create_job(prisma: Prisma, cohort_id: Optional[str], concurrency: Optional[int], budget: Optional[int], batch_size: Optional[int] = None):
+    where_clause = {
+        "linkedinUsername": {
+            "not": None,
+        },
+    }
+    if cohort_id:
+        where_clause["cohortId"] = cohort_id
+
+    now = datetime.now(timezone.utc)
+    # Watermarks come with the users; posting rates in one grouped query
+    users = await prisma.user.find_many(where=where_clause)
+    recent_posts = await recent_post_counts(prisma, now)
+
+    fresh_after = now - timedelta(hours=LINKEDIN_SCRAPE_MIN_INTERVAL_HOURS)
+    users = [user for user in users if user.linkedinScrapedAt is None or user.linkedinScrapedAt < fresh_after]
+    users.sort(key=lambda user: crawl_priority(user, recent_posts.get(user.id, 0), now), reverse=True)
+
+    return await prisma.scrapejob.create(
+        data={
+            "status": "PENDING" if users else "COMPLETED",
+            "cohortId": cohort_id,
+            "concurrency": min(max(1, concurrency or LINKEDIN_SCRAPE_CONCURRENCY), LINKEDIN_SCRAPE_MAX_CONCURRENCY),
+            "batchSize": min(max(1, batch_size or LINKEDIN_SCRAPE_BATCH_SIZE), LINKEDIN_SCRAPE_MAX_BATCH_SIZE),
+            "budget": max(0, budget if budget is not None else LINKEDIN_SCRAPE_BUDGET),
+            "totalUsers": len(users),
+            "pendingUserIds": [user.id for user in users],
+            "processedUserIds": [],
+            "failedUserIds": [],
+            "ownerId": WORKER_ID,
+            "heartbeatAt": now
+        }
+    )
+
+
+def start_job(prisma: Prisma, job, cookie: list):
+    if job.id in _running_jobs:
+        return
+    runner = ScrapeJobRunner(prisma, job, cookie)
+    _runners[job.id] = runner
+    _running_jobs[job.id] = asyncio.create_task(run_job("linkedin_scrape", runner.run(), job.id))
+
+
+def is_running(job_id: str) -> bool:
+    return job_id in _running_jobs
+
+
+def _stale_heartbeat(now: datetime) -> dict:
+    stale_before = now - timedelta(seconds=LINKEDIN_SCRAPE_HEARTBEAT_TIMEOUT_SECONDS)
+    return {"OR": [{"heartbeatAt": None}, {"heartbeatAt": {"lt": stale_before}}]}
+
+
+async def claim_job(prisma: Prisma, job_id: str) -> bool:
+    """
+    Take ownership of a job so this process can run it. Only one of several
+    workers resuming the same job wins: the claim is a single conditional
+    update on a job that stopped, or whose owner stopped heartbeating.
+    """
+    now = datetime.now(timezone.utc)
+    claimed = await prisma.scrapejob.update_many(
+        where={
+            "id": job_id,
+            "OR": [
+                {"status": {"in": ["INTERRUPTED", "FAILED"]}},
+                {"status": {"in": ["PENDING", "RUNNING"]}, **_stale_heartbeat(now)}
+            ]
+        },
+        data={"status": "RUNNING", "ownerId": WORKER_ID, "heartbeatAt": now, "error": None}
+    )
+    return claimed > 0
+
+
+async def mark_interrupted_jobs(prisma: Prisma):
+    """
+    Called on startup. A job only runs in the process that holds its LinkedIn
+    cookie, which is never persisted; a PENDING or RUNNING job whose owner
+    stopped heartbeating lost its worker, so flag it to be resumed. Jobs other
+    instances are still running are left alone.
+    """
+    await prisma.scrapejob.update_many(
+        where={"status": {"in": ["PENDING", "RUNNING"]}, **_stale_heartbeat(datetime.now(timezone.utc))},
+        data={"status": "INTERRUPTED"}
+    )
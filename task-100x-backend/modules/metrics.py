@@ -0,0 +1,202 @@
+# modules/metrics.py
+
+import os
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HTTP_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled, by route template and status",
+    ["method", "route", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to handle an HTTP request, including a streamed body",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled", ["method"])
+
+DB_QUERIES = Counter("db_queries_total", "Prisma queries, by model and action", ["model", "action", "outcome"])
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Prisma query time, by model and action",
+    ["model", "action"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+EXTERNAL_REQUEST_DURATION = Histogram(
+    "external_request_duration_seconds", "Outbound HTTP time to response headers, by provider",
+    ["provider", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+
+# True while a Prisma query runs. The client talks to its query engine over
+# httpx, and those calls are the DB query, not outbound traffic
+in_prisma_query: ContextVar[bool] = ContextVar("in_prisma_query", default=False)
+
+JOB_QUEUE_DEPTH = Gauge("background_job_queue_depth", "Background work waiting or running, by queue", ["queue"])
+
+
+def _hostname(url: Optional[str]) -> Optional[str]:
+    return urlparse(url).hostname if url else None
+
+
+def _provider_hosts() -> Dict[str, str]:
+    hosts = {
+        "api.openai.com": "openai",
+        "api.groq.com": "groq",
+        "api.apify.com": "apify",
+        "backend.aisensy.com": "aisensy",
+        "profile-system.vercel.app": "profile-system",
+    }
+    for env, provider in (
+        ("AISENSY_API_URL", "aisensy"),
+        ("PROFILE_SYSTEM_API_BASE_URL", "profile-system"),
+        ("SUPABASE_URL", "supabase"),
+    ):
+        host = _hostname(os.environ.get(env))
+        if host:
+            hosts[host] = provider
+    return hosts
+
+
+_hosts: Optional[Dict[str, str]] = None
+
+
+def provider_for(host: str) -> str:
+    """Provider label for an outbound host; anything unrecognised is "other" to bound cardinality."""
+    global _hosts
+    if _hosts is None:
+        _hosts = _provider_hosts()
+    provider = _hosts.get(host)
+    if provider:
+        return provider
+    if host.endswith(".supabase.co"):
+        return "supabase"
+    return "other"
+
+
+def _outcome(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Request counts, latency and in-flight requests, labelled by route template rather than raw path."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "OTHER"
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            # Set by the router once it matched, so it's only known afterwards
+            route = route_template(scope)
+            REQUESTS.labels(method, route, str(status)).inc()
+            REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+
+
+def instrument_prisma(prisma):
+    """
+    Time every query the client sends. All Prisma actions, including raw
+    queries, go through the client's `_execute`.
+    """
+    execute = prisma._execute
+
+    async def timed_execute(**kwargs):
+        model = kwargs.get("model")
+        labels = (model.__name__ if model is not None else "raw", str(kwargs.get("method")))
+        outcome = "error"
+        token = in_prisma_query.set(True)
+        started = time.perf_counter()
+        try:
+            result = await execute(**kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            in_prisma_query.reset(token)
+            DB_QUERY_DURATION.labels(*labels).observe(time.perf_counter() - started)
+            DB_QUERIES.labels(*labels, outcome).inc()
+
+    prisma._execute = timed_execute
+    return prisma
+
+
+def instrument_httpx():
+    """
+    Time outbound requests per provider. Patching httpx's clients covers our
+    own calls and the OpenAI, Groq and Supabase SDKs, which all use httpx.
+    Prisma's engine calls are left out; they're timed as DB queries.
+    """
+    if getattr(httpx.AsyncClient.send, "_instrumented", False):
+        return
+    async_send = httpx.AsyncClient.send
+    sync_send = httpx.Client.send
+
+    async def send(self, request, **kwargs):
+        if in_prisma_query.get():
+            return await async_send(self, request, **kwargs)
+        provider = provider_for(request.url.host)
+        started = time.perf_counter()
+        try:
+            response = await async_send(self, request, **kwargs)
+        except Exception:
+            EXTERNAL_REQUEST_DURATION.labels(provider, "error").observe(time.perf_counter() - started)
+            raise
+        EXTERNAL_REQUEST_DURATION.labels(provider, _outcome(response.status_code)).observe(time.perf_counter() - started)
+        return response
+
+    def send_sync(self, request, **kwargs):
+        if in_prisma_query.get():
+            return sync_send(self, request, **kwargs)
+        provider = provider_for(request.url.host)
+        started = time.perf_counter()
+        try:
+            response = sync_send(self, request, **kwargs)
+        except Exception:
+            EXTERNAL_REQUEST_DURATION.labels(provider, "error").observe(time.perf_counter() - started)
+            raise
+        EXTERNAL_REQUEST_DURATION.labels(provider, _outcome(response.status_code)).observe(time.perf_counter() - started)
+        return response
+
+    send._instrumented = True
+    httpx.AsyncClient.send = send
+    httpx.Client.send = send_sync
+
+
+def track_queue_depth(queue: str, depth: Callable[[], int]):
+    """Report `depth()` as the queue's depth whenever /metrics is scraped."""
+    JOB_QUEUE_DEPTH.labels(queue).set_function(depth)
+
+
+def metrics_response() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,7 +1,21 @@
+import logging
 import os
-from openai import OpenAI
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from modules.logging_config import truncate
+from modules.tracing import trace_llm_client
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_client():
+    # The openai SDK is slow to import; load it on the first message, not at boot
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = trace_llm_client(OpenAI(api_key=os.getenv("OPENAI_API_KEY")), "openai")
+    return _client
 
 async def generate_personalized_message_openai(context: dict) -> str:
     system_prompt = """
@@ -55,7 +69,7 @@ async def generate_personalized_message_openai(context: dict) -> str:
     """
 
     try:
-        chat_completion = client.chat.completions.create(
+        chat_completion = get_client().chat.completions.create(
             messages=[
                 {
                     "role": "system",
@@ -69,7 +83,7 @@ async def generate_personalized_message_openai(context: dict) -> str:
             model="gpt-4o-mini",
         )
         response_content = chat_completion.choices[0].message.content
-        print(f"Groq API raw response: {response_content}") # Log the raw response
+        logger.debug("OpenAI personalized message response", extra={"response": truncate(response_content), "sample": True})
         
         # Parse the two pointers from the response content
         pointers = {"pointer1": "", "pointer2": ""}
@@ -83,7 +97,7 @@ async def generate_personalized_message_openai(context: dict) -> str:
     
         return pointers
     except Exception as e:
-        print(f"Error generating personalized message with OpenAI: {e}")
+        logger.error("Error generating personalized message with OpenAI: %s", e)
         return {"pointer1": "", "pointer2": ""}
 
 async def generate_project_based_message_openai(context: dict) -> str:
@@ -137,7 +151,7 @@ async def generate_project_based_message_openai(context: dict) -> str:
     """
 
     try:
-        chat_completion = client.chat.completions.create(
+        chat_completion = get_client().chat.completions.create(
             messages=[
                 {
                     "role": "system",
@@ -151,10 +165,10 @@ async def generate_project_based_message_openai(context: dict) -> str:
             model="gpt-4o-mini",
         )
         response_content = chat_completion.choices[0].message.content
-        print(f"Groq API raw response for project-based message: {response_content}")
+        logger.debug("OpenAI project-based message response", extra={"response": truncate(response_content), "sample": True})
         return response_content.strip().lstrip('- ').strip()
     except Exception as e:
-        print(f"Error generating project-based message with OpenAI: {e}")
+        logger.error("Error generating project-based message with OpenAI: %s", e)
         return ""
 
 async def generate_outcome_based_message_openai(context: dict) -> str:
@@ -208,7 +222,7 @@ async def generate_outcome_based_message_openai(context: dict) -> str:
     """
 
     try:
-        chat_completion = client.chat.completions.create(
+        chat_completion = get_client().chat.completions.create(
             messages=[
                 {
                     "role": "system",
@@ -222,8 +236,8 @@ async def generate_outcome_based_message_openai(context: dict) -> str:
             model="gpt-4o-mini",
         )
         response_content = chat_completion.choices[0].message.content
-        print(f"Groq API raw response for outcome-based message: {response_content}")
+        logger.debug("OpenAI outcome-based message response", extra={"response": truncate(response_content), "sample": True})
         return response_content.strip().lstrip('- ').strip()
     except Exception as e:
-        print(f"Error generating outcome-based message with OpenAI: {e}")
+        logger.error("Error generating outcome-based message with OpenAI: %s", e)
         return ""
\ No newline at end of file
@@ -0,0 +1,218 @@
+# modules/post_stats.py
+
+import base64
+import os
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from prisma import Prisma
+
+from modules.cache import get_cache
+
+POST_ACTIVITY_CACHE_TTL_SECONDS = int(os.environ.get("POST_ACTIVITY_CACHE_TTL_SECONDS", "86400"))
+POSTS_PAGE_SIZE = int(os.environ.get("POSTS_PAGE_SIZE", "50"))
+POSTS_MAX_PAGE_SIZE = int(os.environ.get("POSTS_MAX_PAGE_SIZE", "200"))
+
+# Stable leaderboard order shared by the list and rank queries
+STATS_ORDER = [
+    {"totalPosts": "desc"},
+    {"totalLikes": "desc"},
+    {"userId": "asc"},
+]
+
+
+async def refresh_post_stats(prisma: Prisma, user_ids: Iterable[str]) -> int:
+    """
+    Recompute the PostStats rows of the given users from their posts. Called by
+    post ingestion, so the build-in-public list never aggregates posts itself.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return 0
+
+    placeholders = ", ".join(f"${i + 1}" for i in range(len(user_ids)))
+    return await prisma.execute_raw(
+        f"""
+        INSERT INTO "PostStats" ("userId", "cohortId", "totalPosts", "totalLikes", "totalComments", "lastPostedAt", "updatedAt")
+        SELECT
+            u."id",
+            u."cohortId",
+            COUNT(p."id")::int,
+            COALESCE(SUM(p."numLikes"), 0)::int,
+            COALESCE(SUM(p."numComments"), 0)::int,
+            MAX(p."postedAt"),
+            CURRENT_TIMESTAMP
+        FROM "User" u
+        LEFT JOIN "Post" p ON p."userId" = u."id"
+        WHERE u."id" IN ({placeholders})
+        GROUP BY u."id"
+        ON CONFLICT ("userId") DO UPDATE SET
+            "cohortId" = EXCLUDED."cohortId",
+            "totalPosts" = EXCLUDED."totalPosts",
+            "totalLikes" = EXCLUDED."totalLikes",
+            "totalComments" = EXCLUDED."totalComments",
+            "lastPostedAt" = EXCLUDED."lastPostedAt",
+            "updatedAt" = EXCLUDED."updatedAt"
+        """,
+        *user_ids
+    )
+
+
+def _behind(stats) -> dict:
+    # Rows after `stats` in STATS_ORDER; the mirror of get_rank's filter
+    return {
+        "OR": [
+            {"totalPosts": {"lt": stats.totalPosts}},
+            {"totalPosts": stats.totalPosts, "totalLikes": {"lt": stats.totalLikes}},
+            {"totalPosts": stats.totalPosts, "totalLikes": stats.totalLikes, "userId": {"gt": stats.userId}},
+        ]
+    }
+
+
+async def list_post_stats(prisma: Prisma, cohort_id: Optional[str], offset: int = 0, limit: Optional[int] = None, after=None):
+    where_clause = {}
+    if cohort_id:
+        where_clause["cohortId"] = cohort_id
+    if after is not None:
+        where_clause.update(_behind(after))
+
+    return await prisma.poststats.find_many(
+        where=where_clause,
+        include={"user": True},
+        order=STATS_ORDER,
+        skip=offset,
+        take=limit
+    )
+
+
+async def iter_post_stats(prisma: Prisma, cohort_id: Optional[str], offset: int = 0, limit: Optional[int] = None, page_size: int = 500):
+    """
+    list_post_stats in pages, so a streamed response holds one page at a time.
+    Only the first page skips `offset` rows; the rest seek past the last row
+    seen in STATS_ORDER, which ends in the primary key, so no page rescans the
+    rows before it.
+    """
+    remaining = limit
+    last = None
+    while remaining is None or remaining > 0:
+        take = page_size if remaining is None else min(page_size, remaining)
+        page = await list_post_stats(prisma, cohort_id, offset if last is None else 0, take, after=last)
+        if page:
+            yield page
+        if len(page) < take:
+            return
+        last = page[-1]
+        if remaining is not None:
+            remaining -= len(page)
+
+
+async def get_post_stats(prisma: Prisma, user_id: str):
+    stats = await prisma.poststats.find_unique(where={"userId": user_id})
+    if stats is None:
+        # Users created outside the app's create paths; build their row on first read
+        await refresh_post_stats(prisma, [user_id])
+        stats = await prisma.poststats.find_unique(where={"userId": user_id})
+    return stats
+
+
+async def get_rank(prisma: Prisma, stats) -> int:
+    """
+    1-based leaderboard position in STATS_ORDER: one indexed count of the users
+    ahead, with ties on posts broken by likes and then by user id.
+    """
+    ahead = await prisma.poststats.count(
+        where={
+            "OR": [
+                {"totalPosts": {"gt": stats.totalPosts}},
+                {"totalPosts": stats.totalPosts, "totalLikes": {"gt": stats.totalLikes}},
+                {"totalPosts": stats.totalPosts, "totalLikes": stats.totalLikes, "userId": {"lt": stats.userId}},
+            ]
+        }
+    )
+    return ahead + 1
+
+
+async def _load_activity(prisma: Prisma, user_id: str) -> dict:
+    days = await prisma.query_raw(
+        """
+        SELECT to_char(date_trunc('day', "postedAt"), 'YYYY-MM-DD') AS "day", COUNT(*)::int AS "count"
+        FROM "Post"
+        WHERE "userId" = $1
+        GROUP BY 1
+        ORDER BY 1
+        """,
+        user_id
+    )
+    # Gaps and islands: consecutive days share the same (day - row number)
+    streaks = await prisma.query_raw(
+        """
+        WITH days AS (
+            SELECT DISTINCT date_trunc('day', "postedAt")::date AS "day"
+            FROM "Post"
+            WHERE "userId" = $1
+        ), islands AS (
+            SELECT "day" - (ROW_NUMBER() OVER (ORDER BY "day"))::int AS "island"
+            FROM days
+        )
+        SELECT COALESCE(MAX("length"), 0)::int AS "longestStreak"
+        FROM (SELECT COUNT(*) AS "length" FROM islands GROUP BY "island") lengths
+        """,
+        user_id
+    )
+    return {
+        "heatmap": {row["day"]: row["count"] for row in days},
+        "longestStreak": streaks[0]["longestStreak"] if streaks else 0,
+    }
+
+
+async def get_post_activity(prisma: Prisma, stats) -> dict:
+    """
+    Day-bucketed post counts and the longest posting streak for a user, cached
+    until their PostStats row changes. The key carries the row's updatedAt,
+    which every refresh moves, so ingest in any worker retires the entry.
+    """
+    return await get_cache().namespace("post-activity", ttl=POST_ACTIVITY_CACHE_TTL_SECONDS).get_or_set(
+        f"{stats.userId}:{stats.updatedAt.isoformat()}",
+        lambda: _load_activity(prisma, stats.userId)
+    )
+
+
+def encode_post_cursor(post) -> str:
+    return base64.urlsafe_b64encode(f"{post.postedAt.isoformat()}|{post.id}".encode()).decode()
+
+
+def decode_post_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError for a cursor this module didn't issue."""
+    try:
+        posted_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(posted_at), post_id
+    except (UnicodeDecodeError, ValueError, base64.binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def list_user_posts(prisma: Prisma, user_id: str, cursor: Optional[str] = None, limit: Optional[int] = None, has_reacted: Optional[bool] = None) -> Tuple[List, Optional[str]]:
+    """
+    One page of a user's posts, newest first, keyset-paginated on
+    (postedAt, id) over the (userId, postedAt, id) index. Returns the posts
+    and the cursor for the next page, or None on the last page.
+    """
+    page_size = min(max(1, limit or POSTS_PAGE_SIZE), POSTS_MAX_PAGE_SIZE)
+    where_clause = {"userId": user_id}
+    if has_reacted is not None:
+        where_clause["hasReacted"] = has_reacted
+    if cursor:
+        posted_at, post_id = decode_post_cursor(cursor)
+        where_clause["OR"] = [
+            {"postedAt": {"lt": posted_at}},
+            {"postedAt": posted_at, "id": {"lt": post_id}},
+        ]
+
+    posts = await prisma.post.find_many(
+        where=where_clause,
+        order=[{"postedAt": "desc"}, {"id": "desc"}],
+        take=page_size + 1
+    )
+    if len(posts) > page_size:
+        posts = posts[:page_size]
+        return posts, encode_post_cursor(posts[-1])
+    return posts, None
@@ -0,0 +1,127 @@
+# modules/quiz_cache.py
+
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+QUIZ_CACHE_MAX_ENTRIES = int(os.environ.get("QUIZ_CACHE_MAX_ENTRIES", "256"))
+
+# quiz_id -> (updatedAt, learner-safe JSON bytes), least recently used first
+_learner_payloads: "OrderedDict[str, tuple]" = OrderedDict()
+# quiz_id -> (updatedAt, {question_id: frozenset(correct option ids)})
+_answer_keys: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def build_learner_payload(quiz) -> bytes:
+    """
+    Serialize a quiz (with questions and options loaded) into the JSON body
+    served to learners. Option correctness is never included.
+    """
+    payload = {
+        "id": quiz.id,
+        "cohortId": quiz.cohortId,
+        "weekNumber": quiz.weekNumber,
+        "questions": [
+            {
+                "id": q.id,
+                "text": q.questionText,
+                "options": [{"id": opt.id, "text": opt.optionText} for opt in q.options],
+                "type": q.questionType
+            } for q in quiz.questions
+        ]
+    }
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def build_answer_key(quiz) -> Dict[str, FrozenSet[str]]:
+    """
+    Map every question of the quiz to the set of its correct option IDs.
+    Questions without correct options (e.g. free text) map to an empty set.
+    """
+    return {
+        q.id: frozenset(opt.id for opt in q.options if opt.isCorrect)
+        for q in quiz.questions
+    }
+
+
+def score_answers(answer_key: Dict[str, FrozenSet[str]], answers) -> Tuple[int, List[bool]]:
+    """
+    Score submitted answers against an answer key.
+
+    Returns:
+        tuple: (number of correct answers, per-answer correctness in input order)
+    """
+    correctness = [
+        ans.selectedOptionId is not None and ans.selectedOptionId in answer_key.get(ans.questionId, ())
+        for ans in answers
+    ]
+    return sum(correctness), correctness
+
+
+def _get(entries: OrderedDict, quiz_id: str, updated_at: datetime):
+    entry = entries.get(quiz_id)
+    if entry is None:
+        return None
+    if entry[0] != updated_at:
+        # Quiz was edited since this entry was built
+        entries.pop(quiz_id, None)
+        return None
+    entries.move_to_end(quiz_id)
+    return entry[1]
+
+
+def _put(entries: OrderedDict, quiz_id: str, updated_at: datetime, value):
+    entries[quiz_id] = (updated_at, value)
+    entries.move_to_end(quiz_id)
+    while len(entries) > QUIZ_CACHE_MAX_ENTRIES:
+        entries.popitem(last=False)
+    return value
+
+
+def get_learner_payload(quiz_id: str, updated_at: datetime) -> Optional[bytes]:
+    return _get(_learner_payloads, quiz_id, updated_at)
+
+
+def store_learner_payload(quiz) -> bytes:
+    return _put(_learner_payloads, quiz.id, quiz.updatedAt, build_learner_payload(quiz))
+
+
+def get_answer_key(quiz_id: str, updated_at: datetime) -> Optional[Dict[str, FrozenSet[str]]]:
+    return _get(_answer_keys, quiz_id, updated_at)
+
+
+def store_answer_key(quiz) -> Dict[str, FrozenSet[str]]:
+    return _put(_answer_keys, quiz.id, quiz.updatedAt, build_answer_key(quiz))
+
+
+async def load_answer_key(prisma, quiz_id: str, updated_at: datetime) -> Optional[Dict[str, FrozenSet[str]]]:
+    """
+    Return the cached answer key for this quiz version, loading the question
+    and option tree from the database only on a miss.
+    """
+    answer_key = get_answer_key(quiz_id, updated_at)
+    if answer_key is not None:
+        return answer_key
+
+    quiz = await prisma.quiz.find_unique(
+        where={
+            "id": quiz_id
+        },
+        include={
+            "questions": {
+                "include": {
+                    "options": True
+                }
+            }
+        }
+    )
+    if not quiz:
+        return None
+    return store_answer_key(quiz)
+
+
+def invalidate_quiz(quiz_id: str):
+    _learner_payloads.pop(quiz_id, None)
+    _answer_keys.pop(quiz_id, None)
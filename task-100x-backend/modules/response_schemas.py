@@ -0,0 +1,107 @@
+# modules/response_schemas.py
+#
+# Slim response schemas for the heaviest read endpoints. Only fields the UI
+# reads are declared; FastAPI drops everything else from the Prisma models
+# (timestamps, foreign keys, and the user's password hash on notifications).
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class PlanResource(BaseModel):
+    id: str
+    title: str
+    url: str
+    type: str
+    duration: int
+    tags: List[str]
+    weekNumber: int
+    isOptional: bool = False
+
+
+class PlanTask(BaseModel):
+    id: str
+    resourceId: Optional[str] = None
+    quizId: Optional[str] = None
+    status: str
+    assignedDate: Optional[datetime] = None
+    completedAt: Optional[datetime] = None
+    time_spent_seconds: int = 0
+    resource: Optional[PlanResource] = None
+
+
+class PlanData(BaseModel):
+    id: str
+    userId: str
+    cohortId: str
+    weekNumber: Optional[int] = None
+    createdAt: datetime
+    tasks: List[PlanTask] = []
+
+
+class PlanResponse(BaseModel):
+    success: bool
+    data: Optional[PlanData] = None
+    message: str
+
+
+class NotificationLaunchpad(BaseModel):
+    studyStream: str
+    expectedOutcomes: str
+
+
+class NotificationUser(BaseModel):
+    id: str
+    name: Optional[str] = None
+    email: str
+    launchpad: Optional[NotificationLaunchpad] = None
+
+
+class NotificationSession(BaseModel):
+    id: str
+    title: str
+    weekNumber: int
+
+
+class NotificationData(BaseModel):
+    id: str
+    studentId: str
+    sessionId: str
+    message: str
+    status: str
+    createdAt: datetime
+    user: Optional[NotificationUser] = None
+    session: Optional[NotificationSession] = None
+
+
+class SessionNotificationsResponse(BaseModel):
+    message: str
+    data: List[NotificationData]
+
+
+class QuizOptionData(BaseModel):
+    id: str
+    optionText: str
+    isCorrect: bool
+
+
+class QuizQuestionData(BaseModel):
+    id: str
+    questionText: str
+    questionType: str
+    options: List[QuizOptionData] = []
+
+
+class QuizData(BaseModel):
+    id: str
+    cohortId: str
+    weekNumber: int
+    questions: List[QuizQuestionData] = []
+
+
+class QuizListResponse(BaseModel):
+    success: bool
+    data: List[QuizData]
+    message: str
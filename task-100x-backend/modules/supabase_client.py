@@ -0,0 +1,22 @@
+# modules/supabase_client.py
+
+import os
+
+_client = None
+
+
+def get_supabase_client():
+    """
+    The shared Supabase client, created on first use so the SDK import and the
+    env check stay off the startup path.
+    """
+    global _client
+    if _client is None:
+        supabase_url = os.environ.get("SUPABASE_URL")
+        supabase_key = os.environ.get("SUPABASE_KEY")
+        if not supabase_url or not supabase_key:
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY environment variables must be set")
+
+        from supabase import create_client
+        _client = create_client(supabase_url, supabase_key)
+    return _client
@@ -0,0 +1,273 @@
+# modules/tracing.py
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+import httpx
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from opentelemetry.propagate import extract
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Link, SpanKind, Status, StatusCode, format_span_id, format_trace_id
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from modules.logging_config import request_id
+from modules.metrics import HTTP_METHODS, in_prisma_query, provider_for, route_template
+
+# "none" (spans are no-ops), "otlp" (OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT,
+# a collector on localhost:4318 by default) or "file" (JSON lines in TRACE_FILE)
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "none")
+# Fraction of requests and jobs traced. Spans inside a trace follow its root's
+# decision, and a caller's `traceparent` header overrides it
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_FILE = os.environ.get("TRACE_FILE", "traces.jsonl")
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "task-100x-backend")
+
+# Resolves to the provider installed by setup_tracing; a no-op until then
+tracer = trace.get_tracer(SERVICE_NAME)
+
+_provider: Optional[TracerProvider] = None
+
+
+def _span_record(span: ReadableSpan) -> dict:
+    return {
+        "trace_id": format_trace_id(span.context.trace_id),
+        "span_id": format_span_id(span.context.span_id),
+        "parent_id": format_span_id(span.parent.span_id) if span.parent else None,
+        "name": span.name,
+        "kind": span.kind.name,
+        "start_ns": span.start_time,
+        "end_ns": span.end_time,
+        "status": span.status.status_code.name,
+        "attributes": dict(span.attributes or {}),
+        "links": [format_trace_id(link.context.trace_id) for link in span.links],
+    }
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends finished spans as JSON lines; benchmarks/trace_waterfall.py renders them."""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(_span_record(span), default=str) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+def setup_tracing(exporter: str = TRACE_EXPORTER, sample_rate: float = TRACE_SAMPLE_RATE):
+    """
+    Install the tracer provider. Spans are exported in batches from a
+    background thread, so finishing a span never waits on the exporter.
+    """
+    global _provider
+    if _provider is not None or exporter == "none":
+        return
+
+    if exporter == "otlp":
+        # The OTLP exporter pulls in protobuf; only load it when it's used
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        span_exporter = OTLPSpanExporter()
+    elif exporter == "file":
+        span_exporter = FileSpanExporter()
+    else:
+        raise ValueError(f"Unknown TRACE_EXPORTER {exporter!r}, expected none, otlp or file")
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(sample_rate))
+    )
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(_provider)
+
+
+def stop_tracing():
+    """Export the spans still buffered; called on shutdown."""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def _attributes(**attributes) -> dict:
+    # Span attributes can't be None
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+class TracingMiddleware:
+    """
+    Root span per request, named by route template. Runs inside
+    RequestIdMiddleware so the span carries the request's X-Request-ID, which
+    is how a request's waterfall is looked up.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "OTHER"
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            method, context=extract(carrier), kind=SpanKind.SERVER,
+            attributes=_attributes(**{"http.request.method": method, "url.path": scope["path"], "request.id": request_id.get()})
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = route_template(scope)
+                span.update_name(f"{method} {route}")
+                span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
+
+
+def trace_prisma(prisma):
+    """A client span per Prisma query, wrapping the same `_execute` as metrics.instrument_prisma."""
+    execute = prisma._execute
+
+    async def traced_execute(**kwargs):
+        model = kwargs.get("model")
+        model_name = model.__name__ if model is not None else "raw"
+        action = str(kwargs.get("method"))
+        token = in_prisma_query.set(True)
+        try:
+            with tracer.start_as_current_span(
+                f"prisma {model_name}.{action}", kind=SpanKind.CLIENT,
+                attributes={"db.system": "postgresql", "db.collection.name": model_name, "db.operation.name": action}
+            ):
+                return await execute(**kwargs)
+        finally:
+            in_prisma_query.reset(token)
+
+    prisma._execute = traced_execute
+    return prisma
+
+
+@contextmanager
+def _http_span(request: httpx.Request):
+    # Path only: query strings carry emails and API tokens
+    provider = provider_for(request.url.host)
+    with tracer.start_as_current_span(
+        f"{request.method} {provider}", kind=SpanKind.CLIENT,
+        attributes={
+            "http.request.method": request.method,
+            "server.address": request.url.host,
+            "url.path": request.url.path,
+            "peer.service": provider,
+        }
+    ) as span:
+        yield span
+
+
+def _record_response(span, response: httpx.Response):
+    span.set_attribute("http.response.status_code", response.status_code)
+    if response.status_code >= 500:
+        span.set_status(Status(StatusCode.ERROR))
+
+
+def trace_httpx():
+    """
+    A client span per outbound request, covering our calls and the SDKs built
+    on httpx. Prisma's engine calls already have their query's span.
+    """
+    if getattr(httpx.AsyncClient.send, "_traced", False):
+        return
+    async_send = httpx.AsyncClient.send
+    sync_send = httpx.Client.send
+
+    async def send(self, request, **kwargs):
+        if in_prisma_query.get():
+            return await async_send(self, request, **kwargs)
+        with _http_span(request) as span:
+            response = await async_send(self, request, **kwargs)
+            _record_response(span, response)
+            return response
+
+    def send_sync(self, request, **kwargs):
+        if in_prisma_query.get():
+            return sync_send(self, request, **kwargs)
+        with _http_span(request) as span:
+            response = sync_send(self, request, **kwargs)
+            _record_response(span, response)
+            return response
+
+    send._traced = True
+    send._instrumented = getattr(async_send, "_instrumented", False)
+    httpx.AsyncClient.send = send
+    httpx.Client.send = send_sync
+
+
+def trace_llm_client(client, system: str):
+    """
+    Wrap `client.chat.completions.create` (the OpenAI and Groq SDKs share the
+    shape) in a span recording the model and token usage. The HTTP span of
+    the call nests under it.
+    """
+    completions = client.chat.completions
+    create = completions.create
+
+    def traced_create(*args, **kwargs):
+        model = kwargs.get("model")
+        with tracer.start_as_current_span(
+            f"chat {model}", kind=SpanKind.CLIENT,
+            attributes=_attributes(**{"gen_ai.system": system, "gen_ai.operation.name": "chat", "gen_ai.request.model": model})
+        ) as span:
+            completion = create(*args, **kwargs)
+            usage = getattr(completion, "usage", None)
+            if usage is not None:
+                span.set_attribute("gen_ai.usage.input_tokens", usage.prompt_tokens)
+                span.set_attribute("gen_ai.usage.output_tokens", usage.completion_tokens)
+            return completion
+
+    completions.create = traced_create
+    return client
+
+
+@contextmanager
+def job_span(name: str, job_id: Optional[str] = None):
+    """
+    Root span for a unit of background work. Jobs outlive the request that
+    started them, so each gets its own trace (and its own sampling decision),
+    linked to the request's span when there is one.
+    """
+    started_by = trace.get_current_span().get_span_context()
+    with tracer.start_as_current_span(
+        f"job {name}", context=otel_context.Context(), kind=SpanKind.CONSUMER,
+        links=[Link(started_by)] if started_by.is_valid else None,
+        attributes=_attributes(**{"job.name": name, "job.id": job_id})
+    ) as span:
+        yield span
+
+
+async def run_job(name: str, coro, job_id: Optional[str] = None):
+    """Await `coro` inside a job span; for work handed to asyncio.create_task."""
+    with job_span(name, job_id):
+        return await coro
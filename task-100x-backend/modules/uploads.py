@@ -0,0 +1,178 @@
+# modules/uploads.py
+
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from fastapi import UploadFile
+
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+# "supabase" (the public bucket below) or "local" (served from /uploads)
+UPLOAD_BACKEND = os.environ.get("UPLOAD_BACKEND", "supabase")
+UPLOAD_BUCKET = os.environ.get("UPLOAD_BUCKET", "test")
+UPLOAD_LOCAL_DIR = os.environ.get("UPLOAD_LOCAL_DIR", "uploads")
+
+# Detected from the file's leading bytes; the client's declared type must agree
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+)
+
+# Non-standard types some browsers and clients send
+DECLARED_TYPE_ALIASES = {"image/jpg": "image/jpeg", "image/pjpeg": "image/jpeg"}
+
+
+class UploadError(Exception):
+    """A rejected upload; status_code is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class StoredFile:
+    key: str
+    url: str
+    sha256: str
+    size: int
+    content_type: str
+    # False when an identical file was already stored under the same key
+    created: bool
+
+
+def sniff_image_type(head: bytes) -> Optional[tuple]:
+    for signature, content_type, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    return None
+
+
+def _copy_to(source: BinaryIO, destination: str):
+    source.seek(0)
+    with open(destination, "wb") as out:
+        shutil.copyfileobj(source, out, UPLOAD_CHUNK_SIZE)
+
+
+class LocalUploadBackend:
+    def __init__(self, directory: str = UPLOAD_LOCAL_DIR, url_prefix: str = "/uploads"):
+        self.directory = directory
+        self.url_prefix = url_prefix
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.directory, key))
+
+    def _save(self, key: str, source: BinaryIO) -> bool:
+        path = os.path.join(self.directory, key)
+        if os.path.exists(path):
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        # Written under a temporary name so a half-copied file is never served
+        partial = f"{path}.{os.getpid()}.partial"
+        _copy_to(source, partial)
+        os.replace(partial, path)
+        return True
+
+    async def save(self, key: str, source: BinaryIO, content_type: str) -> bool:
+        return await asyncio.to_thread(self._save, key, source)
+
+
+class SupabaseUploadBackend:
+    def __init__(self, bucket: str = UPLOAD_BUCKET):
+        self.bucket = bucket
+
+    def _storage(self):
+        from modules.supabase_client import get_supabase_client
+        return get_supabase_client().storage.from_(self.bucket)
+
+    def url(self, key: str) -> str:
+        return self._storage().get_public_url(key)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._storage().exists, key)
+
+    def _save(self, key: str, source: BinaryIO, content_type: str) -> bool:
+        # Keys are content hashes, so an existing object is this same file
+        storage = self._storage()
+        if storage.exists(key):
+            return False
+        # The SDK streams a file path from disk, so spool the upload there first
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+        os.close(fd)
+        try:
+            _copy_to(source, path)
+            storage.upload(key, path, {"content-type": content_type, "upsert": "false"})
+            return True
+        except Exception:
+            # Lost a race with a concurrent upload of the same file
+            if storage.exists(key):
+                return False
+            raise
+        finally:
+            os.remove(path)
+
+    async def save(self, key: str, source: BinaryIO, content_type: str) -> bool:
+        # The Supabase SDK is synchronous, keep it off the event loop
+        return await asyncio.to_thread(self._save, key, source, content_type)
+
+
+_backend = None
+
+
+def get_upload_backend():
+    global _backend
+    if _backend is None:
+        _backend = LocalUploadBackend() if UPLOAD_BACKEND == "local" else SupabaseUploadBackend()
+    return _backend
+
+
+async def store_image(upload: UploadFile, backend=None, max_bytes: int = UPLOAD_MAX_BYTES) -> StoredFile:
+    """
+    Store an uploaded image under its sha256, so re-uploading the same image
+    reuses the stored object. The upload is read in chunks to hash it and
+    enforce `max_bytes`, then streamed to the backend from its spool file;
+    it is never held in memory whole. Raises UploadError for files that are
+    too large or aren't a supported image.
+    """
+    backend = backend or get_upload_backend()
+
+    await upload.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if not head:
+            head = chunk[:16]
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadError(f"Image is larger than {max_bytes // (1024 * 1024)} MB", status_code=413)
+        digest.update(chunk)
+
+    if size == 0:
+        raise UploadError("Image is empty")
+    detected = sniff_image_type(head)
+    declared = (upload.content_type or "").split(";")[0].strip().lower()
+    declared = DECLARED_TYPE_ALIASES.get(declared, declared)
+    if detected is None or (declared and declared != detected[0] and declared != "application/octet-stream"):
+        raise UploadError("Only JPEG, PNG, GIF and WebP images are supported", status_code=415)
+
+    content_type, extension = detected
+    sha256 = digest.hexdigest()
+    key = f"{sha256}{extension}"
+    created = await backend.save(key, upload.file, content_type)
+    return StoredFile(key=key, url=backend.url(key), sha256=sha256, size=size, content_type=content_type, created=created)
@@ -89,7 +89,12 @@ async def signup(user: UserCreate, prisma: Prisma = Depends(get_db)):
             "role": user.role,
             "cohortId": user.cohortId,
             "name": user.name,
-            "phoneNumber": user.phoneNumber
+            "phoneNumber": user.phoneNumber,
+            "postStats": {
+                "create": {
+                    "cohortId": user.cohortId
+                }
+            }
         }
     )
     
@@ -1,6 +1,4 @@
-import uuid
-import traceback
-from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request, Response
 from pydantic import BaseModel
 from prisma import Prisma
 from main import get_prisma_client
@@ -9,7 +7,6 @@ import asyncio
 from datetime import datetime, timezone, timedelta
 import os
 import time
-import shutil
 from fastapi.responses import JSONResponse
 from collections import defaultdict
 from typing import List
@@ -22,169 +19,94 @@ from modules.openai_client import generate_personalized_message_openai, generate
 from routes.auth import get_current_user
 from modules.aisensy_client import send_whatsapp_message
 from modules.db_connector import DBConnection
-from supabase import create_client, Client
+from modules import quiz_cache, feedback_cache, cohort_content, linkedin_scraper, post_stats, uploads, image_derivatives, tracing
+from modules.response_schemas import SessionNotificationsResponse, NotificationData, QuizListResponse
+from modules.fast_json import streamed_list
+from modules.logging_config import truncate
 import httpx
 import json
+import logging
 import os
 
 PROFILE_SYSTEM_API_BASE_URL = os.environ.get("PROFILE_SYSTEM_API_BASE_URL", "https://profile-system.vercel.app") # Default to localhost for development
 
-# Supabase Initialization
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("SUPABASE_URL and SUPABASE_KEY environment variables must be set")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 class LinkedInCookie(BaseModel):
     linkedinCookie: str
 
-@router.post("/build-in-public/fetch-linkedin-posts")
-async def fetch_linkedin_posts(linkedin_cookie_data: LinkedInCookie, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
+class ScrapeJobCreate(LinkedInCookie):
+    cohortId: Optional[str] = None
+    concurrency: Optional[int] = None
+    batchSize: Optional[int] = None
+    budget: Optional[int] = None
+
+def _parse_linkedin_cookie(linkedin_cookie: str) -> list:
+    try:
+        return json.loads(linkedin_cookie)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid LinkedIn cookie format. Must be a JSON string.")
+
+def _scrape_job_response(job) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "cohortId": job.cohortId,
+        "concurrency": job.concurrency,
+        "batchSize": job.batchSize,
+        "budget": job.budget,
+        "totalUsers": job.totalUsers,
+        "processedUsers": len(job.processedUserIds),
+        "failedUsers": len(job.failedUserIds),
+        "postsUpserted": job.postsUpserted,
+        "postsInserted": job.postsInserted,
+        "actorRuns": job.actorRuns,
+        "error": job.error,
+        "createdAt": job.createdAt,
+        "updatedAt": job.updatedAt
+    }
+
+@router.post("/build-in-public/scrape-jobs")
+async def create_linkedin_scrape_job(job_data: ScrapeJobCreate, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
     if current_user.role != "INSTRUCTOR":
         raise HTTPException(status_code=403, detail="Only instructors can fetch LinkedIn posts")
 
-    try:
-        # Fetch all users with a linkedinUsername from the database
-        users = await prisma.user.find_many(
-            where={
-                "linkedinUsername": {
-                    "not": None,
-                },
-            },
-        )
+    cookie = _parse_linkedin_cookie(job_data.linkedinCookie)
+    job = await linkedin_scraper.create_job(prisma, job_data.cohortId, job_data.concurrency, job_data.budget, job_data.batchSize)
+    if job.totalUsers == 0:
+        return {"success": True, "data": _scrape_job_response(job), "message": "No users are due for a LinkedIn scrape."}
 
-        if not users:
-            keep_alive_handle.cancel() # Cancel the task if no users
-            return {"message": "No LinkedIn usernames found to fetch posts for.", "data": []}
+    linkedin_scraper.start_job(prisma, job, cookie)
+    return {"success": True, "data": _scrape_job_response(job), "message": "LinkedIn scrape job started"}
 
-        all_apify_data = []
-        processed_users_count = 0
-        
-        users_to_process = []
-        for user in users:
-            if user.linkedinUsername:
-                today = datetime.now(timezone.utc).date()
-                existing_posts_today = await prisma.post.find_first(
-                    where={
-                        "userId": user.id,
-                        "createdAt": {
-                            "gte": datetime.combine(today, datetime.min.time(), tzinfo=timezone.utc),
-                            "lt": datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc),
-                        },
-                    }
-                )
-                if not existing_posts_today:
-                    users_to_process.append(user)
-        
-        for user in users_to_process:
-            if processed_users_count >= 20:
-                print("Reached limit of 20 users for post fetching.")
-                break
-
-            try:
-                url = f"https://www.linkedin.com/in/{user.linkedinUsername}/recent-activity/all/"
-                urls = [url] # Process one URL at a time
-
-                apify_request_body = {
-                    "cookie": json.loads(linkedin_cookie_data.linkedinCookie),
-                    "deepScrape": True,
-                    "maxDelay": 8,
-                    "minDelay": 2,
-                    "proxy": {
-                        "useApifyProxy": True,
-                        "apifyProxyCountry": "US",
-                    },
-                    "rawData": False,
-                    "urls": urls,
-                    "limitPerSource" : 5
-                }
+@router.get("/build-in-public/scrape-jobs/{job_id}")
+async def get_linkedin_scrape_job(job_id: str, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
+    if current_user.role != "INSTRUCTOR":
+        raise HTTPException(status_code=403, detail="Only instructors can view LinkedIn scrape jobs")
 
-                apify_api_token = os.environ.get("APIFY_API_TOKEN")
-                apify_api_url = f"https://api.apify.com/v2/acts/curious_coder~linkedin-post-search-scraper/run-sync-get-dataset-items?token={apify_api_token}"
-
-                async with httpx.AsyncClient(timeout=3600.0) as client:
-                    apify_response = await client.post(apify_api_url, json=apify_request_body)
-                    apify_response.raise_for_status()
-
-                apify_data = apify_response.json()
-                all_apify_data.extend(apify_data)
-
-                # Process and store the fetched LinkedIn posts in your database
-                for post in apify_data:
-                    if "text" in post and post["text"] is not None:
-                        post_text_lower = post["text"].lower()
-                        if re.search(r'\b(0to100xengineers|0to100xengineer|0to100xEngineers|0to100xEngineer|100xengineer|100xengineers|100xEngineers|#100xengineers|#0to100xengineers|#0to100xengineer|#0to100xEngineers|#0to100xEngineer)', post_text_lower, re.IGNORECASE):
-                            linkedin_username = None
-                            if "inputUrl" in post and post["inputUrl"]:
-                                parts = post["inputUrl"].split("/in/")
-                                if len(parts) > 1:
-                                    linkedin_username = parts[1].split("/")[0]
-
-                                if linkedin_username:
-                                    user_id = next((u.id for u in users if u.linkedinUsername == linkedin_username), None)
-
-                                    if user_id:
-                                        await prisma.post.upsert(
-                                            where={
-                                                "url": post["url"]
-                                            },
-                                            data={
-                                                "create": {
-                                                    "userId": user_id,
-                                                    "url": post["url"],
-                                                    "platform": "LINKEDIN",
-                                                    "numLikes": post.get("numLikes", 0),
-                                                    "numComments": post.get("numComments", 0),
-                                                    "postedAt": datetime.fromisoformat(post["postedAtISO"].replace("Z", "+00:00")) if "postedAtISO" in post else datetime.now(timezone.utc),
-                                                },
-                                                "update": {
-                                                    "numLikes": post.get("numLikes", 0),
-                                                    "numComments": post.get("numComments", 0),
-                                                    "postedAt": datetime.fromisoformat(post["postedAtISO"].replace("Z", "+00:00")) if "postedAtISO" in post else datetime.now(timezone.utc),
-                                                },
-                                            }
-                                        )
-                    processed_users_count += 1
-            except httpx.HTTPStatusError as e:
-                print(f"Apify API HTTP error for user {user.linkedinUsername}: {e.response.status_code} - {e.response.text}")
-                # Continue to the next user
-            except httpx.RequestError as e:
-                print(f"HTTPX request error for user {user.linkedinUsername}: {e}")
-                # Continue to the next user
-            except json.JSONDecodeError:
-                print(f"JSON decoding error for user {user.linkedinUsername}: Invalid LinkedIn cookie format or Apify response.")
-                # Continue to the next user
-            except Exception as e:
-                print(f"An unexpected error occurred for user {user.linkedinUsername}: {e}")
-                traceback.print_exc()
-                # Continue to the next user
-
-        return {"message": "LinkedIn posts fetched and processed sequentially!", "data": all_apify_data}
+    job = await prisma.scrapejob.find_unique(where={"id": job_id})
+    if not job:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
 
-    except httpx.HTTPStatusError as e:
-        keep_alive_handle.cancel() # Cancel the task on error
-        print(f"Apify API HTTP error: {e.response.status_code} - {e.response.text}")
-        raise HTTPException(status_code=e.response.status_code, detail=f"Apify API error: {e.response.text}")
-    except httpx.RequestError as e:
-        keep_alive_handle.cancel() # Cancel the task on error
-        print(f"HTTPX request error: {e}")
-        raise HTTPException(status_code=500, detail=f"Network or request error: {e}")
-    except json.JSONDecodeError:
-        keep_alive_handle.cancel() # Cancel the task on error
-        print("JSON decoding error: Invalid LinkedIn cookie format or Apify response.")
-        raise HTTPException(status_code=400, detail="Invalid LinkedIn cookie format or Apify response. Must be a JSON string.")
-    except Exception as e:
-        keep_alive_handle.cancel() # Cancel the task on error
-        print(f"An unexpected error occurred: {e}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
-    finally:
-        keep_alive_handle.cancel() # Cancel the task when processing is complete
+    return {"success": True, "data": _scrape_job_response(job), "message": "Scrape job retrieved successfully"}
+
+@router.post("/build-in-public/scrape-jobs/{job_id}/resume")
+async def resume_linkedin_scrape_job(job_id: str, linkedin_cookie_data: LinkedInCookie, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
+    if current_user.role != "INSTRUCTOR":
+        raise HTTPException(status_code=403, detail="Only instructors can resume LinkedIn scrape jobs")
+
+    cookie = _parse_linkedin_cookie(linkedin_cookie_data.linkedinCookie)
+    # Another worker may be running the job, or resuming it at the same time
+    if not await linkedin_scraper.claim_job(prisma, job_id):
+        if not await prisma.scrapejob.find_unique(where={"id": job_id}):
+            raise HTTPException(status_code=404, detail="Scrape job not found")
+        raise HTTPException(status_code=409, detail="Scrape job is already running or has completed")
+
+    job = await prisma.scrapejob.find_unique(where={"id": job_id})
+    linkedin_scraper.start_job(prisma, job, cookie)
+    return {"success": True, "data": _scrape_job_response(job), "message": "LinkedIn scrape job resumed"}
 
 class UserData(BaseModel):
     id: str
@@ -247,7 +169,7 @@ async def get_cohort_users(cohort_id: str, current_user = Depends(get_current_us
         return user_data_list
 
     except Exception as e:
-        print(f"Error fetching cohort users: {e}")
+        logger.exception("Error fetching cohort users: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/users/{user_id}/ikigai")
@@ -292,267 +214,6 @@ async def get_user_roadmaps(user_id: str, current_user = Depends(get_current_use
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
-@router.post("/build-in-public/fetch-linkedin-posts-sequentially")
-async def fetch_linkedin_posts_sequentially_backup(linkedin_cookie_data: LinkedInCookie, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
-    if current_user.role != "INSTRUCTOR":
-        raise HTTPException(status_code=403, detail="Only instructors can fetch LinkedIn posts sequentially")
-
-    async def keep_alive_task():
-        while True:
-            try:
-                async with httpx.AsyncClient() as client:
-                    await client.get("https://one00x-be.onrender.com/api/cohorts")
-                print("Keep-alive API called successfully.")
-            except httpx.RequestError as e:
-                print(f"Keep-alive API call failed: {e}")
-            await asyncio.sleep(120) # Call every 2 minutes
-
-    # Start the keep-alive task in the background
-    keep_alive_handle = asyncio.create_task(keep_alive_task())
-
-    try:
-        users = await prisma.user.find_many(
-            where={
-                "linkedinUsername": {
-                    "not": None,
-                },
-            },
-        )
-
-        if not users:
-            keep_alive_handle.cancel() # Cancel the task if no users
-            return {"message": "No LinkedIn usernames found to fetch posts for.", "data": []}
-
-        all_apify_data = []
-
-        for user in users:
-            if user.linkedinUsername:
-                try:
-                    url = f"https://www.linkedin.com/in/{user.linkedinUsername}/recent-activity/all/"
-                    urls = [url] # Process one URL at a time
-
-                    apify_request_body = {
-                        "cookie": json.loads(linkedin_cookie_data.linkedinCookie),
-                        "deepScrape": True,
-                        "maxDelay": 8,
-                        "minDelay": 2,
-                        "proxy": {
-                            "useApifyProxy": True,
-                            "apifyProxyCountry": "US",
-                        },
-                        "rawData": False,
-                        "urls": urls,
-                        "limitPerSource" : 5,
-                        "userAgent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36"
-                    }
-
-                    apify_api_token = os.environ.get("APIFY_API_TOKEN")
-                    apify_api_url = f"https://api.apify.com/v2/acts/curious_coder~linkedin-post-search-scraper/run-sync-get-dataset-items?token={apify_api_token}"
-
-                    async with httpx.AsyncClient(timeout=3600.0) as client:
-                        apify_response = await client.post(apify_api_url, json=apify_request_body)
-                        apify_response.raise_for_status()
-
-                    apify_data = apify_response.json()
-                    all_apify_data.extend(apify_data)
-
-                    # Process and store the fetched LinkedIn posts in your database
-                    for post in apify_data:
-                        if "text" in post and post["text"] is not None:
-                            post_text_lower = post["text"].lower()
-                            if re.search(r'\b(0to100xengineers|0to100xengineer|0to100xEngineers|0to100xEngineer|100xengineer|100xengineers|100xEngineers|#100xengineers|#0to100xengineers|#0to100xengineer|#0to100xEngineers|#0to100xEngineer)', post_text_lower, re.IGNORECASE):
-                                linkedin_username = None
-                                if "inputUrl" in post and post["inputUrl"]:
-                                    parts = post["inputUrl"].split("/in/")
-                                    if len(parts) > 1:
-                                        linkedin_username = parts[1].split("/")[0]
-
-                                if linkedin_username:
-                                    user_id = next((u.id for u in users if u.linkedinUsername == linkedin_username), None)
-
-                                    if user_id:
-                                        await prisma.post.upsert(
-                                            where={
-                                                "url": post["url"]
-                                            },
-                                            data={
-                                                "create": {
-                                                    "userId": user_id,
-                                                    "url": post["url"],
-                                                    "platform": "LINKEDIN",
-                                                    "numLikes": post.get("numLikes", 0),
-                                                    "numComments": post.get("numComments", 0),
-                                                    "postedAt": datetime.fromisoformat(post["postedAtISO"].replace("Z", "+00:00")) if "postedAtISO" in post else datetime.now(timezone.utc),
-                                                },
-                                                "update": {
-                                                    "numLikes": post.get("numLikes", 0),
-                                                    "numComments": post.get("numComments", 0),
-                                                    "postedAt": datetime.fromisoformat(post["postedAtISO"].replace("Z", "+00:00")) if "postedAtISO" in post else datetime.now(timezone.utc),
-                                                },
-                                            }
-                                        )
-                except httpx.HTTPStatusError as e:
-                    print(f"Apify API HTTP error for user {user.linkedinUsername}: {e.response.status_code} - {e.response.text}")
-                    # Continue to the next user
-                except httpx.RequestError as e:
-                    print(f"HTTPX request error for user {user.linkedinUsername}: {e}")
-                    # Continue to the next user
-                except json.JSONDecodeError:
-                    print(f"JSON decoding error for user {user.linkedinUsername}: Invalid LinkedIn cookie format or Apify response.")
-                    # Continue to the next user
-                except Exception as e:
-                    print(f"An unexpected error occurred for user {user.linkedinUsername}: {e}")
-                    traceback.print_exc()
-                    # Continue to the next user
-
-        return {"message": "LinkedIn posts fetched and processed sequentially!", "data": all_apify_data}
-
-    except Exception as e:
-        keep_alive_handle.cancel() # Cancel the task on error
-        print(f"An unexpected error occurred: {e}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
-
-
-
-@router.post("/build-in-public/fetch-linkedin-posts-sequentially-backup")
-async def fetch_linkedin_posts_sequentially_backup(linkedin_cookie_data: LinkedInCookie, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
-    if current_user.role != "INSTRUCTOR":
-        raise HTTPException(status_code=403, detail="Only instructors can fetch LinkedIn posts sequentially")
-
-    async def keep_alive_task():
-        while True:
-            try:
-                async with httpx.AsyncClient() as client:
-                    await client.get("https://one00x-be.onrender.com/api/cohorts")
-                print("Keep-alive API called successfully.")
-            except httpx.RequestError as e:
-                print(f"Keep-alive API call failed: {e}")
-            await asyncio.sleep(120) # Call every 2 minutes
-
-    # Start the keep-alive task in the background
-    keep_alive_handle = asyncio.create_task(keep_alive_task())
-
-    try:
-        users = await prisma.user.find_many(
-            where={
-                "linkedinUsername": {
-                    "not": None,
-                },
-            },
-        )
-
-        if not users:
-            keep_alive_handle.cancel() # Cancel the task if no users
-            return {"message": "No LinkedIn usernames found to fetch posts for.", "data": []}
-
-        all_apify_data = []
-
-        for user in users:
-            if user.linkedinUsername:
-                try:
-                    # Check if posts for this user have already been scraped today
-                    today = datetime.now(timezone.utc).date()
-                    existing_posts_today = await prisma.post.find_first(
-                        where={
-                            "userId": user.id,
-                            "createdAt": {
-                                "gte": datetime.combine(today, datetime.min.time(), tzinfo=timezone.utc),
-                                "lt": datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc),
-                            },
-                        }
-                    )
-
-                    if existing_posts_today:
-                        print(f"Skipping user {user.linkedinUsername} as posts have already been scraped today.")
-                        continue
-
-                    url = f"https://www.linkedin.com/in/{user.linkedinUsername}/recent-activity/all/"
-                    urls = [url] # Process one URL at a time
-
-                    apify_request_body = {
-                        "cookie": json.loads(linkedin_cookie_data.linkedinCookie),
-                        "deepScrape": True,
-                        "maxDelay": 8,
-                        "minDelay": 2,
-                        "proxy": {
-                            "useApifyProxy": True,
-                            "apifyProxyCountry": "US",
-                        },
-                        "rawData": False,
-                        "urls": urls,
-                        "limitPerSource" : 5
-                    }
-
-                    apify_api_token = os.environ.get("APIFY_API_TOKEN")
-                    apify_api_url = f"https://api.apify.com/v2/acts/curious_coder~linkedin-post-search-scraper/run-sync-get-dataset-items?token={apify_api_token}"
-
-                    async with httpx.AsyncClient(timeout=3600.0) as client:
-                        apify_response = await client.post(apify_api_url, json=apify_request_body)
-                        apify_response.raise_for_status()
-
-                    apify_data = apify_response.json()
-                    all_apify_data.extend(apify_data)
-
-                    # Process and store the fetched LinkedIn posts in your database
-                    for post in apify_data:
-                        if "text" in post and post["text"] is not None:
-                            post_text_lower = post["text"].lower()
-                            if re.search(r'\b(0to100xengineers|0to100xengineer|0to100xEngineers|0to100xEngineer|100xengineer|100xengineers|100xEngineers|#100xengineers|#0to100xengineers|#0to100xengineer|#0to100xEngineers|#0to100xEngineer)', post_text_lower, re.IGNORECASE):
-                                linkedin_username = None
-                                if "inputUrl" in post and post["inputUrl"]:
-                                    parts = post["inputUrl"].split("/in/")
-                                    if len(parts) > 1:
-                                        linkedin_username = parts[1].split("/")[0]
-
-                                if linkedin_username:
-                                    user_id = next((u.id for u in users if u.linkedinUsername == linkedin_username), None)
-
-                                    if user_id:
-                                        await prisma.post.upsert(
-                                            where={
-                                                "url": post["url"]
-                                            },
-                                            data={
-                                                "create": {
-                                                    "userId": user_id,
-                                                    "url": post["url"],
-                                                    "platform": "LINKEDIN",
-                                                    "numLikes": post.get("numLikes", 0),
-                                                    "numComments": post.get("numComments", 0),
-                                                    "postedAt": datetime.fromisoformat(post["postedAtISO"].replace("Z", "+00:00")) if "postedAtISO" in post else datetime.now(timezone.utc),
-                                                },
-                                                "update": {
-                                                    "numLikes": post.get("numLikes", 0),
-                                                    "numComments": post.get("numComments", 0),
-                                                    "postedAt": datetime.fromisoformat(post["postedAtISO"].replace("Z", "+00:00")) if "postedAtISO" in post else datetime.now(timezone.utc),
-                                                },
-                                            }
-                                        )
-                except httpx.HTTPStatusError as e:
-                    print(f"Apify API HTTP error for user {user.linkedinUsername}: {e.response.status_code} - {e.response.text}")
-                    # Continue to the next user
-                except httpx.RequestError as e:
-                    print(f"HTTPX request error for user {user.linkedinUsername}: {e}")
-                    # Continue to the next user
-                except json.JSONDecodeError:
-                    print(f"JSON decoding error for user {user.linkedinUsername}: Invalid LinkedIn cookie format or Apify response.")
-                    # Continue to the next user
-                except Exception as e:
-                    print(f"An unexpected error occurred for user {user.linkedinUsername}: {e}")
-                    traceback.print_exc()
-                    # Continue to the next user
-
-        return {"message": "LinkedIn posts fetched and processed sequentially!", "data": all_apify_data}
-
-    except Exception as e:
-        keep_alive_handle.cancel() # Cancel the task on error
-        print(f"An unexpected error occurred: {e}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
-
-
-
 class ResourceCreate(BaseModel):
     cohortId: str
     title: str
@@ -623,6 +284,8 @@ async def create_quiz(quiz_data: QuizCreate, current_user = Depends(get_current_
             "tasks": True
         }
     )
+    quiz_cache.invalidate_quiz(new_quiz.id)
+    await cohort_content.invalidate_cohort(new_quiz.cohortId)
 
     return {
         "success": True,
@@ -630,6 +293,17 @@ async def create_quiz(quiz_data: QuizCreate, current_user = Depends(get_current_
         "message": "Quiz created successfully"
     }
 
+@router.get("/quiz-feedback/cache-stats")
+async def get_feedback_cache_stats(current_user = Depends(get_current_user)):
+    if current_user.role != "INSTRUCTOR":
+        raise HTTPException(status_code=403, detail="Only instructors can view feedback cache stats")
+
+    return {
+        "success": True,
+        "data": feedback_cache.get_stats(),
+        "message": "Feedback cache stats retrieved successfully"
+    }
+
 @router.post("/quizzes/generate-ai")
 async def generate_quiz_ai(quiz_ai_data: GenerateQuizAI, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
     if current_user.role != "INSTRUCTOR":
@@ -684,6 +358,8 @@ async def generate_quiz_ai(quiz_ai_data: GenerateQuizAI, current_user = Depends(
                 "tasks": True
             }
         )
+        quiz_cache.invalidate_quiz(new_quiz.id)
+        await cohort_content.invalidate_cohort(new_quiz.cohortId)
 
         return {
             "success": True,
@@ -736,6 +412,8 @@ class SessionResponse(BaseModel):
     lectureNumber: int
     cohortId: str
     imageUrl: Optional[str] = None
+    whatsappImageUrl: Optional[str] = None
+    thumbnailUrl: Optional[str] = None
     sessionType: Optional[str] = None
     createdAt: datetime
     updatedAt: datetime
@@ -767,8 +445,13 @@ async def update_notification_message(notification_id: str, notification_update:
 
     return {"message": "Notification message updated successfully", "data": updated_notification}
 
-@router.get("/sessions/{session_id}/notifications")
-async def get_session_notifications(session_id: str, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
+# The body is streamed, so FastAPI can't validate it against a response_model;
+# each item is validated by NotificationData below and the shape is documented here
+@router.get(
+    "/sessions/{session_id}/notifications",
+    responses={200: {"model": SessionNotificationsResponse, "description": "Or one NotificationData per line with Accept: application/x-ndjson"}}
+)
+async def get_session_notifications(session_id: str, request: Request, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
     if current_user.role != "INSTRUCTOR":
         raise HTTPException(status_code=403, detail="Only instructors can view session notifications")
 
@@ -787,7 +470,13 @@ async def get_session_notifications(session_id: str, current_user = Depends(get_
     )
 
     notifications.sort(key=lambda n: n.user.name if n.user and n.user.name else "")
-    return {"message": "Session notifications retrieved successfully", "data": notifications}
+    # Streamed in the SessionNotificationsResponse shape, a chunk of notifications at a time
+    return streamed_list(
+        request,
+        notifications,
+        serialize=lambda n: NotificationData.model_validate(n, from_attributes=True),
+        envelope={"message": "Session notifications retrieved successfully"}
+    )
 
 class WeeklyResourcePayload(BaseModel):
     id: Optional[str] = None
@@ -799,6 +488,33 @@ class WeeklyResourcePayload(BaseModel):
     isOptional: Optional[bool] = False
     quizId: Optional[str] = None
 
+async def _store_session_image(image: UploadFile) -> dict:
+    """Store a session image and its WhatsApp and thumbnail derivatives; returns the Session image fields."""
+    try:
+        stored = await uploads.store_image(image)
+    except uploads.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to upload image: {e}")
+
+    fields = {"imageUrl": stored.url, "whatsappImageUrl": None, "thumbnailUrl": None}
+    try:
+        fields.update(await image_derivatives.create_derivatives(stored, image.file))
+    except Exception as e:
+        # Senders fall back to the original image
+        logger.warning("Failed to create derivatives for session image %s: %s", stored.key, e)
+    return fields
+
+def _session_media(session) -> Optional[dict]:
+    # Sessions created before derivatives existed only have the original
+    image_url = session.whatsappImageUrl or session.imageUrl
+    if not image_url:
+        return None
+    return {
+        "url": image_url,
+        "filename": "session_image.jpg"
+    }
+
 @router.post("/cohorts/{cohort_id}/sessions", response_model=CreateSessionResponse)
 async def create_session(
     cohort_id: str,
@@ -831,7 +547,7 @@ async def create_session(
             }
         )
         for notification in notifications:
-            asyncio.create_task(_resend_notification_in_background(notification, prisma))
+            asyncio.create_task(tracing.run_job("notification_resend", _resend_notification_in_background(notification, prisma), notification.id))
         
         return {
             "success": True,
@@ -843,24 +559,17 @@ async def create_session(
                 lectureNumber=existing_session.lectureNumber,
                 cohortId=existing_session.cohortId,
                 imageUrl=existing_session.imageUrl,
+                whatsappImageUrl=existing_session.whatsappImageUrl,
+                thumbnailUrl=existing_session.thumbnailUrl,
                 createdAt=existing_session.createdAt,
                 updatedAt=existing_session.updatedAt
             ),
             "message": "Session already exists, notifications resent."
         }
 
-    image_url = None
+    image_fields = {"imageUrl": None}
     if image:
-        try:
-            file_content = await image.read()
-            file_name = f"{uuid.uuid4()}-{image.filename}"
-            response = supabase.storage.from_("test").upload(file_name, file_content, {"content-type": image.content_type})
-            image_url = supabase.storage.from_("test").get_public_url(file_name)
-           
-            # Construct the public URL
-            # image_url = f"{SUPABASE_URL}/storage/v1/object/public/test/{file_name}"
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to upload image to Supabase: {e}")
+        image_fields = await _store_session_image(image)
 
     new_session = await prisma.session.create(
         data={
@@ -870,7 +579,7 @@ async def create_session(
             "weekNumber": weekNumber,
             "lectureNumber": lectureNumber,
             "sessionType": sessionType,
-            "imageUrl": image_url
+            **image_fields
         }
     )
 
@@ -903,7 +612,7 @@ async def create_session(
                     profile_data = profile_response.json()
                     profile_id = profile_data.get("id")
                 else:
-                    print(f"DEBUG: No profile found for user email: {user.email}. Skipping roadmap creation.")
+                    logger.info("No profile found for user %s, skipping roadmap creation", user.id, extra={"sample": True})
                     continue # Skip roadmap creation for this user if no profile is found
 
                 # Fetch Ikigai data
@@ -939,7 +648,7 @@ async def create_session(
                         }
                         for idea in project_ideas_data if idea.get("module_name") == module_name_str
                     ]
-                    print(f"DEBUG: filtered_project_ideas: {filtered_project_ideas}")
+                    logger.debug("Project ideas for user %s: %s", user.id, truncate(filtered_project_ideas), extra={"sample": True})
                     project_based_context = {
                         "project_ideas": filtered_project_ideas,
                         "module_name": module_name_str,
@@ -951,7 +660,7 @@ async def create_session(
                     }
                     project_based_msg = await generate_project_based_message_openai(project_based_context)
 
-                print(f"DEBUG: ikigai_data: {ikigai_data['ikigai_details']}")
+                logger.debug("Ikigai data for user %s: %s", user.id, truncate(ikigai_data.get("ikigai_details")), extra={"sample": True})
 
                 if ikigai_data and user.launchpad and user.launchpad.expectedOutcomes:
                     outcome_based_context = {
@@ -971,7 +680,7 @@ async def create_session(
                     profile_data = profile_response.json()
                     profile_id = profile_data.get("id")
                 else:
-                    print(f"DEBUG: No profile found for user email: {user.email}. Skipping roadmap creation.")
+                    logger.info("No profile found for user %s, skipping roadmap creation", user.id, extra={"sample": True})
                     continue # Skip roadmap creation for this user if no profile is found
 
                 # Store messages in roadmaps table via profile-system API
@@ -994,10 +703,10 @@ async def create_session(
                     "status": "generated"
                 }
             )
-            print(f"Notification generated and saved for user {user.id}")
+            logger.info("Notification generated for user %s", user.id, extra={"sessionId": new_session.id, "sample": True})
             time.sleep(1.2) # Delay for 0.6 seconds to limit to 100 notifications per minute
         except Exception as e:
-            print(f"Error generating notification for user {user.id}: {e}")
+            logger.exception("Error generating notification for user %s: %s", user.id, e, extra={"sessionId": new_session.id})
 
     return {
         "success": True,
@@ -1023,6 +732,7 @@ async def create_resource(resource: ResourceCreate, current_user = Depends(get_c
             "isOptional": resource.isOptional
         }
     )
+    await cohort_content.invalidate_cohort(resource.cohortId)
     
     return {
         "success": True,
@@ -1057,34 +767,40 @@ async def get_quiz(quiz_id: str, current_user = Depends(get_current_user), prism
         "message": "Quiz retrieved successfully"
     }
 
-@router.get("/quizzes")
-async def get_all_quizzes(cohortId: Optional[str] = None, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
+# The cached body is returned as-is, so a response_model would never run;
+# build() validates it against QuizListResponse and the shape is documented here
+@router.get("/quizzes", responses={200: {"model": QuizListResponse}})
+async def get_all_quizzes(request: Request, cohortId: Optional[str] = None, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
     if current_user.role != "INSTRUCTOR":
         raise HTTPException(status_code=403, detail="Only instructors can view quizzes")
 
-    where_clause = {}
-    if cohortId:
-        where_clause["cohortId"] = cohortId
+    async def build():
+        where_clause = {}
+        if cohortId:
+            where_clause["cohortId"] = cohortId
 
-    quizzes = await prisma.quiz.find_many(
-        where=where_clause,
-        include={
-            "questions": {
-                "include": {
-                    "options": True
+        quizzes = await prisma.quiz.find_many(
+            where=where_clause,
+            include={
+                "questions": {
+                    "include": {
+                        "options": True
+                    }
                 }
             }
-        }
-    )
+        )
 
-    return {
-        "success": True,
-        "data": quizzes,
-        "message": "Quizzes retrieved successfully"
-    }
+        return QuizListResponse.model_validate({
+            "success": True,
+            "data": [quiz.model_dump() for quiz in quizzes],
+            "message": "Quizzes retrieved successfully"
+        }).model_dump(mode="json")
+
+    return await cohort_content.cached_response(request, cohortId, ("quizzes",), build)
 
 @router.get("/cohorts/{cohort_id}/weeks/{week_number}/resources")
 async def get_resources_by_week(
+    request: Request,
     cohort_id: str,
     week_number: int,
     current_user = Depends(get_current_user),
@@ -1094,45 +810,51 @@ async def get_resources_by_week(
         if current_user.role not in ["INSTRUCTOR", "LEARNER"]:
             raise HTTPException(status_code=403, detail="Not authorized to view resources")
 
-        resources = await prisma.resource.find_many(
-            where={
-                "cohortId": cohort_id,
-                "weekNumber": week_number
-            }
-        )
+        async def build():
+            resources = await prisma.resource.find_many(
+                where={
+                    "cohortId": cohort_id,
+                    "weekNumber": week_number
+                }
+            )
 
-        # Convert Prisma resources to WeeklyResourcePayload format
-        formatted_resources = [
-            WeeklyResourcePayload(
-                id=str(res.id),
-                title=res.title,
-                url=res.url,
-                type=res.type,
-                duration=res.duration,
-                tags=res.tags,
-                isOptional=res.isOptional
-            ) for res in resources
-        ]
+            # Convert Prisma resources to WeeklyResourcePayload format
+            formatted_resources = [
+                WeeklyResourcePayload(
+                    id=str(res.id),
+                    title=res.title,
+                    url=res.url,
+                    type=res.type,
+                    duration=res.duration,
+                    tags=res.tags,
+                    isOptional=res.isOptional
+                ) for res in resources
+            ]
+
+            return {
+                "success": True,
+                "data": formatted_resources,
+                "message": f"Resources for cohort {cohort_id}, week {week_number} retrieved successfully"
+            }
 
-        return {
-            "success": True,
-            "data": formatted_resources,
-            "message": f"Resources for cohort {cohort_id}, week {week_number} retrieved successfully"
-        }
+        return await cohort_content.cached_response(request, cohort_id, ("weekly-resources", week_number), build)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
 @router.get("/cohorts")
-async def get_cohorts(prisma: Prisma = Depends(get_prisma_client)):
-    cohorts = await prisma.cohort.find_many()
-    
-    return {
-        "success": True,
-        "data": cohorts,
-        "message": "Cohorts retrieved successfully"
-    }
+async def get_cohorts(request: Request, prisma: Prisma = Depends(get_prisma_client)):
+    async def build():
+        cohorts = await prisma.cohort.find_many()
+
+        return {
+            "success": True,
+            "data": cohorts,
+            "message": "Cohorts retrieved successfully"
+        }
+
+    return await cohort_content.cached_response(request, None, ("cohorts",), build)
 
 @router.put("/quizzes/{quiz_id}")
 async def update_quiz(quiz_id: str, quiz_data: QuizUpdate, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
@@ -1191,6 +913,14 @@ async def update_quiz(quiz_id: str, quiz_data: QuizUpdate, current_user = Depend
                 }
             )
 
+    # Question/option edits don't touch the quiz row, so bump its version explicitly
+    await prisma.quiz.update(
+        where={"id": quiz_id},
+        data={"updatedAt": datetime.now(timezone.utc)}
+    )
+    quiz_cache.invalidate_quiz(quiz_id)
+    await cohort_content.invalidate_cohort(existing_quiz.cohortId)
+
     updated_quiz = await prisma.quiz.find_unique(
         where={"id": quiz_id},
         include={
@@ -1258,10 +988,13 @@ async def create_cohort(cohort_name: str = Form(...), total_weeks: int = Form(..
             }
             result = await db_connection.insert_user_from_row(mapped_row_data, cohort_id=new_cohort.id)
             if result["status"] == "failure":
-                print(f"Failed to insert user {result.get('email')}: {result.get('error')}")
+                logger.warning("Failed to insert user from CSV row: %s", result.get("error"), extra={"cohortId": new_cohort.id})
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process CSV file: {e}")
+    finally:
+        # The cohort row exists even if the CSV failed
+        await cohort_content.invalidate_cohort(new_cohort.id)
     
     return {
         "success": True,
@@ -1279,6 +1012,8 @@ async def delete_quiz(quiz_id: str, current_user = Depends(get_current_user), pr
         raise HTTPException(status_code=404, detail="Quiz not found")
 
     await prisma.quiz.delete(where={"id": quiz_id})
+    quiz_cache.invalidate_quiz(quiz_id)
+    await cohort_content.invalidate_cohort(existing_quiz.cohortId)
 
     return {
         "success": True,
@@ -1286,83 +1021,89 @@ async def delete_quiz(quiz_id: str, current_user = Depends(get_current_user), pr
     }
 
 @router.get("/resources/all_by_cohort/{cohort_id}")
-async def get_all_resources_for_cohort(cohort_id: str, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
+async def get_all_resources_for_cohort(request: Request, cohort_id: str, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
     if current_user.role not in ["INSTRUCTOR", "LEARNER"]:
         raise HTTPException(status_code=403, detail="Only instructors and learners can view all resources for a cohort")
     
-    resources = await prisma.resource.find_many(
-        where={
-            "cohortId": cohort_id
-        }
-    )
+    async def build():
+        resources = await prisma.resource.find_many(
+            where={
+                "cohortId": cohort_id
+            }
+        )
 
-    quizzes = await prisma.quiz.find_many(
-        where={
-            "cohortId": cohort_id
+        quizzes = await prisma.quiz.find_many(
+            where={
+                "cohortId": cohort_id
+            }
+        )
+
+        # Group resources and quizzes by week number
+        weekly_items = {}
+
+        for resource in resources:
+            if resource.weekNumber not in weekly_items:
+                weekly_items[resource.weekNumber] = []
+            weekly_items[resource.weekNumber].append({
+                "id": resource.id,
+                "title": resource.title,
+                "type": resource.type,
+                "url": resource.url,
+                "duration": resource.duration,
+                "tags": resource.tags,
+                "isOptional": resource.isOptional
+            })
+
+        for quiz in quizzes:
+            if quiz.weekNumber not in weekly_items:
+                weekly_items[quiz.weekNumber] = []
+            weekly_items[quiz.weekNumber].append({
+                "id": quiz.id,
+                "title": f"Quiz for Week {quiz.weekNumber}", # Placeholder title
+                "type": "QUIZ",
+                "url": f"/quizzes/{quiz.id}", # Placeholder URL
+                "duration": 0, # Quizzes don't have a duration
+                "tags": [],
+                "isOptional": False, # Quizzes are generally not optional
+
+            })
+
+        # Convert to list of WeekResource objects, sorted by week number
+        result = [
+            {"week": week, "resources": weekly_items[week]}
+            for week in sorted(weekly_items.keys())
+        ]
+
+        return {
+            "success": True,
+            "data": result,
+            "message": "All resources for cohort retrieved successfully"
         }
-    )
-    
-    # Group resources and quizzes by week number
-    weekly_items = {}
-
-    for resource in resources:
-        if resource.weekNumber not in weekly_items:
-            weekly_items[resource.weekNumber] = []
-        weekly_items[resource.weekNumber].append({
-            "id": resource.id,
-            "title": resource.title,
-            "type": resource.type,
-            "url": resource.url,
-            "duration": resource.duration,
-            "tags": resource.tags,
-            "isOptional": resource.isOptional
-        })
-
-    for quiz in quizzes:
-        if quiz.weekNumber not in weekly_items:
-            weekly_items[quiz.weekNumber] = []
-        weekly_items[quiz.weekNumber].append({
-            "id": quiz.id,
-            "title": f"Quiz for Week {quiz.weekNumber}", # Placeholder title
-            "type": "QUIZ",
-            "url": f"/quizzes/{quiz.id}", # Placeholder URL
-            "duration": 0, # Quizzes don't have a duration
-            "tags": [],
-            "isOptional": False, # Quizzes are generally not optional
-       
-        })
-    
-    # Convert to list of WeekResource objects, sorted by week number
-    result = [
-        {"week": week, "resources": weekly_items[week]}
-        for week in sorted(weekly_items.keys())
-    ]
-    
-    return {
-        "success": True,
-        "data": result,
-        "message": "All resources for cohort retrieved successfully"
-    }
+
+    return await cohort_content.cached_response(request, cohort_id, ("all-resources",), build)
 
 @router.get("/resources/{cohort_id}/{week_number}")
-async def get_resources(cohort_id: str, week_number: int, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
+async def get_resources(request: Request, cohort_id: str, week_number: int, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
     # Existing function to get resources for a specific week
-    resources = await prisma.resource.find_many(
-        where={
-            "cohortId": cohort_id,
-            "weekNumber": week_number
+    async def build():
+        resources = await prisma.resource.find_many(
+            where={
+                "cohortId": cohort_id,
+                "weekNumber": week_number
+            }
+        )
+
+        return {
+            "success": True,
+            "data": resources,
+            "message": "Resources retrieved successfully"
         }
-    )
-    
-    return {
-        "success": True,
-        "data": resources,
-        "message": "Resources retrieved successfully"
-    }
+
+    return await cohort_content.cached_response(request, cohort_id, ("resources", week_number), build)
 
 @router.post("/resources/{cohort_id}/{week_number}")
 async def create_weekly_resource(cohort_id: str, week_number: int, resources: List[WeeklyResourcePayload] = Body(...), current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
-    print(f"Received resources for week {week_number}: {resources}")
+    logger.debug("Received resources for week %s: %s", week_number, truncate(resources))
     if current_user.role != "INSTRUCTOR":
         raise HTTPException(status_code=403, detail="Only instructors can create resources")
     
@@ -1467,6 +1208,8 @@ async def create_weekly_resource(cohort_id: str, week_number: int, resources: Li
                 }
             )
 
+    await cohort_content.invalidate_cohort(cohort_id)
+
     return {
         "success": True,
         "data": created_items,
@@ -1491,7 +1234,6 @@ async def create_weekly_resource(cohort_id: str, week_number: int, resources: Li
     )
 
 async def _send_notifications_in_background(user, session_details, prisma: Prisma):
-    print('Entered')
     media = None  # Initialize media to None
     if user.launchpad:
         context = {
@@ -1528,12 +1270,8 @@ async def _send_notifications_in_background(user, session_details, prisma: Prism
             status = "Started"
 
         if user.phoneNumber:
-            print(f"Attempting to send WhatsApp message to {user.phoneNumber} for session {session_details.id}")
-            if session_details.imageUrl:
-                media = {
-                    "url": session_details.imageUrl,
-                    "filename": "session_image.jpg"
-                }
+            logger.info("Sending WhatsApp notification to user %s", user.id, extra={"sessionId": session_details.id, "sample": True})
+            media = _session_media(session_details)
             await send_whatsapp_message(
                 destination=user.phoneNumber,
                 user_name=user.name,
@@ -1589,17 +1327,15 @@ async def update_session(
     if current_user.role != "INSTRUCTOR":
         raise HTTPException(status_code=403, detail="Only instructors can update sessions")
 
-    image_url = None
-    if image:
-        file_path = f"uploads/{image.filename}"
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-        image_url = f"/{file_path}"
-
     existing_session = await prisma.session.find_unique(where={"id": session_id})
     if not existing_session:
         raise HTTPException(status_code=404, detail="Session not found")
 
+    # Keep the existing image if no new one is uploaded
+    image_fields = {}
+    if image:
+        image_fields = await _store_session_image(image)
+
     updated_session = await prisma.session.update(
         where={"id": session_id},
         data={
@@ -1608,7 +1344,7 @@ async def update_session(
             "weekNumber": weekNumber,
             "sessionType" : sessionType,
             "lectureNumber": lectureNumber,
-            "imageUrl": image_url if image_url else existing_session.imageUrl # Keep existing image if no new one is uploaded
+            **image_fields
         }
     )
 
@@ -1668,6 +1404,7 @@ async def delete_resource(resource_id: str, current_user = Depends(get_current_u
         raise HTTPException(status_code=404, detail="Resource not found")
 
     await prisma.resource.delete(where={"id": resource_id})
+    await cohort_content.invalidate_cohort(existing_resource.cohortId)
     
     return {
         "success": True,
@@ -1691,6 +1428,7 @@ async def delete_week_resources(cohort_id: str, week_number: int, current_user =
             "weekNumber": week_number
         }
     )
+    await cohort_content.invalidate_cohort(cohort_id)
     
     return {
         "success": True,
@@ -1783,15 +1521,15 @@ async def get_cohort_dashboard(cohort_id: str, current_user = Depends(get_curren
 
 
 async def _resend_notification_in_background(notification, prisma: Prisma):
-    print(f"Resending notification for student {notification.studentId} and session {notification.sessionId}")
+    logger.info("Resending notification %s", notification.id, extra={"studentId": notification.studentId, "sessionId": notification.sessionId})
     user = await prisma.user.find_unique(where={"id": notification.studentId})
     if not user:
-        print(f"User with ID {notification.studentId} not found for resending notification.")
+        logger.warning("User %s not found for resending notification %s", notification.studentId, notification.id)
         return
 
     session_details = await prisma.session.find_unique(where={"id": notification.sessionId})
     if not session_details:
-        print(f"Session with ID {notification.sessionId} not found for resending notification.")
+        logger.warning("Session %s not found for resending notification %s", notification.sessionId, notification.id)
         return
 
     # Parse the two pointers from the stored message
@@ -1816,15 +1554,10 @@ async def _resend_notification_in_background(notification, prisma: Prisma):
     else:
         status = "Started"
 
-    media = None
-    if session_details.imageUrl:
-        media = {
-            "url": session_details.imageUrl,
-            "filename": "session_image.jpg"
-        }
+    media = _session_media(session_details)
 
     if user.phoneNumber:
-        print(f"Attempting to resend WhatsApp message to {user.phoneNumber} for session {session_details.title}")
+        logger.info("Resending WhatsApp notification to user %s", user.id, extra={"sessionId": session_details.id})
         await send_whatsapp_message(
             destination=user.phoneNumber,
             user_name=user.name,
@@ -1874,7 +1607,7 @@ async def send_notifications(
             if user_from_db and user_from_db.phoneNumber:
                 whatsapp_number = user_from_db.phoneNumber
             else:
-                print(f"Skipping WhatsApp notification for user {notification.studentId} (Name: {user_from_db.name if user_from_db else 'N/A'}) due to missing phone number.")
+                logger.info("Skipping notification %s, user %s has no phone number", notification.id, notification.studentId, extra={"sample": True})
                 continue
                 
             # Extract pointer1 and pointer2 from the stored message
@@ -1914,13 +1647,8 @@ async def send_notifications(
             else:
                 session_status = "live"
                 status = "Started"
-            media = None
-            if notification.session.imageUrl:
-                media = {
-                    "url": notification.session.imageUrl,
-                    "filename": "session_image.jpg"
-                }
-            print(f"Attempting to send WhatsApp message to {whatsapp_number} for notification {notification.id}")
+            media = _session_media(notification.session)
+            logger.info("Sending WhatsApp notification %s", notification.id, extra={"studentId": notification.studentId, "sample": True})
             await send_whatsapp_message(
                 destination=whatsapp_number,
                 user_name=notification.user.name,
@@ -1939,7 +1667,7 @@ async def send_notifications(
             #     }
             # )
         except Exception as e:
-            print(f"Failed to send notification {notification.id}: {e}")
+            logger.exception("Failed to send notification %s: %s", notification.id, e)
             # await prisma.notification.update(
             #     where={"id": notification.id},
             #     data={
@@ -1950,48 +1678,33 @@ async def send_notifications(
 
 @router.get("/build-in-public/users")
 async def get_build_in_public_users(
+    request: Request,
     cohortId: Optional[str] = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
     prisma: Prisma = Depends(get_prisma_client)
 ):
-    where_clause = {}
-    if cohortId:
-        where_clause["cohortId"] = cohortId
-
-    users = await prisma.user.find_many(
-        where=where_clause,
-        include={
-            'posts': True
+    # Sorted by total posts, then total likes (both descending) straight off the
+    # stats index, and streamed a page of rows at a time
+    return streamed_list(
+        request,
+        post_stats.iter_post_stats(prisma, cohortId, offset, limit),
+        serialize=lambda row: {
+            "id": row.user.id,
+            "name": row.user.name,
+            "email": row.user.email,
+            "totalPosts": row.totalPosts,
+            "lastPosted": row.lastPostedAt.isoformat() if row.lastPostedAt else None,
+            "totalLikes": row.totalLikes,
+            "totalComments": row.totalComments,
         }
     )
 
-    user_data = []
-    for user in users:
-        total_posts = len(user.posts)
-        total_likes = sum(post.numLikes for post in user.posts)
-        total_comments = sum(post.numComments for post in user.posts)
-        last_posted = None
-        if user.posts:
-            last_posted = max(post.postedAt for post in user.posts).isoformat()
-
-        user_data.append({
-            "id": user.id,
-            "name": user.name,
-            "email": user.email,
-            "totalPosts": total_posts,
-            "lastPosted": last_posted,
-            "totalLikes": total_likes,
-            "totalComments": total_comments,
-        })
-    # Sort by total posts (descending), then total likes (descending)
-    user_data.sort(key=lambda x: (x["totalPosts"], x["totalLikes"]), reverse=True)
-    return user_data
-
 @router.get("/build-in-public/users/{user_id}/analytics")
 async def get_user_analytics(user_id: str, prisma: Prisma = Depends(get_prisma_client)):
     user = await prisma.user.find_unique(
         where={'id': user_id},
         include={
-            'posts': True,
             'streak': True
         }
     )
@@ -1999,73 +1712,44 @@ async def get_user_analytics(user_id: str, prisma: Prisma = Depends(get_prisma_c
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    total_posts = len(user.posts)
-    total_likes = sum(post.numLikes for post in user.posts)
-    total_comments = sum(post.numComments for post in user.posts)
-
-    # Calculate longest streak
-    if user.posts:
-        # Sort posts by postedAt to ensure correct streak calculation
-        sorted_posts = sorted(user.posts, key=lambda p: p.postedAt)
-        
-        longest_streak = 0
-        current_streak = 0
-        last_post_date = None
-
-        for post in sorted_posts:
-            post_date = post.postedAt.date()
-            if last_post_date is None:
-                current_streak = 1
-            elif (post_date - last_post_date).days == 1:
-                current_streak += 1
-            elif (post_date - last_post_date).days > 1:
-                current_streak = 1
-            
-            longest_streak = max(longest_streak, current_streak)
-            last_post_date = post_date
-    else:
-        longest_streak = 0
-
-    # Calculate rank
-    all_users = await prisma.user.find_many(include={'posts': True})
-    users_with_posts = []
-    for u in all_users:
-        users_with_posts.append({
-            "id": u.id,
-            "totalPosts": len(u.posts)
-        })
-    users_with_posts.sort(key=lambda x: x["totalPosts"], reverse=True)
-
-    rank = 1
-    for i, u_data in enumerate(users_with_posts):
-        if u_data["id"] == user_id:
-            rank = i + 1
-            break
+    stats = await post_stats.get_post_stats(prisma, user_id)
+    activity = await post_stats.get_post_activity(prisma, stats)
+    rank = await post_stats.get_rank(prisma, stats)
 
     return {
         "name": user.name,
-        "totalPosts": total_posts,
-        "totalLikes": total_likes,
-        "totalComments": total_comments,
+        "totalPosts": stats.totalPosts,
+        "totalLikes": stats.totalLikes,
+        "totalComments": stats.totalComments,
         "currentStreak": user.streak.currentStreak if user.streak else 0,
-        "longestStreak": longest_streak,
+        "longestStreak": activity["longestStreak"],
         "rank": rank,
     }
 
 @router.get("/build-in-public/users/{user_id}/posts")
-async def get_user_posts(user_id: str, prisma: Prisma = Depends(get_prisma_client)):
+async def get_user_posts(
+    user_id: str,
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    hasReacted: Optional[bool] = Query(None),
+    prisma: Prisma = Depends(get_prisma_client)
+):
     user = await prisma.user.find_unique(
-        where={'id': user_id},
-        include={
-            'posts': True
-        }
+        where={'id': user_id}
     )
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Sort posts by postedAt in descending order (most recent first)
-    sorted_posts = sorted(user.posts, key=lambda p: p.postedAt, reverse=True)
+    try:
+        posts, next_cursor = await post_stats.list_user_posts(prisma, user_id, cursor, limit, hasReacted)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Most recent first; the next page is requested with ?cursor=<X-Next-Cursor>
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return [
         {
@@ -2074,10 +1758,56 @@ async def get_user_posts(user_id: str, prisma: Prisma = Depends(get_prisma_clien
             "postedAt": post.postedAt.isoformat(),
             "hasReacted": post.hasReacted
         }
-        for post in sorted_posts
+        for post in posts
     ]
 
 
+class PostReaction(BaseModel):
+    postId: str
+    hasReacted: bool
+
+class BulkPostReactions(BaseModel):
+    reactions: List[PostReaction]
+
+MAX_BULK_REACTIONS = 1000
+
+@router.put("/build-in-public/posts/react")
+async def update_post_reactions(
+    reaction_data: BulkPostReactions,
+    current_user = Depends(get_current_user),
+    prisma: Prisma = Depends(get_prisma_client)
+):
+    if current_user.role != "INSTRUCTOR":
+        raise HTTPException(status_code=403, detail="Only instructors can update post reactions")
+
+    if len(reaction_data.reactions) > MAX_BULK_REACTIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_REACTIONS} reactions can be updated at once")
+
+    # The last state given for a post wins
+    states = {reaction.postId: reaction.hasReacted for reaction in reaction_data.reactions}
+    reacted_ids = [post_id for post_id, has_reacted in states.items() if has_reacted]
+    unreacted_ids = [post_id for post_id, has_reacted in states.items() if not has_reacted]
+
+    try:
+        reacted = await prisma.post.update_many(
+            where={'id': {'in': reacted_ids}},
+            data={'hasReacted': True}
+        ) if reacted_ids else 0
+        unreacted = await prisma.post.update_many(
+            where={'id': {'in': unreacted_ids}},
+            data={'hasReacted': False}
+        ) if unreacted_ids else 0
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update post reaction status: {e}")
+
+    return {
+        "success": True,
+        "message": "Post reaction statuses updated successfully",
+        "reacted": reacted,
+        "unreacted": unreacted,
+        "notFound": len(states) - reacted - unreacted
+    }
+
 @router.put("/build-in-public/posts/{post_id}/react")
 async def update_post_reaction_status(
     post_id: str,
@@ -2097,18 +1827,12 @@ async def update_post_reaction_status(
 @router.get("/build-in-public/users/{user_id}/heatmap")
 async def get_user_heatmap_data(user_id: str, prisma: Prisma = Depends(get_prisma_client)):
     user = await prisma.user.find_unique(
-        where={'id': user_id},
-        include={
-            'posts': True
-        }
+        where={'id': user_id}
     )
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    heatmap_data = {}
-    for post in user.posts:
-        date = post.postedAt.strftime("%Y-%m-%d")
-        heatmap_data[date] = heatmap_data.get(date, 0) + 1
-
-    return heatmap_data
+    stats = await post_stats.get_post_stats(prisma, user_id)
+    activity = await post_stats.get_post_activity(prisma, stats)
+    return activity["heatmap"]
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel
 from prisma import Prisma
+from prisma.errors import UniqueViolationError
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional
 from .auth import get_current_user
 from main import get_prisma_client
-from groq import Groq
-import os
-
-groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+from modules import quiz_cache, cohort_content
+from modules.feedback_worker import enqueue_feedback
+from modules.response_schemas import PlanResponse
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 class TaskCreate(BaseModel):
     resourceId: Optional[str] = None
     quizId: Optional[str] = None
@@ -42,6 +45,7 @@ class QuizAttemptResponse(BaseModel):
     score: Optional[float] = None
     submittedAt: datetime
     feedbackReport: Optional[FeedbackReportResponse] = None
+    feedbackStatus: Optional[str] = None
 
 class OptionWithCorrectness(BaseModel):
     id: str
@@ -185,245 +189,261 @@ async def get_quiz_attempt_status(quiz_id: str, current_user = Depends(get_curre
         "message": "Plan created successfully"
     }
 
-@router.get("/quizzes/{quiz_id}", response_model=QuizResponse)
+# The body is pre-serialized by quiz_cache, so a response_model would never run;
+# it's documented here instead
+@router.get("/quizzes/{quiz_id}", responses={200: {"model": QuizResponse}})
 async def get_quiz_for_resource(quiz_id: str, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
-    quiz = await prisma.quiz.find_unique(
+    # Primary-key lookup only; the question/option tree is loaded on a cache miss
+    quiz_row = await prisma.quiz.find_unique(
         where={
             "id": quiz_id
-        },
-        include={
-            "questions": {
-                "include": {
-                    "options": True
-                }
-            }
         }
     )
 
-    if not quiz:
+    if not quiz_row:
         raise HTTPException(status_code=404, detail="Quiz not found for this resource")
 
-    return QuizResponse(
-        id=quiz.id,
-        cohortId=quiz.cohortId,
-        weekNumber=quiz.weekNumber,
-        questions=[
-            QuestionResponse(
-                id=q.id,
-                text=q.questionText,
-                options=[{"id": opt.id, "text": opt.optionText} for opt in q.options],
-                type=q.questionType
-            ) for q in quiz.questions
-        ]
-    )
+    payload = quiz_cache.get_learner_payload(quiz_id, quiz_row.updatedAt)
+    if payload is None:
+        quiz = await prisma.quiz.find_unique(
+            where={
+                "id": quiz_id
+            },
+            include={
+                "questions": {
+                    "include": {
+                        "options": True
+                    }
+                }
+            }
+        )
 
-@router.get("/plans/{cohort_id}")
+        if not quiz:
+            raise HTTPException(status_code=404, detail="Quiz not found for this resource")
+
+        payload = quiz_cache.store_learner_payload(quiz)
+
+    return Response(content=payload, media_type="application/json")
+
+@router.get("/plans/{cohort_id}", response_model=PlanResponse)
 async def get_plan(cohort_id: str, week_number: Optional[int] = None, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):  
-    print(f"Attempting to retrieve plan for user: {current_user.id}, cohort: {cohort_id}, week: {week_number}")
-    
-    # Try to find an existing plan for the current week
-    where_clause = {
-        "userId": current_user.id,
-        "cohortId": cohort_id,
+    logger.debug("Retrieving plan for user %s, cohort %s, week %s", current_user.id, cohort_id, week_number)
+
+    plan_include = {
+        "tasks": {
+            "include": {
+                "resource": True
+            }
+        }
     }
 
-    if week_number is not None:
-        where_clause["tasks"] = {
-            "some": {
-                "resource": {
-                    "weekNumber": week_number
-                }
+    if week_number is None:
+        plan = await prisma.plan.find_first(
+            where={
+                "userId": current_user.id,
+                "cohortId": cohort_id,
+            },
+            include=plan_include
+        )
+        if not plan:
+            return {
+                "success": True,
+                "data": None,
+                "message": "No plan or resources found for this cohort and week"
             }
+        return {
+            "success": True,
+            "data": plan,
+            "message": "Plan retrieved successfully"
         }
 
-    plan = await prisma.plan.find_first(
-        where=where_clause,
-        include={
+    plan_key = {
+        "userId_cohortId_weekNumber": {
+            "userId": current_user.id,
+            "cohortId": cohort_id,
+            "weekNumber": week_number
+        }
+    }
+
+    # Single lookup on the (userId, cohortId, weekNumber) unique index
+    plan = await prisma.plan.find_unique(where=plan_key, include=plan_include)
+    if plan:
+        logger.debug("Found plan for user %s, cohort %s, week %s", current_user.id, cohort_id, week_number)
+        return {
+            "success": True,
+            "data": plan,
+            "message": "Plan retrieved successfully"
+        }
+
+    # Plans created before weekNumber existed are adopted the first time they're read
+    legacy_plan = await prisma.plan.find_first(
+        where={
+            "userId": current_user.id,
+            "cohortId": cohort_id,
+            "weekNumber": None,
             "tasks": {
-                "include": {
-                    "resource": True
+                "some": {
+                    "resource": {
+                        "weekNumber": week_number
+                    }
                 }
             }
         }
     )
-    
-    if not plan:
-        # If no plan exists for this week, check for resources for this week
-        resources_for_week = []
-        if week_number is not None:
-            resources_for_week = await prisma.resource.find_many(
-                where={
-                    "cohortId": cohort_id,
-                    "weekNumber": week_number
-                }
+    if legacy_plan:
+        try:
+            plan = await prisma.plan.update(
+                where={"id": legacy_plan.id},
+                data={"weekNumber": week_number},
+                include=plan_include
             )
-        
-        if resources_for_week:
-            # Create a new plan and tasks for these resources
-            new_plan = await prisma.plan.create(
-                data={
+        except UniqueViolationError:
+            plan = await prisma.plan.find_unique(where=plan_key, include=plan_include)
+        return {
+            "success": True,
+            "data": plan,
+            "message": "Plan retrieved successfully"
+        }
+
+    resource_ids = await cohort_content.get_week_resource_ids(prisma, cohort_id, week_number)
+    if not resource_ids:
+        return {
+            "success": True,
+            "data": None,
+            "message": "No plan or resources found for this cohort and week"
+        }
+
+    # The plan and its tasks are created atomically; a concurrent request that
+    # wins the race trips the unique index and we return its plan instead.
+    now = datetime.now(timezone.utc)
+    try:
+        plan = await prisma.plan.upsert(
+            where=plan_key,
+            data={
+                "create": {
                     "userId": current_user.id,
                     "cohortId": cohort_id,
+                    "weekNumber": week_number,
                     "tasks": {
                         "create": [
                             {
-                                "resourceId": resource.id,
+                                "resourceId": resource_id,
                                 "status": "PENDING",
-                                "assignedDate": datetime.now(timezone.utc)
-                            } for resource in resources_for_week
+                                "assignedDate": now
+                            } for resource_id in resource_ids
                         ]
                     }
                 },
-                include={
-                    "tasks": {
-                        "include": {
-                            "resource": True
-                        }
-                    }
-                }
-            )
-            print(f"Created new plan for user: {current_user.id}, cohort: {cohort_id}, week: {week_number}")
-            return {
-                "success": True,
-                "data": new_plan,
-                "message": "Plan created and retrieved successfully"
-            }
-        else:
-            return {
-                "success": True,
-                "data": None,
-                "message": "No plan or resources found for this cohort and week"
-            }
-    
-    print(f"Found plan for user: {current_user.id}, cohort: {cohort_id}, week: {week_number}")
-    
+                "update": {}
+            },
+            include=plan_include
+        )
+    except UniqueViolationError:
+        plan = await prisma.plan.find_unique(where=plan_key, include=plan_include)
+
+    logger.info("Created plan for user %s, cohort %s, week %s", current_user.id, cohort_id, week_number)
     return {
         "success": True,
         "data": plan,
-        "message": "Plan retrieved successfully"
+        "message": "Plan created and retrieved successfully"
     }
 
 @router.post("/quiz-attempts", response_model=QuizAttemptResponse)
 async def submit_quiz_attempt(attempt_data: QuizAttemptCreate, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
-    # 1. Validate Quiz and Questions
+    # 1. Validate Quiz
     quiz = await prisma.quiz.find_unique(
         where={
             "id": attempt_data.quizId
-        },
-        include={
-            "questions": {
-                "include": {
-                    "options": True
-                }
-            }
         }
     )
 
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
-    # 2. Create QuizAttempt
+    # 2. Score against the cached answer key, O(answers)
+    answer_key = await quiz_cache.load_answer_key(prisma, quiz.id, quiz.updatedAt)
+    if answer_key is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    score, answer_correctness = quiz_cache.score_answers(answer_key, attempt_data.answers)
+
+    # 3. Create QuizAttempt with its score and per-answer correctness
     quiz_attempt = await prisma.quizattempt.create(
         data={
             "quiz": {"connect": {"id": attempt_data.quizId}},
             "learner": {"connect": {"id": current_user.id}},
             "submittedAt": datetime.now(timezone.utc),
+            "score": score,
             "quizAnswers": {
                 "create": [
                     {
                         "questionId": ans.questionId,
                         "selectedOptionId": ans.selectedOptionId if ans.selectedOptionId else None,
                         "answerText": ans.answerText if ans.answerText else None,
-                    } for ans in attempt_data.answers
+                        "isCorrect": is_correct,
+                    } for ans, is_correct in zip(attempt_data.answers, answer_correctness)
                 ]
             }
-        },
-        include={
-            "quizAnswers": True
         }
     )
 
-    # 3. Generate Feedback (using Groq API)
-    # Prepare context for Groq API
-    quiz_details = {
-        "quiz_id": quiz.id,
-        "quiz_title": f"Quiz Week {quiz.weekNumber}",
-        "questions": [
-            {
-                "question_id": q.id,
-                "question_text": q.questionText,
-                "options": [{
-                    "id": opt.id,
-                    "option_text": opt.optionText,
-                    "is_correct": opt.isCorrect
-                } for opt in q.options]
-            } for q in quiz.questions
-        ]
-    }
+    # 4. Feedback is generated in the background, poll /quiz-attempts/{id}/feedback-status
+    enqueue_feedback(quiz_attempt.id)
 
-    attempt_details = [
-        {
-            "question_id": ans.questionId,
-            "selected_option_id": ans.selectedOptionId,
-            "answer_text": ans.answerText
-        } for ans in attempt_data.answers
-    ]
-
-    prompt = f"""Provide direct, informal, and honest feedback on the learner's quiz performance. Do NOT make up correct answers if the learner got a question wrong. Clearly state concepts or topics where the learner demonstrated understanding (answered correctly) and areas where they need to improve (answered incorrectly). For questions answered incorrectly, briefly explain the correct answer or concept in general terms, focusing on what they should know. The feedback should be constructive and help the learner understand their mistakes and progress. Keep it concise, not exceeding 500 characters. Do not provide question-by-question feedback.\n\nQuiz Details: {quiz_details}\nLearner's Attempt: {attempt_details}\n\nFeedback Report:"""
+    return QuizAttemptResponse(
+        id=quiz_attempt.id,
+        quizId=quiz_attempt.quizId,
+        learnerId=quiz_attempt.learnerId,
+        score=quiz_attempt.score,
+        submittedAt=quiz_attempt.submittedAt,
+        feedbackReport=None,
+        feedbackStatus="PENDING"
+    )
 
-    try:
-        chat_completion = groq_client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
+@router.get("/quiz-attempts/{attempt_id}/feedback-status")
+async def get_quiz_feedback_status(attempt_id: str, current_user = Depends(get_current_user), prisma: Prisma = Depends(get_prisma_client)):
+    feedback_report = await prisma.feedbackreport.find_first(
+        where={
+            "quizAttemptId": attempt_id,
+            "quizAttempt": {
+                "is": {
+                    "learnerId": current_user.id
                 }
-            ],
-            model="llama-3.3-70b-versatile", # You can choose a different model if needed
-            temperature=0.7,
-            max_tokens=500,
-        )
-        feedback_text = chat_completion.choices[0].message.content
-    except Exception as e:
-        print(f"Error generating feedback with Groq API: {e}")
-        feedback_text = "Failed to generate detailed feedback. Please try again later." # Fallback in case of API error
-
-    feedback_report = await prisma.feedbackreport.create(
-        data={
-            "quizAttemptId": quiz_attempt.id,
-            "reportContent": feedback_text,
-            "createdAt": datetime.now(timezone.utc)
+            }
         }
     )
 
-    # 4. Calculate Score (dummy for now, implement actual scoring logic)
-    score = 0.0 # Placeholder for actual scoring logic
+    if not feedback_report:
+        quiz_attempt = await prisma.quizattempt.find_first(
+            where={
+                "id": attempt_id,
+                "learnerId": current_user.id
+            }
+        )
+        if not quiz_attempt:
+            raise HTTPException(status_code=404, detail="Quiz attempt not found or not authorized")
 
-    updated_quiz_attempt = await prisma.quizattempt.update(
-        where={
-            "id": quiz_attempt.id
-        },
-        data={
-            "score": score
-        },
-        include={
-            "feedbackReport": True
+        return {
+            "success": True,
+            "data": {
+                "status": "PENDING",
+                "feedbackReport": None
+            },
+            "message": "Feedback is being generated"
         }
-    )
 
-    return QuizAttemptResponse(
-        id=updated_quiz_attempt.id,
-        quizId=updated_quiz_attempt.quizId,
-        learnerId=updated_quiz_attempt.learnerId,
-        score=updated_quiz_attempt.score,
-        submittedAt=updated_quiz_attempt.submittedAt,
-        feedbackReport=FeedbackReportResponse(
+    return {
+        "success": True,
+        "data": {
+            "status": "READY",
+            "feedbackReport": FeedbackReportResponse(
                 id=feedback_report.id,
                 quizAttemptId=feedback_report.quizAttemptId,
                 reportContent=feedback_report.reportContent,
                 createdAt=feedback_report.createdAt
-            ) if feedback_report else None
-    )
+            )
+        },
+        "message": "Feedback report retrieved successfully"
+    }
 
 @router.get("/quiz-attempts/{attempt_id}/detailed-report", response_model=DetailedQuizAttemptResponse)
 async def get_detailed_quiz_report(
@@ -454,12 +474,13 @@ async def get_detailed_quiz_report(
     if not quiz_attempt:
         raise HTTPException(status_code=404, detail="Quiz attempt not found or does not belong to user")
 
+    answer_key = quiz_cache.get_answer_key(quiz_attempt.quiz.id, quiz_attempt.quiz.updatedAt) or quiz_cache.store_answer_key(quiz_attempt.quiz)
+    answers_by_question = {ans.questionId: ans for ans in quiz_attempt.quizAnswers}
+
     questions_with_details = []
     for question in quiz_attempt.quiz.questions:
-        selected_answer = next(
-            (ans for ans in quiz_attempt.quizAnswers if ans.questionId == question.id),
-            None
-        )
+        selected_answer = answers_by_question.get(question.id)
+        correct_ids = answer_key.get(question.id, frozenset())
 
         selected_option_id = None
         attempted_answer_text = None
@@ -470,28 +491,23 @@ async def get_detailed_quiz_report(
             selected_option_id = selected_answer.selectedOptionId
             attempted_answer_text = selected_answer.answerText
 
-        # Determine correct answer based on question type
-        if question.questionType == "MCQ":
-            correct_option = next((opt for opt in question.options if opt.isCorrect), None)
-            if correct_option:
-                correct_answer_id = correct_option.id
-                correct_answer_text = correct_option.optionText
-        elif question.questionType == "TEXT":
-            # For text answers, the correct answer might be stored differently or not directly in options
-            # Assuming for now it's not directly available in options for TEXT type
-            # You might need to fetch this from another source or a dedicated field in the Question model
-            pass # Placeholder, implement actual logic if correct text answer is stored
+        # TEXT questions have no correct option; their correct text isn't stored yet
+        options = []
+        for opt in question.options:
+            is_correct = opt.id in correct_ids
+            if is_correct and correct_answer_id is None:
+                correct_answer_id = opt.id
+                correct_answer_text = opt.optionText
+            options.append(OptionWithCorrectness(
+                id=opt.id,
+                text=opt.optionText,
+                isCorrect=is_correct
+            ))
 
         questions_with_details.append(QuestionWithAttemptAndCorrectAnswer(
             id=question.id,
             text=question.questionText,
-            options=[
-                OptionWithCorrectness(
-                    id=opt.id,
-                    text=opt.optionText,
-                    isCorrect=opt.isCorrect
-                ) for opt in question.options
-            ],
+            options=options,
             type=question.questionType,
             selectedOptionId=selected_option_id,
             attemptedAnswerText=attempted_answer_text,
@@ -741,15 +757,7 @@ async def get_quiz_feedback(attempt_id: str, current_user = Depends(get_current_
             "learnerId": current_user.id
         },
         include={
-            "quiz": {
-                "include": {
-                    "questions": {
-                        "include": {
-                            "options": True
-                        }
-                    }
-                }
-            },
+            "quiz": True,
             "quizAnswers": {
                 "include": {
                     "question": {
@@ -770,18 +778,23 @@ async def get_quiz_feedback(attempt_id: str, current_user = Depends(get_current_
     if not quiz_attempt.quiz:
         raise HTTPException(status_code=404, detail="Associated quiz not found")
 
+    answer_key = await quiz_cache.load_answer_key(prisma, quiz_attempt.quiz.id, quiz_attempt.quiz.updatedAt) or {}
+
     feedback_questions = []
     score = 0
-    total_questions = len(quiz_attempt.quiz.questions)
+    total_questions = len(answer_key)
 
     for qa in quiz_attempt.quizAnswers:
         question = qa.question
         selected_option = qa.selectedOption
-        correct_option = next((opt for opt in question.options if opt.isCorrect), None)
-
-        is_correct = False
-        if selected_option and correct_option and selected_option.id == correct_option.id:
-            is_correct = True
+        correct_ids = answer_key.get(question.id, frozenset())
+        correct_option = next((opt for opt in question.options if opt.id in correct_ids), None)
+
+        # Attempts scored before correctness was persisted fall back to the answer key
+        is_correct = qa.isCorrect
+        if is_correct is None:
+            is_correct = qa.selectedOptionId is not None and qa.selectedOptionId in correct_ids
+        if is_correct:
             score += 1
 
         user_answer_text = None
@@ -0,0 +1,27 @@
+# test/conftest.py
+import importlib
+import os
+
+import pytest
+
+from modules import logging_config
+
+
+@pytest.fixture(scope="session")
+def routes():
+    """
+    The route modules, loaded through main, which mounts ./uploads
+    (so it has to exist for the import) and starts the log listener.
+    routes.auth needs a JWT secret.
+    """
+    os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+    created = not os.path.isdir("uploads")
+    os.makedirs("uploads", exist_ok=True)
+    try:
+        # main imports the routers, which import main back
+        importlib.import_module("main")
+    finally:
+        if created:
+            os.rmdir("uploads")
+    yield importlib.import_module("routes")
+    logging_config.stop_logging()
@@ -0,0 +1,136 @@
+# test/test_cache.py
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from modules import cache as cache_module
+from modules.cache import Cache, MemoryBackend, RedisBackend
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_expires_and_evicts():
+    backend = MemoryBackend(max_entries=2)
+    await backend.set("a", 1, ttl=0.01)
+    await backend.set("b", 2)
+    await asyncio.sleep(0.02)
+    assert await backend.get("a") is None
+
+    await backend.set("c", 3)
+    await backend.set("d", 4)
+    assert await backend.get("b") is None
+    assert await backend.get("d") == 4
+
+
+@pytest.mark.asyncio
+async def test_invalidate_hides_every_key_in_the_namespace():
+    cache = Cache(MemoryBackend())
+    quizzes = cache.namespace("quizzes")
+    other = cache.namespace("other")
+    await quizzes.set("list", [1])
+    await other.set("list", [2])
+
+    await quizzes.invalidate()
+    assert await quizzes.get("list") is None
+    assert await other.get("list") == [2]
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_loads_once_for_concurrent_misses():
+    cache = Cache(MemoryBackend())
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {"rows": len(loads)}
+
+    results = await asyncio.gather(*(cache.namespace("ns").get_or_set("key", load) for _ in range(10)))
+    assert results == [{"rows": 1}] * 10
+    assert len(loads) == 1
+
+
+@pytest.mark.asyncio
+async def test_out_of_order_broadcast_does_not_regress_the_version():
+    cache = Cache(MemoryBackend())
+    cache._on_broadcast("cohort-content:c1=5")
+    cache._on_broadcast("cohort-content:c1=3")
+    assert await cache.version("cohort-content:c1") == 5
+
+
+@pytest.mark.asyncio
+async def test_lock_wait_timeout_leaves_the_holders_lock_alone(monkeypatch):
+    monkeypatch.setattr(cache_module, "CACHE_LOCK_TTL_SECONDS", 0.1)
+    cache = Cache(MemoryBackend())
+    namespace = cache.namespace("ns")
+    lock_key = f"{await namespace._key('key')}:lock"
+    # Another worker is loading the key and outlives our wait
+    await cache.backend.add(lock_key, "other-worker", ttl=60)
+
+    async def load():
+        return "value"
+
+    assert await namespace.get_or_set("key", load) == "value"
+    assert await cache.backend.get(lock_key) == "other-worker"
+
+
+@pytest.fixture
+def redis_url(monkeypatch):
+    """REDIS_URL when set; otherwise an in-process fakeredis server stands in."""
+    monkeypatch.setattr(cache_module, "CACHE_KEY_PREFIX", f"test-{uuid.uuid4().hex[:8]}")
+    if os.environ.get("REDIS_URL"):
+        return os.environ["REDIS_URL"]
+
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis import asyncio as redis_asyncio
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_asyncio, "from_url", lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server))
+    return "redis://stand-in"
+
+
+@pytest.mark.asyncio
+async def test_redis_workers_share_values_and_invalidations(redis_url):
+    first = Cache(RedisBackend(redis_url))
+    second = Cache(RedisBackend(redis_url))
+    await first.start()
+    await second.start()
+    try:
+        assert first.epoch == second.epoch
+
+        loads = []
+
+        async def load():
+            loads.append(1)
+            await asyncio.sleep(0.1)
+            return "value"
+
+        results = await asyncio.gather(
+            first.namespace("ns").get_or_set("key", load),
+            second.namespace("ns").get_or_set("key", load),
+        )
+        assert results == ["value", "value"]
+        assert len(loads) == 1
+        # The loader's lock was released
+        assert await first.backend.get(f"{await first.namespace('ns')._key('key')}:lock") is None
+
+        await first.namespace("ns").invalidate()
+        await asyncio.sleep(0.1)
+        assert await second.namespace("ns").get("key") is None
+    finally:
+        await first.close()
+        await second.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_is_only_released_by_its_owner(redis_url):
+    backend = RedisBackend(redis_url)
+    try:
+        assert await backend.add("lock", "owner", ttl=60)
+        assert not await backend.add("lock", "intruder", ttl=60)
+        await backend.delete_if_equal("lock", "intruder")
+        assert await backend.get("lock") == "owner"
+        await backend.delete_if_equal("lock", "owner")
+        assert await backend.get("lock") is None
+    finally:
+        await backend.close()
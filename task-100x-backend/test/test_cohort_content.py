@@ -0,0 +1,44 @@
+# test/test_cohort_content.py
+import pytest
+from starlette.requests import Request
+
+from modules import cohort_content
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.mark.asyncio
+async def test_cached_response_serves_304_and_reuses_body_until_invalidated():
+    builds = []
+
+    async def build():
+        builds.append(1)
+        return {"data": [len(builds)]}
+
+    first = await cohort_content.cached_response(make_request(), "cohort-1", ("resources", 1), build)
+    assert first.status_code == 200
+    assert first.body == b'{"data":[1]}'
+    etag = first.headers["etag"]
+
+    not_modified = await cohort_content.cached_response(make_request(etag), "cohort-1", ("resources", 1), build)
+    assert not_modified.status_code == 304
+
+    again = await cohort_content.cached_response(make_request('W/"stale"'), "cohort-1", ("resources", 1), build)
+    assert again.body == b'{"data":[1]}'
+    assert len(builds) == 1
+
+    await cohort_content.invalidate_cohort("cohort-1")
+    changed = await cohort_content.cached_response(make_request(etag), "cohort-1", ("resources", 1), build)
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.body == b'{"data":[2]}'
+
+
+@pytest.mark.asyncio
+async def test_cohort_edits_bump_the_cross_cohort_version():
+    before = await cohort_content.content_version(None)
+    await cohort_content.invalidate_cohort("cohort-2")
+    assert await cohort_content.content_version(None) != before
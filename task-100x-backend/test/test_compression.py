@@ -0,0 +1,71 @@
+# test/test_compression.py
+import gzip
+import zlib
+
+import pytest
+
+from modules import compression
+from modules.compression import CompressionMiddleware, choose_encoding
+
+
+def make_app(chunks, content_type=b"application/json"):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+
+async def call(app, accept_encoding):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    await app(scope, receive, send)
+    headers = dict(messages[0]["headers"])
+    return headers, [m["body"] for m in messages[1:]]
+
+
+def test_choose_encoding_honours_q_values():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*") == ("br" if compression.brotli else "gzip")
+
+
+@pytest.mark.asyncio
+async def test_gzips_bodies_over_the_threshold_only():
+    body = b'{"data":"' + b"x" * 4096 + b'"}'
+    headers, chunks = await call(CompressionMiddleware(make_app([body]), minimum_size=1024), "gzip")
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert gzip.decompress(chunks[0]) == body
+
+    headers, chunks = await call(CompressionMiddleware(make_app([b'{"ok":true}']), minimum_size=1024), "gzip")
+    assert b"content-encoding" not in headers
+    assert chunks == [b'{"ok":true}']
+
+
+@pytest.mark.asyncio
+async def test_streamed_chunks_are_decodable_as_they_arrive():
+    parts = [b"[", b"1," * 100, b"2]"]
+    headers, chunks = await call(CompressionMiddleware(make_app(parts), minimum_size=1024), "gzip")
+    assert headers[b"content-encoding"] == b"gzip"
+
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decoder.decompress(chunks[0]) == parts[0]
+    assert decoder.decompress(chunks[1]) == parts[1]
+    assert decoder.decompress(chunks[2]) + decoder.flush() == parts[2]
+
+
+@pytest.mark.asyncio
+async def test_skips_images():
+    body = b"\x89PNG" + b"\x00" * 4096
+    headers, chunks = await call(CompressionMiddleware(make_app([body], b"image/png")), "gzip")
+    assert b"content-encoding" not in headers
+    assert chunks == [body]
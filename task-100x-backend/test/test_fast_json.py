@@ -0,0 +1,46 @@
+# test/test_fast_json.py
+import json
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import BaseModel
+from starlette.requests import Request
+
+from modules.fast_json import FastJSONResponse, streamed_list
+
+
+class Item(BaseModel):
+    id: str
+    createdAt: datetime
+
+
+def test_renders_models_datetimes_and_sets():
+    created_at = datetime(2025, 9, 1, 12, 0, tzinfo=timezone.utc)
+    response = FastJSONResponse(content={"data": [Item(id="a", createdAt=created_at)], "tags": {"x"}})
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {
+        "data": [{"id": "a", "createdAt": "2025-09-01T12:00:00+00:00"}],
+        "tags": ["x"],
+    }
+
+
+async def read_body(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.mark.asyncio
+async def test_streamed_list_renders_an_enveloped_array_or_ndjson():
+    async def pages():
+        yield [{"id": 1}, {"id": 2}]
+        yield []
+        yield [{"id": 3}]
+
+    def request(query=b""):
+        return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": query})
+
+    response = streamed_list(request(), pages(), envelope={"message": "ok"})
+    assert json.loads(await read_body(response)) == {"message": "ok", "data": [{"id": 1}, {"id": 2}, {"id": 3}]}
+
+    response = streamed_list(request(b"format=ndjson"), [Item(id="a", createdAt=datetime(2025, 9, 1, tzinfo=timezone.utc))])
+    assert response.media_type == "application/x-ndjson"
+    assert await read_body(response) == b'{"id":"a","createdAt":"2025-09-01T00:00:00+00:00"}\n'
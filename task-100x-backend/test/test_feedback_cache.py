@@ -0,0 +1,53 @@
+# test/test_feedback_cache.py
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from modules import feedback_cache
+
+quiz_version = datetime(2025, 7, 24, 14, 0, tzinfo=timezone.utc)
+
+
+def make_answers(*option_ids):
+    return [SimpleNamespace(selectedOptionId=o, answerText=None) for o in option_ids]
+
+
+def test_pattern_key_is_order_independent():
+    assert feedback_cache.pattern_key("quiz-1", quiz_version, make_answers("b", "a")) == \
+        feedback_cache.pattern_key("quiz-1", quiz_version, make_answers("a", "b"))
+
+
+def test_free_text_answers_are_not_reused():
+    answers = [SimpleNamespace(selectedOptionId=None, answerText="my own words")]
+    assert feedback_cache.pattern_key("quiz-1", quiz_version, answers) is None
+
+
+@pytest.mark.asyncio
+async def test_reuse_limit_and_single_flight(monkeypatch):
+    feedback_cache.clear()
+    monkeypatch.setattr(feedback_cache, "FEEDBACK_REUSE_LIMIT", 2)
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return f"feedback #{len(calls)}"
+
+    key = feedback_cache.pattern_key("quiz-1", quiz_version, make_answers("a"))
+
+    # Concurrent identical patterns share one generation
+    results = await asyncio.gather(*(feedback_cache.get_or_generate(key, generate) for _ in range(3)))
+    assert results == ["feedback #1"] * 3
+    assert len(calls) == 1
+
+    # Two reuses of the stored text, then it's regenerated
+    assert await feedback_cache.get_or_generate(key, generate) == "feedback #1"
+    assert await feedback_cache.get_or_generate(key, generate) == "feedback #1"
+    assert await feedback_cache.get_or_generate(key, generate) == "feedback #2"
+
+    stats = feedback_cache.get_stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 4
+    assert stats["expired"] == 1
@@ -0,0 +1,135 @@
+# test/test_feedback_worker.py
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from modules import feedback_cache, feedback_worker
+
+LEARNER = SimpleNamespace(id="learner-1", role="LEARNER")
+
+
+def make_attempt(attempt_id, submitted_at, report=None):
+    quiz = SimpleNamespace(
+        id="quiz-1", weekNumber=2, updatedAt=datetime(2025, 9, 1, tzinfo=timezone.utc),
+        questions=[SimpleNamespace(id="q1", questionText="2 + 2?", options=[SimpleNamespace(id="o1", optionText="4", isCorrect=True)])]
+    )
+    return SimpleNamespace(
+        id=attempt_id, learnerId=LEARNER.id, submittedAt=submitted_at, feedbackReport=report, quiz=quiz,
+        quizAnswers=[SimpleNamespace(questionId="q1", selectedOptionId="o1", answerText=None)]
+    )
+
+
+class FakeAttempts:
+    def __init__(self, attempts):
+        self.attempts = {attempt.id: attempt for attempt in attempts}
+
+    async def find_many(self, where, order, take):
+        since = where["submittedAt"]["gte"]
+        pending = [a for a in self.attempts.values() if a.feedbackReport is None and a.submittedAt >= since]
+        return sorted(pending, key=lambda a: a.submittedAt)[:take]
+
+    async def find_unique(self, where, include):
+        return self.attempts.get(where["id"])
+
+    async def find_first(self, where):
+        attempt = self.attempts.get(where["id"])
+        return attempt if attempt and attempt.learnerId == where["learnerId"] else None
+
+
+class FakeReports:
+    def __init__(self, attempts):
+        self.attempts = attempts
+        self.reports = {}
+        self.upserts = 0
+
+    async def upsert(self, where, data):
+        # quizAttemptId is unique: a second write for an attempt takes the update branch
+        self.upserts += 1
+        attempt_id = where["quizAttemptId"]
+        if attempt_id in self.reports:
+            self.reports[attempt_id].__dict__.update(data["update"])
+        else:
+            self.reports[attempt_id] = SimpleNamespace(id=f"report-{attempt_id}", **data["create"])
+            self.attempts.attempts[attempt_id].feedbackReport = self.reports[attempt_id]
+        return self.reports[attempt_id]
+
+    async def find_first(self, where):
+        report = self.reports.get(where["quizAttemptId"])
+        learner_id = where["quizAttempt"]["is"]["learnerId"]
+        if report and self.attempts.attempts[report.quizAttemptId].learnerId == learner_id:
+            return report
+        return None
+
+
+class FakePrisma:
+    def __init__(self, *attempts):
+        self.quizattempt = FakeAttempts(attempts)
+        self.feedbackreport = FakeReports(self.quizattempt)
+
+
+@pytest.fixture
+def feedback(monkeypatch):
+    feedback_cache.clear()
+    texts = []
+
+    async def fake_generate_quiz_feedback(quiz_details, attempt_details):
+        texts.append(f"feedback #{len(texts) + 1}")
+        return texts[-1]
+
+    monkeypatch.setattr(feedback_worker, "generate_quiz_feedback", fake_generate_quiz_feedback)
+    return texts
+
+
+def test_queue_is_bounded(monkeypatch):
+    monkeypatch.setattr(feedback_worker, "FEEDBACK_QUEUE_MAX_SIZE", 2)
+    worker = feedback_worker.FeedbackWorker(FakePrisma())
+
+    assert [worker.enqueue(f"a{i}") for i in range(3)] == [True, True, False]
+    assert worker.queue.qsize() == 2
+
+
+@pytest.mark.asyncio
+async def test_startup_requeues_recent_attempts_without_a_report():
+    now = datetime.now(timezone.utc)
+    prisma = FakePrisma(
+        make_attempt("recent", now - timedelta(hours=2)),
+        make_attempt("older", now - timedelta(hours=20)),
+        make_attempt("stale", now - timedelta(hours=feedback_worker.FEEDBACK_RECOVERY_HOURS + 1)),
+        make_attempt("done", now - timedelta(hours=1), report=SimpleNamespace(id="r1")),
+    )
+    worker = feedback_worker.FeedbackWorker(prisma)
+
+    await worker._recover_pending()
+
+    assert [worker.queue.get_nowait() for _ in range(worker.queue.qsize())] == ["older", "recent"]
+
+
+@pytest.mark.asyncio
+async def test_retry_after_another_worker_wrote_the_report_keeps_it(feedback):
+    attempt = make_attempt("a1", datetime.now(timezone.utc))
+    prisma = FakePrisma(attempt)
+    worker = feedback_worker.FeedbackWorker(prisma)
+
+    await worker.process("a1")
+    # Another process read the attempt before the report existed
+    attempt.feedbackReport = None
+    await worker.process("a1")
+
+    assert prisma.feedbackreport.upserts == 2
+    assert list(prisma.feedbackreport.reports) == ["a1"]
+    assert prisma.feedbackreport.reports["a1"].reportContent == "feedback #1"
+
+
+@pytest.mark.asyncio
+async def test_feedback_status_goes_from_pending_to_ready(routes, feedback):
+    prisma = FakePrisma(make_attempt("a1", datetime.now(timezone.utc)))
+
+    pending = await routes.learner.get_quiz_feedback_status("a1", LEARNER, prisma)
+    assert pending["data"] == {"status": "PENDING", "feedbackReport": None}
+
+    await feedback_worker.FeedbackWorker(prisma).process("a1")
+
+    ready = await routes.learner.get_quiz_feedback_status("a1", LEARNER, prisma)
+    assert ready["data"]["status"] == "READY"
+    assert ready["data"]["feedbackReport"].reportContent == "feedback #1"
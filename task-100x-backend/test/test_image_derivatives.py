@@ -0,0 +1,64 @@
+# test/test_image_derivatives.py
+import io
+
+import pytest
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image  # noqa: E402
+
+from modules import image_derivatives  # noqa: E402
+from modules.uploads import LocalUploadBackend, StoredFile  # noqa: E402
+
+
+def make_png(width: int, height: int) -> bytes:
+    # Noise, so the JPEG can't compress it down to nothing
+    image = Image.frombytes("RGBA", (width, height), bytes((i * 7919) % 256 for i in range(width * height * 4)))
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_whatsapp_derivative_is_capped_and_thumbnail_is_small():
+    rendered = image_derivatives.render_derivatives(make_png(2400, 1600), 1280, 120 * 1024, 320)
+
+    whatsapp = Image.open(io.BytesIO(rendered["whatsapp"]))
+    assert whatsapp.format == "JPEG"
+    assert max(whatsapp.size) <= 1280
+    assert len(rendered["whatsapp"]) <= 120 * 1024
+
+    thumbnail = Image.open(io.BytesIO(rendered["thumbnail"]))
+    assert thumbnail.size == (320, 213)
+
+
+@pytest.mark.asyncio
+async def test_create_derivatives_stores_them_next_to_the_original(tmp_path):
+    stored = StoredFile(key="abc.png", url="/uploads/abc.png", sha256="abc", size=0, content_type="image/png", created=True)
+    try:
+        urls = await image_derivatives.create_derivatives(stored, io.BytesIO(make_png(64, 64)), LocalUploadBackend(str(tmp_path)))
+    finally:
+        image_derivatives.shutdown_pool()
+
+    assert urls == {"whatsappImageUrl": "/uploads/abc-whatsapp.jpg", "thumbnailUrl": "/uploads/abc-thumbnail.jpg"}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["abc-thumbnail.jpg", "abc-whatsapp.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_deduped_image_reuses_existing_derivatives(tmp_path, monkeypatch):
+    backend = LocalUploadBackend(str(tmp_path))
+    (tmp_path / "abc-whatsapp.jpg").write_bytes(b"jpeg")
+    (tmp_path / "abc-thumbnail.jpg").write_bytes(b"jpeg")
+    stored = StoredFile(key="abc.png", url="/uploads/abc.png", sha256="abc", size=0, content_type="image/png", created=False)
+
+    def no_pool():
+        raise AssertionError("derivatives were rendered again")
+
+    monkeypatch.setattr(image_derivatives, "_get_pool", no_pool)
+    urls = await image_derivatives.create_derivatives(stored, io.BytesIO(make_png(64, 64)), backend)
+    assert urls == {"whatsappImageUrl": "/uploads/abc-whatsapp.jpg", "thumbnailUrl": "/uploads/abc-thumbnail.jpg"}
+
+
+def test_workers_are_not_forked_from_the_app_process():
+    try:
+        assert image_derivatives._get_pool()._mp_context.get_start_method() == "forkserver"
+    finally:
+        image_derivatives.shutdown_pool()
@@ -0,0 +1,343 @@
+# test/test_linkedin_scraper.py
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from modules import linkedin_scraper
+
+
+def matches(job, where):
+    for key, value in where.items():
+        if key == "OR":
+            if not any(matches(job, clause) for clause in value):
+                return False
+        elif isinstance(value, dict):
+            actual = getattr(job, key, None)
+            if "in" in value and actual not in value["in"]:
+                return False
+            if "lt" in value and (actual is None or actual >= value["lt"]):
+                return False
+        elif getattr(job, key, None) != value:
+            return False
+    return True
+
+
+class FakeScrapeJobs:
+    def __init__(self, jobs=()):
+        self.jobs = {job.id: job for job in jobs}
+        self.updates = []
+
+    async def update(self, where, data):
+        self.updates.append(data)
+        if where["id"] in self.jobs and "status" in data:
+            self.jobs[where["id"]].status = data["status"]
+
+    async def update_many(self, where, data):
+        matched = [job for job in self.jobs.values() if matches(job, where)]
+        for job in matched:
+            self.updates.append(data)
+            for key, value in data.items():
+                setattr(job, key, value)
+        return len(matched)
+
+
+class FakeUsers:
+    def __init__(self, users=()):
+        self.users = list(users)
+
+    async def find_many(self, where):
+        return [user for user in self.users if user.id in where["id"]["in"]]
+
+
+class FakePosts:
+    def __init__(self, recent_posts):
+        self.recent_posts = recent_posts
+
+    async def group_by(self, by, where, count):
+        user_ids = where.get("userId", {}).get("in", self.recent_posts)
+        return [{"userId": uid, "_count": {"_all": n}} for uid, n in self.recent_posts.items() if uid in user_ids]
+
+
+class FakePrisma:
+    def __init__(self, jobs=(), users=(), recent_posts=None):
+        self.scrapejob = FakeScrapeJobs(jobs)
+        self.user = FakeUsers(users)
+        self.post = FakePosts(recent_posts or {})
+        self.raw = []
+
+    async def execute_raw(self, query, *args):
+        self.raw.append((query, args))
+        return 0
+
+
+def make_runner(batch_size=4):
+    prisma = FakePrisma()
+    job = SimpleNamespace(id="job-1", concurrency=2, batchSize=batch_size)
+    return linkedin_scraper.ScrapeJobRunner(prisma, job, cookie=[]), prisma
+
+
+def make_users(*usernames):
+    return [SimpleNamespace(id=f"id-{u}", linkedinUsername=u, linkedinScrapedAt=None, linkedinNewestPostAt=None) for u in usernames]
+
+
+def test_username_from_input_url_is_case_insensitive():
+    assert linkedin_scraper.username_from_input_url("https://www.linkedin.com/in/Jane-Doe/recent-activity/all/") == "jane-doe"
+    assert linkedin_scraper.username_from_input_url(None) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_split_until_bad_profile_is_isolated(monkeypatch):
+    runner, prisma = make_runner()
+    calls = []
+
+    async def fake_stream_actor_items(client, cookie, urls, limit_per_source=None):
+        calls.append(len(urls))
+        if any("/in/bad/" in url for url in urls):
+            response = httpx.Response(400, request=httpx.Request("POST", linkedin_scraper.APIFY_ACTOR_URL))
+            raise httpx.HTTPStatusError("actor run failed", request=response.request, response=response)
+        for _ in ():
+            yield
+
+    async def fake_upsert_posts(prisma, rows):
+        return {"inserted": 0, "updated": 0}
+
+    monkeypatch.setattr(linkedin_scraper, "stream_actor_items", fake_stream_actor_items)
+    monkeypatch.setattr(linkedin_scraper, "upsert_posts", fake_upsert_posts)
+
+    runner.pending_users = 4
+    await runner._scrape_batch(None, make_users("a", "b", "bad", "d"))
+
+    # 4 -> (2 ok, 2 failed) -> (1 ok, 1 failed)
+    assert sorted(calls) == [1, 1, 2, 2, 4]
+    # Scraped or failed, every user has left the queue
+    assert runner.pending_users == 0
+    processed = [uid for u in prisma.scrapejob.updates for uid in u.get("processedUserIds", {}).get("push", [])]
+    failed = [uid for u in prisma.scrapejob.updates for uid in u.get("failedUserIds", {}).get("push", [])]
+    assert sorted(processed) == ["id-a", "id-b", "id-d"]
+    assert failed == ["id-bad"]
+    assert sum(u["actorRuns"]["increment"] for u in prisma.scrapejob.updates) == len(calls)
+
+
+@pytest.mark.parametrize("error", [
+    httpx.HTTPStatusError("quota", request=httpx.Request("POST", "https://api.apify.com"), response=httpx.Response(402)),
+    httpx.ConnectError("network down"),
+])
+@pytest.mark.asyncio
+async def test_systemic_failure_interrupts_the_job_without_splitting(monkeypatch, error):
+    job = SimpleNamespace(
+        id="job-quota", status="PENDING", ownerId=linkedin_scraper.WORKER_ID, concurrency=1, batchSize=2, budget=0,
+        pendingUserIds=["id-a", "id-b", "id-c", "id-d"], processedUserIds=[]
+    )
+    prisma = FakePrisma([job], make_users("a", "b", "c", "d"))
+    calls = []
+
+    async def fake_stream_actor_items(client, cookie, urls, limit_per_source=None):
+        calls.append(len(urls))
+        raise error
+        yield
+
+    monkeypatch.setattr(linkedin_scraper, "stream_actor_items", fake_stream_actor_items)
+
+    await linkedin_scraper.ScrapeJobRunner(prisma, job, cookie=[]).run()
+
+    # One run fails, the queued batch never starts and nothing is bisected
+    assert calls == [2]
+    assert job.status == "INTERRUPTED"
+    assert not [u for u in prisma.scrapejob.updates if "processedUserIds" in u or u.get("failedUserIds", {}).get("push")]
+    assert prisma.scrapejob.updates[-1]["error"]
+
+
+@pytest.mark.asyncio
+async def test_job_orphaned_by_restart_can_be_resumed(monkeypatch):
+    # Its worker stopped heartbeating a few minutes ago
+    job = SimpleNamespace(
+        id="job-orphan", status="RUNNING", ownerId="dead-worker", heartbeatAt=datetime.now(timezone.utc) - timedelta(minutes=5),
+        concurrency=1, batchSize=2, budget=0, pendingUserIds=["id-a", "id-b"], processedUserIds=["id-a"]
+    )
+    prisma = FakePrisma([job], make_users("a", "b"))
+    scraped = []
+
+    async def fake_stream_actor_items(client, cookie, urls, limit_per_source=None):
+        scraped.append(urls)
+        for _ in ():
+            yield
+
+    monkeypatch.setattr(linkedin_scraper, "stream_actor_items", fake_stream_actor_items)
+
+    await linkedin_scraper.mark_interrupted_jobs(prisma)
+    assert job.status == "INTERRUPTED"
+    assert not linkedin_scraper.is_running(job.id)
+
+    # Two resumes racing: only one worker gets the job
+    assert await linkedin_scraper.claim_job(prisma, job.id)
+    assert not await linkedin_scraper.claim_job(prisma, job.id)
+    assert job.ownerId == linkedin_scraper.WORKER_ID
+
+    linkedin_scraper.start_job(prisma, job, cookie=[])
+    await linkedin_scraper._running_jobs[job.id]
+    assert job.id not in linkedin_scraper._runners
+
+    assert scraped == [[linkedin_scraper.profile_url("b")]]
+    assert job.status == "COMPLETED"
+    assert not linkedin_scraper.is_running(job.id)
+
+
+@pytest.mark.asyncio
+async def test_jobs_other_workers_are_running_are_left_alone():
+    job = SimpleNamespace(id="job-live", status="RUNNING", ownerId="other-worker", heartbeatAt=datetime.now(timezone.utc))
+    prisma = FakePrisma([job])
+
+    await linkedin_scraper.mark_interrupted_jobs(prisma)
+    assert job.status == "RUNNING"
+    assert not await linkedin_scraper.claim_job(prisma, job.id)
+    assert job.ownerId == "other-worker"
+
+
+@pytest.mark.asyncio
+async def test_runner_stops_when_its_job_is_claimed_elsewhere(monkeypatch):
+    monkeypatch.setattr(linkedin_scraper, "LINKEDIN_SCRAPE_HEARTBEAT_SECONDS", 0)
+    job = SimpleNamespace(id="job-1", status="RUNNING", ownerId="other-worker", concurrency=1, batchSize=1)
+    prisma = FakePrisma([job])
+    runner = linkedin_scraper.ScrapeJobRunner(prisma, job, cookie=[])
+
+    await runner._heartbeat()
+    assert runner.abort_reason
+
+    await runner._finish({"status": "INTERRUPTED"})
+    assert job.status == "RUNNING"
+
+
+@pytest.mark.asyncio
+async def test_watermarks_move_only_for_profiles_in_the_output_in_one_query(monkeypatch):
+    runner, prisma = make_runner()
+
+    async def fake_stream_actor_items(client, cookie, urls, limit_per_source=None):
+        yield {"url": "p1", "text": "#100xengineers", "inputUrl": "https://www.linkedin.com/in/a/", "postedAtISO": "2025-09-05T10:00:00Z"}
+        yield {"url": "p2", "text": "no tag", "inputUrl": "https://www.linkedin.com/in/b/"}
+
+    async def fake_upsert_posts(prisma, rows):
+        return {"inserted": len(rows), "updated": 0}
+
+    monkeypatch.setattr(linkedin_scraper, "stream_actor_items", fake_stream_actor_items)
+    monkeypatch.setattr(linkedin_scraper, "upsert_posts", fake_upsert_posts)
+
+    # "private" returned nothing, so it keeps its place in the queue
+    await runner._scrape_batch(None, make_users("a", "b", "private"))
+
+    watermark_updates = [args for query, args in prisma.raw if 'UPDATE "User"' in query]
+    assert len(watermark_updates) == 1
+    pairs = dict(zip(watermark_updates[0][::2], watermark_updates[0][1::2]))
+    assert pairs == {"id-a": "2025-09-05T10:00:00+00:00", "id-b": None}
+
+
+@pytest.mark.asyncio
+async def test_a_full_page_at_a_reduced_limit_holds_the_watermark(monkeypatch):
+    runner, prisma = make_runner()
+
+    async def fake_stream_actor_items(client, cookie, urls, limit_per_source=None):
+        # Both "a" posts are past its watermark, so there may be more before
+        # them; "b" reached back to its watermark and "c" has nothing older
+        for username, day in [("a", 5), ("a", 4), ("b", 5), ("b", 1), ("c", 3)]:
+            yield {"url": f"{username}{day}", "text": "#100xengineers", "inputUrl": f"https://www.linkedin.com/in/{username}/", "postedAtISO": f"2025-09-0{day}T10:00:00Z"}
+
+    async def fake_upsert_posts(prisma, rows):
+        return {"inserted": len(rows), "updated": 0}
+
+    monkeypatch.setattr(linkedin_scraper, "stream_actor_items", fake_stream_actor_items)
+    monkeypatch.setattr(linkedin_scraper, "upsert_posts", fake_upsert_posts)
+
+    users = make_users("a", "b", "c")
+    for user in users:
+        user.linkedinNewestPostAt = datetime(2025, 9, 2, tzinfo=timezone.utc)
+    await runner._scrape_batch(None, users, limit=2)
+
+    args = next(args for query, args in prisma.raw if 'UPDATE "User"' in query)
+    assert dict(zip(args[::2], args[1::2])) == {
+        "id-a": None,
+        "id-b": "2025-09-05T10:00:00+00:00",
+        "id-c": "2025-09-03T10:00:00+00:00",
+    }
+
+    # A full page at the full limit is the most a crawl fetches; it moves
+    prisma.raw.clear()
+    await runner._scrape_batch(None, users, limit=linkedin_scraper.LINKEDIN_POSTS_PER_PROFILE)
+    args = next(args for query, args in prisma.raw if 'UPDATE "User"' in query)
+    assert dict(zip(args[::2], args[1::2]))["id-a"] == "2025-09-05T10:00:00+00:00"
+
+
+def test_posts_limit_scales_with_posting_rate_since_the_watermark():
+    now = datetime(2025, 9, 10, tzinfo=timezone.utc)
+    unscraped = SimpleNamespace(linkedinNewestPostAt=None)
+    quiet = SimpleNamespace(linkedinNewestPostAt=now - timedelta(days=3))
+    assert linkedin_scraper.posts_limit(unscraped, 0, now) == linkedin_scraper.LINKEDIN_POSTS_PER_PROFILE
+    # No recent posts: one post is enough to see whether anything is new
+    assert linkedin_scraper.posts_limit(quiet, 0, now) == 1
+    assert linkedin_scraper.posts_limit(quiet, 2, now) == 2
+    assert linkedin_scraper.posts_limit(quiet, 60, now) == linkedin_scraper.LINKEDIN_POSTS_PER_PROFILE
+
+
+@pytest.mark.asyncio
+async def test_runs_group_profiles_by_post_limit(monkeypatch):
+    now = datetime.now(timezone.utc)
+    users = make_users("new", "quiet", "busy")
+    users[1].linkedinNewestPostAt = now - timedelta(days=3)
+    users[2].linkedinNewestPostAt = now - timedelta(days=3)
+    job = SimpleNamespace(
+        id="job-limits", status="PENDING", concurrency=1, batchSize=10, budget=0,
+        pendingUserIds=[user.id for user in users], processedUserIds=[]
+    )
+    prisma = FakePrisma([job], users, recent_posts={"id-busy": 60})
+    runs = []
+
+    async def fake_stream_actor_items(client, cookie, urls, limit_per_source=None):
+        runs.append((limit_per_source, sorted(url.split("/in/")[1].split("/")[0] for url in urls)))
+        for _ in ():
+            yield
+
+    monkeypatch.setattr(linkedin_scraper, "stream_actor_items", fake_stream_actor_items)
+    await linkedin_scraper.ScrapeJobRunner(prisma, job, cookie=[]).run()
+
+    assert sorted(runs) == [(1, ["quiet"]), (linkedin_scraper.LINKEDIN_POSTS_PER_PROFILE, ["busy", "new"])]
+
+
+def test_never_scraped_and_frequent_posters_come_first():
+    now = datetime(2025, 9, 10, tzinfo=timezone.utc)
+    never = SimpleNamespace(linkedinScrapedAt=None)
+    day_old = SimpleNamespace(linkedinScrapedAt=now - timedelta(days=1))
+    assert linkedin_scraper.crawl_priority(never, 0, now) > linkedin_scraper.crawl_priority(day_old, 10, now)
+    assert linkedin_scraper.crawl_priority(day_old, 3, now) > linkedin_scraper.crawl_priority(day_old, 0, now)
+
+
+def test_newest_posted_at_is_tracked_per_user():
+    items = [
+        {"inputUrl": "https://www.linkedin.com/in/jane/", "postedAtISO": "2025-09-01T10:00:00Z"},
+        {"inputUrl": "https://www.linkedin.com/in/Jane/", "postedAtISO": "2025-09-05T10:00:00Z"},
+        {"inputUrl": "https://www.linkedin.com/in/other/", "postedAtISO": "2025-09-09T10:00:00Z"},
+    ]
+    collector = linkedin_scraper.PostCollector({"jane": "id-jane"})
+    for item in items:
+        collector.add(item)
+    assert collector.items_seen == 3
+    assert collector.newest == {"id-jane": datetime(2025, 9, 5, 10, tzinfo=timezone.utc)}
+
+
+def test_normalize_posts_routes_filters_and_dedupes():
+    items = [
+        {"url": "p1", "text": "Day 3 of #0to100xEngineers", "inputUrl": "https://www.linkedin.com/in/Jane/", "postedAtISO": "2025-09-05T10:00:00Z", "numLikes": 4},
+        {"url": "p1", "text": "Day 3 of #0to100xEngineers", "inputUrl": "https://www.linkedin.com/in/jane/", "postedAtISO": "2025-09-05T10:00:00Z", "numLikes": 6},
+        {"url": "p2", "text": "unrelated", "inputUrl": "https://www.linkedin.com/in/jane/"},
+        {"url": "p3", "text": "#100xengineers old post", "inputUrl": "https://www.linkedin.com/in/jane/", "postedAtISO": "2025-08-01T10:00:00Z"},
+        {"url": "p4", "text": "#100xengineers", "inputUrl": "https://www.linkedin.com/in/stranger/"},
+    ]
+    rows = linkedin_scraper.normalize_posts(items, {"jane": "id-jane"}, {"id-jane": datetime(2025, 9, 1, tzinfo=timezone.utc)})
+    assert [(r["url"], r["userId"], r["numLikes"]) for r in rows] == [("p1", "id-jane", 6)]
+
+
+def test_tag_pattern_matches_configured_tags_at_word_start():
+    pattern = linkedin_scraper.compile_tag_pattern("#0to100xEngineers, 100xengineer")
+    assert pattern.search("Shipping again #0TO100XENGINEERS")
+    assert pattern.search("proud 100xEngineers cohort")
+    assert not pattern.search("see foo100xengineer")
+    assert not linkedin_scraper.compile_tag_pattern("").search("100xengineer")
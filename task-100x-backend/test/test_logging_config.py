@@ -0,0 +1,81 @@
+# test/test_logging_config.py
+import json
+import logging
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from modules import logging_config
+
+
+def make_record(msg, *args, **extra):
+    record = logging.LogRecord("modules.test", logging.INFO, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_lines_carry_extras_and_request_id():
+    token = logging_config.request_id.set("abc123")
+    try:
+        record = make_record("Sent notification %s", "n1", sessionId="s1")
+        assert logging_config.ContextFilter(sample_rate=1).filter(record)
+    finally:
+        logging_config.request_id.reset(token)
+
+    entry = json.loads(logging_config.JSONFormatter().format(record))
+    assert entry["message"] == "Sent notification n1"
+    assert entry["level"] == "INFO"
+    assert entry["request_id"] == "abc123"
+    assert entry["sessionId"] == "s1"
+    assert "args" not in entry
+
+
+def test_sampled_lines_are_dropped_at_zero_rate():
+    log_filter = logging_config.ContextFilter(sample_rate=0)
+    assert not log_filter.filter(make_record("per item", sample=True))
+    assert log_filter.filter(make_record("always kept"))
+
+
+def test_queued_records_keep_the_traceback():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("modules.test", logging.ERROR, __file__, 1, "failed %s", ("x",), True)
+        record.exc_info = sys.exc_info()
+
+    prepared = logging_config._QueueHandler(None).prepare(record)
+    entry = json.loads(logging_config.JSONFormatter().format(prepared))
+    assert entry["message"] == "failed x"
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_truncate_marks_long_values():
+    assert logging_config.truncate("short", 10) == "short"
+    assert logging_config.truncate("x" * 20, 10) == "xxxxxxxxxx... (20 chars)"
+
+
+def test_phone_numbers_keep_only_the_last_four_digits():
+    assert logging_config.mask_phone("+91 98765 43210") == "***3210"
+    assert logging_config.mask_phone(None) == ""
+
+
+def test_request_id_is_echoed_or_generated():
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami():
+        return {"request_id": logging_config.request_id.get()}
+
+    app.add_middleware(logging_config.RequestIdMiddleware)
+    client = TestClient(app)
+
+    response = client.get("/whoami", headers={"X-Request-ID": "req-1"})
+    assert response.headers["X-Request-ID"] == "req-1"
+    assert response.json() == {"request_id": "req-1"}
+
+    generated = client.get("/whoami", headers={"X-Request-ID": "not valid!"})
+    assert generated.headers["X-Request-ID"] != "not valid!"
+    assert generated.json()["request_id"] == generated.headers["X-Request-ID"]
+    assert logging_config.request_id.get() is None
@@ -0,0 +1,88 @@
+# test/test_metrics.py
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from modules import metrics
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_labelled_by_route_template():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    app.add_middleware(metrics.MetricsMiddleware)
+    client = TestClient(app)
+
+    before = sample("http_requests_total", method="GET", route="/items/{item_id}", status="200")
+    unmatched = sample("http_requests_total", method="GET", route="unmatched", status="404")
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nope")
+
+    assert sample("http_requests_total", method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert sample("http_requests_total", method="GET", route="unmatched", status="404") == unmatched + 1
+    assert sample("http_requests_in_flight", method="GET") == 0
+
+
+@pytest.mark.asyncio
+async def test_prisma_queries_are_timed_by_model_and_action():
+    class User:
+        pass
+
+    class FakePrisma:
+        async def _execute(self, *, method, arguments, model=None, root_selection=None):
+            if method == "query_raw":
+                raise RuntimeError("boom")
+            return []
+
+    prisma = metrics.instrument_prisma(FakePrisma())
+    before = sample("db_queries_total", model="User", action="find_many", outcome="ok")
+    await prisma._execute(method="find_many", arguments={}, model=User)
+    with pytest.raises(RuntimeError):
+        await prisma._execute(method="query_raw", arguments={})
+
+    assert sample("db_queries_total", model="User", action="find_many", outcome="ok") == before + 1
+    assert sample("db_queries_total", model="raw", action="query_raw", outcome="error") >= 1
+
+
+@pytest.mark.asyncio
+async def test_outbound_requests_are_timed_per_provider():
+    metrics.instrument_httpx()
+    transport = httpx.MockTransport(lambda request: httpx.Response(503))
+    before = sample("external_request_duration_seconds_count", provider="apify", outcome="5xx")
+    async with httpx.AsyncClient(transport=transport) as client:
+        await client.get("https://api.apify.com/v2/acts")
+
+    assert sample("external_request_duration_seconds_count", provider="apify", outcome="5xx") == before + 1
+    assert metrics.provider_for("example.com") == "other"
+    assert metrics.provider_for("abc.supabase.co") == "supabase"
+
+
+@pytest.mark.asyncio
+async def test_prisma_engine_calls_are_not_external_requests():
+    metrics.instrument_httpx()
+    engine = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    class FakePrisma:
+        async def _execute(self, **kwargs):
+            # The real client POSTs the query to its engine on localhost
+            await engine.post("http://localhost:41234/", json={})
+            return []
+
+    prisma = metrics.instrument_prisma(FakePrisma())
+    external = sample("external_request_duration_seconds_count", provider="other", outcome="2xx")
+    queries = sample("db_queries_total", model="raw", action="query_raw", outcome="ok")
+    await prisma._execute(method="query_raw", arguments={})
+
+    assert sample("external_request_duration_seconds_count", provider="other", outcome="2xx") == external
+    assert sample("db_queries_total", model="raw", action="query_raw", outcome="ok") == queries + 1
+    await engine.aclose()
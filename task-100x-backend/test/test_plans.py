@@ -0,0 +1,118 @@
+# test/test_plans.py
+from types import SimpleNamespace
+
+import pytest
+from prisma.errors import UniqueViolationError
+
+from modules import cohort_content
+
+LEARNER = SimpleNamespace(id="learner-1", role="LEARNER")
+
+
+class LostRace(UniqueViolationError):
+    def __init__(self):
+        Exception.__init__(self, "Unique constraint failed on (userId, cohortId, weekNumber)")
+
+
+def make_plan(plan_id, week_number, *resource_ids):
+    tasks = [SimpleNamespace(resourceId=r, status="PENDING", resource=SimpleNamespace(id=r, weekNumber=2)) for r in resource_ids]
+    return SimpleNamespace(id=plan_id, userId=LEARNER.id, cohortId="c1", weekNumber=week_number, tasks=tasks)
+
+
+class FakePlans:
+    """
+    Plans with the (userId, cohortId, weekNumber) unique index. `rival` is
+    written by a concurrent request just before this one writes.
+    """
+
+    def __init__(self, *plans, rival=None):
+        self.plans = list(plans)
+        self.rival = rival
+        self.writes = []
+
+    def _key(self, where):
+        key = where["userId_cohortId_weekNumber"]
+        return key["userId"], key["cohortId"], key["weekNumber"]
+
+    def _find(self, user_id, cohort_id, week_number):
+        return next((p for p in self.plans if (p.userId, p.cohortId, p.weekNumber) == (user_id, cohort_id, week_number)), None)
+
+    def _race(self, week_number):
+        if self.rival:
+            self.plans.append(self.rival)
+            self.rival = None
+        if self._find(LEARNER.id, "c1", week_number):
+            raise LostRace()
+
+    async def find_unique(self, where, include):
+        return self._find(*self._key(where))
+
+    async def find_first(self, where, include=None):
+        week_number = where["tasks"]["some"]["resource"]["weekNumber"]
+        return next((
+            p for p in self.plans
+            if p.weekNumber is None and any(t.resource.weekNumber == week_number for t in p.tasks)
+        ), None)
+
+    async def update(self, where, data, include):
+        self.writes.append("update")
+        self._race(data["weekNumber"])
+        plan = next(p for p in self.plans if p.id == where["id"])
+        plan.weekNumber = data["weekNumber"]
+        return plan
+
+    async def upsert(self, where, data, include):
+        self.writes.append("upsert")
+        user_id, cohort_id, week_number = self._key(where)
+        self._race(week_number)
+        created = data["create"]
+        plan = make_plan("created", week_number, *(t["resourceId"] for t in created["tasks"]["create"]))
+        self.plans.append(plan)
+        return plan
+
+
+@pytest.fixture
+def week_resources(monkeypatch):
+    async def fake_get_week_resource_ids(prisma, cohort_id, week_number):
+        return ["r1", "r2"]
+
+    monkeypatch.setattr(cohort_content, "get_week_resource_ids", fake_get_week_resource_ids)
+
+
+@pytest.mark.asyncio
+async def test_legacy_plan_is_adopted_on_first_read(routes, week_resources):
+    legacy = make_plan("legacy", None, "r1")
+    prisma = SimpleNamespace(plan=FakePlans(legacy))
+
+    first = await routes.learner.get_plan("c1", 2, LEARNER, prisma)
+    assert first["data"] is legacy
+    assert legacy.weekNumber == 2
+
+    # Found by the unique index from then on
+    second = await routes.learner.get_plan("c1", 2, LEARNER, prisma)
+    assert second["data"] is legacy
+    assert prisma.plan.writes == ["update"]
+
+
+@pytest.mark.asyncio
+async def test_adopting_a_legacy_plan_returns_the_winner_on_a_lost_race(routes, week_resources):
+    winner = make_plan("winner", 2, "r1", "r2")
+    prisma = SimpleNamespace(plan=FakePlans(make_plan("legacy", None, "r1"), rival=winner))
+
+    result = await routes.learner.get_plan("c1", 2, LEARNER, prisma)
+
+    assert result["data"] is winner
+    assert [t.resourceId for t in result["data"].tasks] == ["r1", "r2"]
+
+
+@pytest.mark.asyncio
+async def test_creating_a_plan_returns_the_winner_with_its_tasks_on_a_lost_race(routes, week_resources):
+    winner = make_plan("winner", 2, "r1", "r2")
+    prisma = SimpleNamespace(plan=FakePlans(rival=winner))
+
+    result = await routes.learner.get_plan("c1", 2, LEARNER, prisma)
+
+    assert prisma.plan.writes == ["upsert"]
+    assert result["data"] is winner
+    assert [t.resourceId for t in result["data"].tasks] == ["r1", "r2"]
+    assert [p.id for p in prisma.plan.plans] == ["winner"]
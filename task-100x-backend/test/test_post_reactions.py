@@ -0,0 +1,79 @@
+# test/test_post_reactions.py
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+INSTRUCTOR = SimpleNamespace(id="i1", role="INSTRUCTOR")
+
+
+class FakePosts:
+    def __init__(self, *post_ids):
+        self.reacted = {post_id: False for post_id in post_ids}
+        self.calls = []
+
+    async def update_many(self, where, data):
+        self.calls.append((sorted(where["id"]["in"]), data))
+        found = [post_id for post_id in where["id"]["in"] if post_id in self.reacted]
+        for post_id in found:
+            self.reacted[post_id] = data["hasReacted"]
+        return len(found)
+
+
+def reactions(instructor, *pairs):
+    return instructor.BulkPostReactions(reactions=[{"postId": post_id, "hasReacted": state} for post_id, state in pairs])
+
+
+@pytest.mark.asyncio
+async def test_reactions_are_written_in_one_update_per_state(routes):
+    instructor = routes.instructor
+    posts = FakePosts("p1", "p2", "p3")
+    prisma = SimpleNamespace(post=posts)
+
+    result = await instructor.update_post_reactions(
+        reactions(instructor, ("p1", True), ("p2", False), ("p3", True), ("missing", False)), INSTRUCTOR, prisma
+    )
+
+    assert posts.calls == [(["p1", "p3"], {"hasReacted": True}), (["missing", "p2"], {"hasReacted": False})]
+    assert posts.reacted == {"p1": True, "p2": False, "p3": True}
+    assert (result["reacted"], result["unreacted"], result["notFound"]) == (2, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_last_state_for_a_post_wins(routes):
+    instructor = routes.instructor
+    posts = FakePosts("p1")
+
+    result = await instructor.update_post_reactions(
+        reactions(instructor, ("p1", True), ("p1", False)), INSTRUCTOR, SimpleNamespace(post=posts)
+    )
+
+    # Only the unreacted branch runs
+    assert posts.calls == [(["p1"], {"hasReacted": False})]
+    assert posts.reacted == {"p1": False}
+    assert (result["reacted"], result["unreacted"], result["notFound"]) == (0, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_too_many_reactions_are_rejected(routes):
+    instructor = routes.instructor
+    posts = FakePosts()
+    pairs = [(f"p{i}", True) for i in range(instructor.MAX_BULK_REACTIONS + 1)]
+
+    with pytest.raises(HTTPException) as e:
+        await instructor.update_post_reactions(reactions(instructor, *pairs), INSTRUCTOR, SimpleNamespace(post=posts))
+    assert e.value.status_code == 400
+    assert posts.calls == []
+
+
+@pytest.mark.asyncio
+async def test_only_instructors_update_reactions(routes):
+    instructor = routes.instructor
+    posts = FakePosts("p1")
+
+    with pytest.raises(HTTPException) as e:
+        await instructor.update_post_reactions(
+            reactions(instructor, ("p1", True)), SimpleNamespace(id="u1", role="LEARNER"), SimpleNamespace(post=posts)
+        )
+    assert e.value.status_code == 403
+    assert posts.calls == []
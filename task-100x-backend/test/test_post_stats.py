@@ -0,0 +1,237 @@
+# test/test_post_stats.py
+import base64
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+
+from modules import post_stats
+
+
+def matches(row, where):
+    for key, value in where.items():
+        if key == "OR":
+            if not any(matches(row, clause) for clause in value):
+                return False
+        elif isinstance(value, dict):
+            actual = getattr(row, key)
+            if "gt" in value and not actual > value["gt"]:
+                return False
+            if "lt" in value and not actual < value["lt"]:
+                return False
+        elif getattr(row, key) != value:
+            return False
+    return True
+
+
+class FakePostStats:
+    def __init__(self, rows=()):
+        self.rows = {row.userId: row for row in rows}
+        self.pages = []
+
+    async def find_unique(self, where):
+        return self.rows.get(where["userId"])
+
+    async def find_many(self, where, include, order, skip, take):
+        self.pages.append((where, skip))
+        rows = sorted((row for row in self.rows.values() if matches(row, where)), key=lambda row: (-row.totalPosts, -row.totalLikes, row.userId))
+        return rows[skip:skip + take]
+
+    async def count(self, where):
+        return sum(1 for row in self.rows.values() if matches(row, where))
+
+
+def stats_row(user_id, posts, likes):
+    return SimpleNamespace(userId=user_id, totalPosts=posts, totalLikes=likes, updatedAt=datetime(2025, 9, 1, tzinfo=timezone.utc))
+
+
+class FakePosts:
+    def __init__(self, posts=()):
+        self.posts = list(posts)
+
+    async def find_many(self, where, order, take):
+        rows = [post for post in self.posts if matches(post, where)]
+        rows.sort(key=lambda post: (post.postedAt, post.id), reverse=True)
+        return rows[:take]
+
+
+class FakePrisma:
+    def __init__(self, stats=(), posts=()):
+        self.queries = 0
+        self.poststats = FakePostStats(stats)
+        self.post = FakePosts(posts)
+        self.refreshed = []
+
+    async def execute_raw(self, query, *user_ids):
+        self.refreshed.extend(user_ids)
+        for user_id in user_ids:
+            self.poststats.rows[user_id] = stats_row(user_id, 0, 0)
+        return len(user_ids)
+
+    async def query_raw(self, query, *args):
+        self.queries += 1
+        if "longestStreak" in query:
+            return [{"longestStreak": 3}]
+        return [{"day": "2025-09-01", "count": 2}, {"day": "2025-09-02", "count": 1}]
+
+
+@pytest.mark.asyncio
+async def test_activity_is_cached_until_stats_change():
+    prisma = FakePrisma()
+    stats = SimpleNamespace(userId="user-1", updatedAt=datetime(2025, 9, 2, tzinfo=timezone.utc))
+
+    activity = await post_stats.get_post_activity(prisma, stats)
+    assert activity == {"heatmap": {"2025-09-01": 2, "2025-09-02": 1}, "longestStreak": 3}
+    await post_stats.get_post_activity(prisma, stats)
+    assert prisma.queries == 2
+
+    # Ingest refreshes the stats row, which moves updatedAt
+    refreshed = SimpleNamespace(userId="user-1", updatedAt=datetime(2025, 9, 3, tzinfo=timezone.utc))
+    await post_stats.get_post_activity(prisma, refreshed)
+    assert prisma.queries == 4
+
+
+@pytest.mark.asyncio
+async def test_rank_matches_leaderboard_order_with_ties_broken_by_user_id():
+    rows = [stats_row("u-b", 5, 10), stats_row("u-a", 5, 10), stats_row("u-c", 7, 0), stats_row("u-d", 5, 12), stats_row("u-e", 1, 99)]
+    prisma = FakePrisma(rows)
+
+    leaderboard = sorted(rows, key=lambda row: (-row.totalPosts, -row.totalLikes, row.userId))
+    assert [row.userId for row in leaderboard] == ["u-c", "u-d", "u-a", "u-b", "u-e"]
+    for position, row in enumerate(leaderboard, start=1):
+        assert await post_stats.get_rank(prisma, row) == position
+
+
+@pytest.mark.asyncio
+async def test_a_user_without_a_stats_row_gets_one_on_first_read():
+    prisma = FakePrisma([stats_row("u-a", 3, 4)])
+
+    stats = await post_stats.get_post_stats(prisma, "u-new")
+    assert (stats.userId, stats.totalPosts, stats.totalLikes) == ("u-new", 0, 0)
+    assert prisma.refreshed == ["u-new"]
+    assert await post_stats.get_rank(prisma, stats) == 2
+
+    # Found from then on
+    await post_stats.get_post_stats(prisma, "u-new")
+    assert prisma.refreshed == ["u-new"]
+
+
+def make_post(post_id, posted_at):
+    return SimpleNamespace(id=post_id, userId="u-a", postedAt=posted_at, hasReacted=False, url=f"https://example.com/{post_id}")
+
+
+def test_cursor_round_trips():
+    post = make_post("3f2c|9", datetime(2025, 9, 1, 8, 30, 15, 120000, tzinfo=timezone.utc))
+    assert post_stats.decode_post_cursor(post_stats.encode_post_cursor(post)) == (post.postedAt, post.id)
+
+
+@pytest.mark.asyncio
+async def test_page_boundary_inside_posts_with_the_same_timestamp():
+    same = datetime(2025, 9, 2, tzinfo=timezone.utc)
+    posts = [make_post("p1", same + timedelta(days=1))] + [make_post(f"p{i}", same) for i in (2, 3, 4)] + [make_post("p5", same - timedelta(days=1))]
+    prisma = FakePrisma(posts=posts)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await post_stats.list_user_posts(prisma, "u-a", cursor, limit=2)
+        seen.append([post.id for post in page])
+        if cursor is None:
+            break
+
+    # The first page ends between p4 and p3, which share postedAt
+    assert seen == [["p1", "p4"], ["p3", "p2"], ["p5"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"\xff\xfe\xfd").decode(),
+    base64.urlsafe_b64encode(b"2025-09-01T00:00:00+00:00").decode(),
+    base64.urlsafe_b64encode(b"yesterday|p1").decode(),
+])
+async def test_tampered_cursor_is_a_bad_request(routes, cursor):
+    prisma = FakePrisma(posts=[make_post("p1", datetime(2025, 9, 1, tzinfo=timezone.utc))])
+
+    async def find_user(where):
+        return SimpleNamespace(id=where["id"])
+
+    prisma.user = SimpleNamespace(find_unique=find_user)
+
+    with pytest.raises(HTTPException) as e:
+        await routes.instructor.get_user_posts("u-a", Response(), cursor=cursor, limit=None, hasReacted=None, prisma=prisma)
+    assert e.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_stats_pages_seek_past_the_last_row_instead_of_skipping():
+    rows = [stats_row(f"u-{i}", posts, likes) for i, (posts, likes) in enumerate([(5, 1), (5, 1), (5, 1), (4, 9), (3, 0), (3, 0), (1, 1)])]
+    prisma = FakePrisma(rows)
+    leaderboard = sorted(rows, key=lambda row: (-row.totalPosts, -row.totalLikes, row.userId))
+
+    pages = [page async for page in post_stats.iter_post_stats(prisma, None, offset=1, limit=5, page_size=2)]
+
+    assert [row.userId for page in pages for row in page] == [row.userId for row in leaderboard[1:6]]
+    # Only the first query skips rows
+    assert [skip for _, skip in prisma.poststats.pages] == [1, 0, 0]
+    assert "OR" not in prisma.poststats.pages[0][0]
+
+
+class SQLitePrisma:
+    """
+    Runs refresh_post_stats' SQL on SQLite, which shares Postgres'
+    INSERT ... SELECT ... ON CONFLICT syntax; only the ::int casts and the
+    $n placeholders are rewritten.
+    """
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:")
+        self.db.executescript(
+            """
+            CREATE TABLE "User" ("id" TEXT PRIMARY KEY, "cohortId" TEXT);
+            CREATE TABLE "Post" ("id" TEXT PRIMARY KEY, "userId" TEXT, "numLikes" INT, "numComments" INT, "postedAt" TEXT);
+            CREATE TABLE "PostStats" (
+                "userId" TEXT PRIMARY KEY, "cohortId" TEXT, "totalPosts" INT, "totalLikes" INT,
+                "totalComments" INT, "lastPostedAt" TEXT, "updatedAt" TEXT
+            );
+            """
+        )
+
+    async def execute_raw(self, query, *args):
+        return self.db.execute(re.sub(r"\$(\d+)", r"?\1", query.replace("::int", "")), args).rowcount
+
+    def stats(self):
+        rows = self.db.execute('SELECT "userId", "cohortId", "totalPosts", "totalLikes", "totalComments", "lastPostedAt" FROM "PostStats" ORDER BY 1')
+        return rows.fetchall()
+
+
+@pytest.mark.asyncio
+async def test_refresh_inserts_then_updates_stats_rows():
+    prisma = SQLitePrisma()
+    prisma.db.executemany('INSERT INTO "User" VALUES (?, ?)', [("u-a", "c1"), ("u-b", "c1"), ("u-c", "c1")])
+    prisma.db.executemany('INSERT INTO "Post" VALUES (?, ?, ?, ?, ?)', [
+        ("p1", "u-a", 10, 2, "2025-09-01"),
+        ("p2", "u-a", 5, 1, "2025-09-03"),
+        ("p3", "u-c", 7, 7, "2025-09-02"),
+    ])
+
+    assert await post_stats.refresh_post_stats(prisma, ["u-a", "u-b", "u-a"]) == 2
+    # Users without posts get a zero row; users not asked for are untouched
+    assert prisma.stats() == [
+        ("u-a", "c1", 2, 15, 3, "2025-09-03"),
+        ("u-b", "c1", 0, 0, 0, None),
+    ]
+
+    prisma.db.execute('INSERT INTO "Post" VALUES (?, ?, ?, ?, ?)', ("p4", "u-b", 1, 0, "2025-09-04"))
+    prisma.db.execute('UPDATE "Post" SET "numLikes" = 20 WHERE "id" = ?', ("p1",))
+    prisma.db.execute('UPDATE "User" SET "cohortId" = ? WHERE "id" = ?', ("c2", "u-a"))
+
+    # Existing rows are updated in place rather than hitting the primary key
+    await post_stats.refresh_post_stats(prisma, ["u-a", "u-b"])
+    assert prisma.stats() == [
+        ("u-a", "c2", 2, 25, 3, "2025-09-03"),
+        ("u-b", "c1", 1, 1, 0, "2025-09-04"),
+    ]
+    assert await post_stats.refresh_post_stats(prisma, []) == 0
@@ -0,0 +1,72 @@
+# test/test_quiz_cache.py
+import json
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+
+from modules import quiz_cache
+
+updated_at = datetime(2025, 7, 20, 10, 0, tzinfo=timezone.utc)
+
+test_quiz = SimpleNamespace(
+    id="quiz-1",
+    cohortId="cohort-1",
+    weekNumber=2,
+    updatedAt=updated_at,
+    questions=[
+        SimpleNamespace(
+            id="q-1",
+            questionText="What does RAG stand for?",
+            questionType="MCQ",
+            options=[
+                SimpleNamespace(id="o-1", optionText="Retrieval-Augmented Generation", isCorrect=True),
+                SimpleNamespace(id="o-2", optionText="Random Answer Generator", isCorrect=False),
+            ]
+        )
+    ]
+)
+
+
+def test_payload_hides_correctness():
+    payload = json.loads(quiz_cache.build_learner_payload(test_quiz))
+    assert payload["questions"][0]["options"] == [
+        {"id": "o-1", "text": "Retrieval-Augmented Generation"},
+        {"id": "o-2", "text": "Random Answer Generator"},
+    ]
+    assert b"isCorrect" not in quiz_cache.build_learner_payload(test_quiz)
+
+
+def test_cache_hit_and_version_miss():
+    quiz_cache.invalidate_quiz(test_quiz.id)
+    assert quiz_cache.get_learner_payload(test_quiz.id, updated_at) is None
+
+    stored = quiz_cache.store_learner_payload(test_quiz)
+    assert quiz_cache.get_learner_payload(test_quiz.id, updated_at) is stored
+    assert quiz_cache.get_learner_payload(test_quiz.id, updated_at + timedelta(seconds=1)) is None
+
+
+def test_invalidate_quiz():
+    quiz_cache.store_learner_payload(test_quiz)
+    quiz_cache.invalidate_quiz(test_quiz.id)
+    assert quiz_cache.get_learner_payload(test_quiz.id, updated_at) is None
+
+
+def test_answer_key_scoring():
+    answer_key = quiz_cache.build_answer_key(test_quiz)
+    assert answer_key == {"q-1": frozenset({"o-1"})}
+
+    answers = [
+        SimpleNamespace(questionId="q-1", selectedOptionId="o-1"),
+        SimpleNamespace(questionId="q-1", selectedOptionId="o-2"),
+        SimpleNamespace(questionId="q-1", selectedOptionId=None),
+        SimpleNamespace(questionId="unknown", selectedOptionId="o-1"),
+    ]
+    score, correctness = quiz_cache.score_answers(answer_key, answers)
+    assert score == 1
+    assert correctness == [True, False, False, False]
+
+
+def test_invalidate_drops_answer_key():
+    quiz_cache.store_answer_key(test_quiz)
+    assert quiz_cache.get_answer_key(test_quiz.id, updated_at) is not None
+    quiz_cache.invalidate_quiz(test_quiz.id)
+    assert quiz_cache.get_answer_key(test_quiz.id, updated_at) is None
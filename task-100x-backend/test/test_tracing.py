@@ -0,0 +1,121 @@
+# test/test_tracing.py
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from modules import logging_config, tracing
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+    return exporter
+
+
+def by_name(exporter):
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+def test_prisma_and_http_spans_nest_under_the_request_span(spans):
+    class User:
+        pass
+
+    class FakePrisma:
+        async def _execute(self, **kwargs):
+            return []
+
+    prisma = tracing.trace_prisma(FakePrisma())
+    tracing.trace_httpx()
+    outbound = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    app = FastAPI()
+
+    @app.get("/users/{user_id}")
+    async def get_user(user_id: str):
+        await prisma._execute(method="find_unique", arguments={}, model=User)
+        await outbound.get("https://api.openai.com/v1/models?key=secret")
+        return {"id": user_id}
+
+    app.add_middleware(tracing.TracingMiddleware)
+    app.add_middleware(logging_config.RequestIdMiddleware)
+    TestClient(app).get("/users/1", headers={"X-Request-ID": "req-1"})
+
+    found = by_name(spans)
+    request = found["GET /users/{user_id}"]
+    query = found["prisma User.find_unique"]
+    call = found["GET openai"]
+    assert request.attributes["request.id"] == "req-1"
+    assert request.attributes["http.response.status_code"] == 200
+    assert query.parent.span_id == request.context.span_id
+    assert call.parent.span_id == request.context.span_id
+    assert call.attributes["url.path"] == "/v1/models"
+    assert call.attributes["http.response.status_code"] == 200
+
+
+@pytest.mark.asyncio
+async def test_a_prisma_call_is_one_span(spans):
+    tracing.trace_httpx()
+    engine = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    class FakePrisma:
+        async def _execute(self, **kwargs):
+            # The real client POSTs the query to its engine on localhost
+            await engine.post("http://localhost:41234/", json={})
+            return []
+
+    await tracing.trace_prisma(FakePrisma())._execute(method="find_many", arguments={})
+    await engine.aclose()
+
+    assert [span.name for span in spans.get_finished_spans()] == ["prisma raw.find_many"]
+
+
+def test_llm_span_records_token_usage(spans):
+    completion = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30))
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: completion)))
+
+    tracing.trace_llm_client(client, "groq")
+    assert client.chat.completions.create(model="llama-3.3-70b-versatile", messages=[]) is completion
+
+    span = by_name(spans)["chat llama-3.3-70b-versatile"]
+    assert span.attributes["gen_ai.system"] == "groq"
+    assert span.attributes["gen_ai.usage.input_tokens"] == 120
+    assert span.attributes["gen_ai.usage.output_tokens"] == 30
+
+
+@pytest.mark.asyncio
+async def test_jobs_get_their_own_trace_linked_to_the_caller(spans):
+    async def work():
+        return "done"
+
+    with tracing.tracer.start_as_current_span("POST /api/sessions") as request:
+        assert await tracing.run_job("notification_resend", work(), "n1") == "done"
+
+    job = by_name(spans)["job notification_resend"]
+    assert job.parent is None
+    assert job.context.trace_id != request.get_span_context().trace_id
+    assert job.links[0].context.span_id == request.get_span_context().span_id
+    assert job.attributes["job.id"] == "n1"
+
+
+def test_file_exporter_writes_one_line_per_span(spans, tmp_path):
+    with tracing.tracer.start_as_current_span("outer"):
+        with tracing.tracer.start_as_current_span("inner"):
+            pass
+
+    path = tmp_path / "traces.jsonl"
+    tracing.FileSpanExporter(str(path)).export(spans.get_finished_spans())
+    records = {record["name"]: record for record in map(json.loads, path.read_text().splitlines())}
+
+    assert records["inner"]["parent_id"] == records["outer"]["span_id"]
+    assert records["inner"]["trace_id"] == records["outer"]["trace_id"]
+    assert records["outer"]["end_ns"] >= records["inner"]["end_ns"]
@@ -0,0 +1,88 @@
+# test/test_uploads.py
+import io
+
+import pytest
+from starlette.datastructures import Headers, UploadFile
+
+from modules import uploads
+from modules.uploads import LocalUploadBackend, UploadError
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def make_upload(data: bytes, content_type: str = "image/png") -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="session.png", headers=Headers({"content-type": content_type}))
+
+
+@pytest.mark.asyncio
+async def test_stores_by_content_hash_and_dedupes(tmp_path):
+    backend = LocalUploadBackend(str(tmp_path))
+
+    first = await uploads.store_image(make_upload(PNG), backend)
+    assert first.created
+    assert first.url == f"/uploads/{first.sha256}.png"
+    assert (tmp_path / first.key).read_bytes() == PNG
+
+    second = await uploads.store_image(make_upload(PNG), backend)
+    assert not second.created
+    assert second.key == first.key
+    assert sorted(p.name for p in tmp_path.iterdir()) == [first.key]
+
+
+@pytest.mark.asyncio
+async def test_streams_uploads_larger_than_one_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 16)
+    stored = await uploads.store_image(make_upload(PNG), LocalUploadBackend(str(tmp_path)))
+    assert stored.size == len(PNG)
+    assert (tmp_path / stored.key).read_bytes() == PNG
+
+
+@pytest.mark.asyncio
+async def test_rejects_oversized_and_non_image_uploads(tmp_path):
+    backend = LocalUploadBackend(str(tmp_path))
+
+    with pytest.raises(UploadError) as too_large:
+        await uploads.store_image(make_upload(PNG), backend, max_bytes=16)
+    assert too_large.value.status_code == 413
+
+    with pytest.raises(UploadError) as not_image:
+        await uploads.store_image(make_upload(b"<svg onload=alert(1)>", "image/png"), backend)
+    assert not_image.value.status_code == 415
+
+    with pytest.raises(UploadError) as mismatched:
+        await uploads.store_image(make_upload(PNG, "image/jpeg"), backend)
+    assert mismatched.value.status_code == 415
+
+    assert list(tmp_path.iterdir()) == []
+
+
+class FakeBucket:
+    def __init__(self, race=False):
+        self.objects = {}
+        self.uploads = 0
+        # Another worker stores the same object between our check and upload
+        self.race = race
+
+    def exists(self, key):
+        return key in self.objects
+
+    def upload(self, key, path, options):
+        self.uploads += 1
+        if self.race:
+            self.objects[key] = b"theirs"
+            raise RuntimeError("storage error with any wording")
+        with open(path, "rb") as f:
+            self.objects[key] = f.read()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("race", [False, True])
+async def test_supabase_dedupe_checks_for_the_object(monkeypatch, race):
+    bucket = FakeBucket(race)
+    backend = uploads.SupabaseUploadBackend()
+    monkeypatch.setattr(backend, "_storage", lambda: bucket)
+
+    assert await backend.save("abc.png", io.BytesIO(PNG), "image/png") is not race
+    assert await backend.save("abc.png", io.BytesIO(PNG), "image/png") is False
+    assert bucket.uploads == 1
+    assert await backend.exists("abc.png")
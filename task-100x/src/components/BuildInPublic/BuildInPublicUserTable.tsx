@@ -23,6 +23,8 @@ interface UserData {
   totalComments: number;
 }
 
+const SCRAPE_JOB_POLL_INTERVAL_MS = 5000;
+
 interface BuildInPublicUserTableProps {
   cohortId: string;
 }
@@ -56,12 +58,24 @@ const BuildInPublicUserTable = ({ cohortId }: BuildInPublicUserTableProps) => {
   const handleFetchLinkedInPosts = async () => {
     setIsFetchingPosts(true);
     try {
-      // const response = await instructor.fetchLinkedInPosts(linkedinCookie);
-      const response = await instructor.fetchLinkedInPostsSequentially(linkedinCookie);
-      toast({
-        title: "Success",
-        description: "LinkedIn posts fetched and updated successfully!",
-      });
+      const response = await instructor.startLinkedInScrapeJob(linkedinCookie, cohortId);
+      let job = response.data;
+      while (job.status === "PENDING" || job.status === "RUNNING") {
+        await new Promise((resolve) => setTimeout(resolve, SCRAPE_JOB_POLL_INTERVAL_MS));
+        job = (await instructor.getLinkedInScrapeJob(job.id)).data;
+      }
+      if (job.status === "COMPLETED") {
+        toast({
+          title: "Success",
+          description: `LinkedIn posts fetched for ${job.processedUsers} of ${job.totalUsers} users (${job.postsUpserted} posts updated).`,
+        });
+      } else {
+        toast({
+          variant: "destructive",
+          title: "Error fetching LinkedIn posts",
+          description: job.error || `Scrape job ${job.status.toLowerCase()}.`,
+        });
+      }
     } catch (error) {
       console.error("Error fetching LinkedIn posts:", error);
       toast({
@@ -14,9 +14,11 @@ interface QuizFeedbackData {
   quiz_title: string;
   score: number;
   total_questions: number;
-  feedback_report_content: string;
+  feedback_report_content: string | null;
 }
 
+const FEEDBACK_POLL_INTERVAL_MS = 3000;
+
 export const QuizFeedbackComponent = ({ attemptId }: QuizFeedbackProps) => {
   const [feedback, setFeedback] = useState<QuizFeedbackData | null>(null);
   const [isLoading, setIsLoading] = useState<boolean>(true);
@@ -49,6 +51,26 @@ export const QuizFeedbackComponent = ({ attemptId }: QuizFeedbackProps) => {
     fetchFeedback();
   }, [attemptId, toast]);
 
+  // The feedback report is generated in the background after submission
+  const isReportPending = feedback !== null && !feedback.feedback_report_content;
+  useEffect(() => {
+    if (!isReportPending) return;
+    const interval = setInterval(async () => {
+      try {
+        const status = await learner.getQuizFeedbackStatus(attemptId);
+        if (status.status === "READY" && status.feedbackReport) {
+          const reportContent = status.feedbackReport.reportContent;
+          setFeedback((prev) =>
+            prev ? { ...prev, feedback_report_content: reportContent } : prev
+          );
+        }
+      } catch (error) {
+        console.error("Error polling feedback status:", error);
+      }
+    }, FEEDBACK_POLL_INTERVAL_MS);
+    return () => clearInterval(interval);
+  }, [attemptId, isReportPending]);
+
   if (isLoading) {
     return <div>Loading feedback...</div>;
   }
@@ -67,7 +89,7 @@ export const QuizFeedbackComponent = ({ attemptId }: QuizFeedbackProps) => {
           <CardTitle className="text-orange-300">Overall Feedback</CardTitle>
         </CardHeader>
         <CardContent className="bg-orange-100">
-          <p className="text-sm text-black whitespace-pre-wrap">{feedback.feedback_report_content}</p>
+          <p className="text-sm text-black whitespace-pre-wrap">{feedback.feedback_report_content ?? "Generating your feedback..."}</p>
         </CardContent>
       </Card>
     </div>
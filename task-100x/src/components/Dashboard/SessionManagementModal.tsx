@@ -14,6 +14,7 @@ interface Session {
   weekNumber: number;
   lectureNumber: number;
   imageUrl?: string;
+  thumbnailUrl?: string;
   cohortId: string;
   sessionType?: string;
 }
@@ -240,7 +241,7 @@ const SessionManagementModal = ({
             <Button onClick={() => fileInputRef.current?.click()} variant="outline">
               Upload Image
             </Button>
-            {imageUrl && <img src={imageUrl} alt="Session Preview" className="mt-2 w-full h-auto rounded-lg" />}
+            {imageUrl && <img src={selectedImage ? imageUrl : editingSession?.thumbnailUrl || imageUrl} alt="Session Preview" className="mt-2 w-full h-auto rounded-lg" />}
           </div>
           <Button onClick={handleSubmit} disabled={loading} className="bg-orange-600 hover:bg-orange-700 text-white font-semibold rounded-xl shadow-lg transition-all duration-200 ease-in-out">
             {loading ? (editingSession ? 'Updating...' : 'Submitting...') : (editingSession ? 'Update Session' : 'Create Session')}
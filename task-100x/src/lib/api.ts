@@ -172,6 +172,7 @@ export interface Session {
   weekNumber: number;
   lectureNumber: number;
   imageUrl?: string;
+  thumbnailUrl?: string;
   cohortId: string;
   sessionType?: string;
 }
@@ -457,6 +458,22 @@ export const learner = {
     }>(`/api/quiz-attempts/${attemptId}/feedback`);
     return response.data.data;
   },
+  getQuizFeedbackStatus: async (
+    attemptId: string
+  ): Promise<{
+    status: "PENDING" | "READY";
+    feedbackReport: { reportContent: string } | null;
+  }> => {
+    const response = await api.get<{
+      success: boolean;
+      data: {
+        status: "PENDING" | "READY";
+        feedbackReport: { reportContent: string } | null;
+      };
+      message: string;
+    }>(`/api/quiz-attempts/${attemptId}/feedback-status`);
+    return response.data.data;
+  },
   getQuizAttemptStatus: async (quizId: string): Promise<QuizAttemptStatus> => {
     const response = await api.get<{
       success: boolean;
@@ -710,18 +727,20 @@ export const instructor = {
     const response = await api.get<UserData[]>(`/api/admin/users`);
     return response.data;
   },
-  fetchLinkedInPosts: async (linkedinCookie: string) => {
-    const response = await api.post(
-      `/api/build-in-public/fetch-linkedin-posts`,
-      {
-        linkedinCookie,
-      }
-    );
+  startLinkedInScrapeJob: async (linkedinCookie: string, cohortId?: string) => {
+    const response = await api.post(`/api/build-in-public/scrape-jobs`, {
+      linkedinCookie,
+      cohortId,
+    });
+    return response.data;
+  },
+  getLinkedInScrapeJob: async (jobId: string) => {
+    const response = await api.get(`/api/build-in-public/scrape-jobs/${jobId}`);
     return response.data;
   },
-  fetchLinkedInPostsSequentially: async (linkedinCookie: string) => {
+  resumeLinkedInScrapeJob: async (jobId: string, linkedinCookie: string) => {
     const response = await api.post(
-      `/api/build-in-public/fetch-linkedin-posts-sequentially`,
+      `/api/build-in-public/scrape-jobs/${jobId}/resume`,
       {
         linkedinCookie,
       }
@@ -746,11 +765,18 @@ export const instructor = {
     );
     return response.data;
   },
-  getUserPosts: async (userId: string): Promise<Post[]> => {
+  getUserPosts: async (
+    userId: string,
+    options: { cursor?: string; limit?: number; hasReacted?: boolean } = {}
+  ): Promise<{ posts: Post[]; nextCursor: string | null }> => {
     const response = await api.get<Post[]>(
-      `/api/build-in-public/users/${userId}/posts`
+      `/api/build-in-public/users/${userId}/posts`,
+      { params: options }
     );
-    return response.data;
+    return {
+      posts: response.data,
+      nextCursor: response.headers["x-next-cursor"] ?? null,
+    };
   },
   updatePostReactionStatus: async (
     postId: string,
@@ -761,6 +787,14 @@ export const instructor = {
     );
     return response.data;
   },
+  updatePostReactions: async (
+    reactions: { postId: string; hasReacted: boolean }[]
+  ): Promise<{ success: boolean; reacted: number; unreacted: number; notFound: number }> => {
+    const response = await api.put(`/api/build-in-public/posts/react`, {
+      reactions,
+    });
+    return response.data;
+  },
   getSessionNotifications: async (
     sessionId: string
   ): Promise<Notification[]> => {
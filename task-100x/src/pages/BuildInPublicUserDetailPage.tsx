@@ -3,7 +3,7 @@ import AppLayout from "@/components/AppLayout";
 import { Breadcrumb } from "@/components/ui/breadcrumb";
 import UserStatsCards from "@/components/BuildInPublic/UserStatsCards";
 import StreakCalendar from "@/components/BuildInPublic/StreakCalendar";
-import { useEffect, useState } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 import { instructor } from "@/lib/api";
 import { toast } from "@/components/ui/use-toast";
 import { Loader2 } from "lucide-react";
@@ -33,18 +33,19 @@ const BuildInPublicUserDetailPage = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [filter, setFilter] = useState<"all" | "reacted" | "unreacted">("all");
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const loadMoreRef = useRef<HTMLDivElement | null>(null);
+
+  const hasReactedFilter = filter === "all" ? undefined : filter === "reacted";
 
   useEffect(() => {
-    const fetchUserData = async () => {
+    const fetchUserStats = async () => {
       if (userId) {
         try {
           setLoading(true);
-          const [statsResponse, postsResponse] = await Promise.all([
-            instructor.getUserStats(userId),
-            instructor.getUserPosts(userId),
-          ]);
+          const statsResponse = await instructor.getUserStats(userId);
           setUserStats(statsResponse);
-          setPosts(postsResponse);
         } catch (error) {
           console.error("Failed to fetch user data", error);
           toast({
@@ -57,9 +58,56 @@ const BuildInPublicUserDetailPage = () => {
         }
       }
     };
-    fetchUserData();
+    fetchUserStats();
   }, [userId]);
 
+  useEffect(() => {
+    const fetchFirstPage = async () => {
+      if (userId) {
+        try {
+          const page = await instructor.getUserPosts(userId, { hasReacted: hasReactedFilter });
+          setPosts(page.posts);
+          setNextCursor(page.nextCursor);
+        } catch (error) {
+          console.error("Failed to fetch user posts", error);
+          toast({
+            variant: "destructive",
+            title: "Error",
+            description: "Failed to fetch user posts.",
+          });
+        }
+      }
+    };
+    fetchFirstPage();
+  }, [userId, hasReactedFilter]);
+
+  const loadMorePosts = useCallback(async () => {
+    if (!userId || !nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await instructor.getUserPosts(userId, { cursor: nextCursor, hasReacted: hasReactedFilter });
+      setPosts((prevPosts) => [...prevPosts, ...page.posts]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Failed to fetch more posts", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [userId, nextCursor, loadingMore, hasReactedFilter]);
+
+  // Fetch the next page when the end of the table scrolls into view
+  useEffect(() => {
+    const sentinel = loadMoreRef.current;
+    if (!sentinel || !nextCursor) return;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) {
+        loadMorePosts();
+      }
+    });
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [nextCursor, loadMorePosts]);
+
   const handleToggleReacted = async (postId: string, currentStatus: boolean) => {
     try {
       const response = await instructor.updatePostReactionStatus(postId, !currentStatus);
@@ -80,6 +128,35 @@ const BuildInPublicUserDetailPage = () => {
     }
   };
 
+  const handleMarkAllReacted = async () => {
+    const unreactedIds = posts.filter((post) => !post.hasReacted).map((post) => post.id);
+    if (unreactedIds.length === 0) return;
+    try {
+      const response = await instructor.updatePostReactions(
+        unreactedIds.map((postId) => ({ postId, hasReacted: true }))
+      );
+      if (response.success) {
+        const updatedIds = new Set(unreactedIds);
+        setPosts((prevPosts) =>
+          prevPosts.map((post) =>
+            updatedIds.has(post.id) ? { ...post, hasReacted: true } : post
+          )
+        );
+        toast({
+          title: "Success",
+          description: `Marked ${response.reacted} posts as reacted.`,
+        });
+      }
+    } catch (error) {
+      console.error("Failed to update post reaction statuses", error);
+      toast({
+        variant: "destructive",
+        title: "Error",
+        description: "Failed to update post statuses.",
+      });
+    }
+  };
+
   const filteredPosts = posts.filter((post) => {
     if (filter === "reacted") {
       return post.hasReacted;
@@ -146,6 +223,13 @@ const BuildInPublicUserDetailPage = () => {
             >
               Unreacted Posts
             </Button>
+            <Button
+              onClick={handleMarkAllReacted}
+              disabled={!posts.some((post) => !post.hasReacted)}
+              className="px-6 py-2 rounded-full text-sm font-medium transition-colors bg-gray-200 text-gray-700 hover:bg-gray-300"
+            >
+              Mark Loaded as Reacted
+            </Button>
           </div>
           <div className="overflow-x-auto">
             <Table className="min-w-full bg-white border border-gray-200 rounded-lg">
@@ -183,6 +267,9 @@ const BuildInPublicUserDetailPage = () => {
                 ))}
               </TableBody>
             </Table>
+            <div ref={loadMoreRef} className="flex justify-center py-4">
+              {loadingMore && <Loader2 className="h-6 w-6 text-orange-500 animate-spin" />}
+            </div>
           </div>
         </div>
       </div>